@@ -0,0 +1,130 @@
+"""
+Zużycie suplementów (dni / porcje / kapsułki) per miesiąc albo rok.
+
+Liczone na kolumnach Timeline (suplement -> bitmapa dni) przez maski
+okresów i popcount (int.bit_count) - bez chodzenia po DayItem.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any
+
+from .calendar_index import CalendarIndex
+from .engine import ModelSource, _ensure, prepare_model
+from .timeline import Timeline
+
+
+@dataclass(frozen=True)
+class ConsumptionTable:
+    """
+    Tabela kolumnowa: wiersz = (supplement_id, period).
+    period: "YYYY-MM" (by="month") albo "YYYY" (by="year").
+    """
+
+    supplement_id: list[str]
+    period: list[str]
+    days: list[int]
+    quantity: list[float]
+    unit: list[str]
+
+    def __len__(self) -> int:
+        return len(self.supplement_id)
+
+    def rows(self) -> Iterator[tuple[str, str, int, float, str]]:
+        return zip(
+            self.supplement_id,
+            self.period,
+            self.days,
+            self.quantity,
+            self.unit,
+            strict=True,
+        )
+
+    def total(self, supplement_id: str) -> float:
+        return sum(
+            q
+            for sid, q in zip(self.supplement_id, self.quantity, strict=True)
+            if sid == supplement_id
+        )
+
+
+def daily_quantity(M: dict[str, Any], sid: str) -> tuple[float, str]:
+    """
+    Ilość na jeden dzień przyjmowania:
+    event_only z capsules_per_day -> kapsułki eventu,
+    default_dose.amount -> dawka, w przeciwnym razie 1 porcja.
+    """
+    spec = M["SUPPLEMENTS"][sid]
+    for r in spec.get("schedule_rules", []):
+        if r["type"] == "event_only":
+            ev = M["EVENTS"].get(r["params"]["event_id"], {})
+            if ev.get("capsules_per_day") is not None:
+                return float(ev["capsules_per_day"]), "caps"
+    dose = spec.get("default_dose")
+    if isinstance(dose, dict) and dose.get("amount") is not None:
+        return float(dose["amount"]), str(dose.get("unit") or "")
+    return 1.0, "serving"
+
+
+def _period_ranges(
+    start: date, n_days: int, by: str
+) -> list[tuple[str, int, int]]:
+    """
+    [(period, lo, hi)] - półotwarte zakresy indeksów dni osi czasu.
+    """
+    cal = CalendarIndex.build(start, start + timedelta(days=n_days - 1))
+    out: list[tuple[str, int, int]] = []
+    for y, m, lo, hi in cal.month_runs:
+        key = f"{y:04d}-{m:02d}" if by == "month" else f"{y:04d}"
+        if out and out[-1][0] == key:
+            out[-1] = (key, out[-1][1], hi)
+        else:
+            out.append((key, lo, hi))
+    return out
+
+
+def consumption_table(
+    timelines: Timeline | Iterable[Timeline],
+    M_raw: ModelSource,
+    *,
+    by: str = "month",
+) -> ConsumptionTable:
+    """
+    Suma zużycia po wszystkich podanych osiach czasu (np. tysiące
+    profili). Wiersze posortowane po (period, supplement_id).
+    """
+    _ensure(by in ("month", "year"), f"Unknown period: {by}")
+    M = prepare_model(M_raw)
+    if isinstance(timelines, Timeline):
+        timelines = [timelines]
+
+    days: dict[tuple[str, str], int] = {}
+    ranges_cache: dict[tuple[date, int], list[tuple[str, int, int]]] = {}
+    for tl in timelines:
+        key = (tl.start, len(tl))
+        ranges = ranges_cache.get(key)
+        if ranges is None:
+            ranges = ranges_cache[key] = _period_ranges(tl.start, len(tl), by)
+        windows = [(p, lo, (1 << (hi - lo)) - 1) for p, lo, hi in ranges]
+
+        for sid, col in zip(tl.supplement_ids, tl.columns, strict=True):
+            if not col:
+                continue
+            for period, lo, window in windows:
+                n = ((col >> lo) & window).bit_count()
+                if n:
+                    k = (period, sid)
+                    days[k] = days.get(k, 0) + n
+
+    qty = {sid: daily_quantity(M, sid) for _, sid in days}
+    keys = sorted(days)
+    return ConsumptionTable(
+        supplement_id=[sid for _, sid in keys],
+        period=[p for p, _ in keys],
+        days=[days[k] for k in keys],
+        quantity=[days[k] * qty[k[1]][0] for k in keys],
+        unit=[qty[k[1]][1] for k in keys],
+    )
@@ -0,0 +1,395 @@
+"""
+Statyczna analiza speca na całej przestrzeni sygnatur dnia.
+
+Plan dnia zależy tylko od skończonego zbioru faktów: miesiąc (blok,
+seasonal), dzień miesiąca (zestaw eventów, tydzień od 1 stycznia), dzień
+tygodnia, faza reguł cycle_weeks, flagi i OFF WEEK. Zamiast symulować
+lata analiza przechodzi wszystkie osiągalne sygnatury:
+- per miesiąc: klasy dni miesiąca we wszystkich typach roku (dzień
+  tygodnia 1 stycznia x rok zwykły/przestępny) -> zestaw eventów +
+  występujące pary (tydzień roku, dzień tygodnia); oba wymiary zależą
+  od daty, więc nie są składane iloczynem,
+- reguły harmonogramu zależą każda od jednego wymiaru (dzień tygodnia,
+  tydzień roku, tydzień od kotwicy, flaga), więc zbiory po
+  apply_schedule_rules to sumy zbiorów z wymiarów - deduplikowane przy
+  składaniu, zanim trafią do constraints i konfliktów; niezależne
+  (kotwica dowolna, flagi) składane są iloczynem,
+- kombinacje rozwijane są tylko dla suplementów powiązanych
+  (supplement_exclusions, exclude/require_supplements); los pozostałych
+  nie zależy od reszty dnia, więc idą jednym zbiorem na (miesiąc, eventy).
+OFF WEEK / skip_windows tylko opróżniają dzień, więc nie rozwijają
+przestrzeni. Kotwica cycle_anchor_date jest dowolna (każda faza).
+
+Uruchom: python -m longevity.analyze [spec.py]  (kod wyjścia 1, gdy są
+problemy - do użycia jako hook pre-commit).
+"""
+
+from __future__ import annotations
+
+import argparse
+import calendar
+import math
+import sys
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any
+
+from .engine import (
+    ModelSource,
+    _apply_constraints,
+    _compile_day_filter,
+    _event_days_for_month,
+    _event_priority_key,
+    _supplement_exclusion_pairs,
+    prepare_model,
+)
+
+# lata wzorcowe: po jednym na typ roku (dzień tygodnia 1 stycznia x rok
+# zwykły/przestępny) - razem wszystkie pary (dzień roku, dzień tygodnia)
+_YEARS = tuple(
+    sorted(
+        {
+            (date(y, 1, 1).weekday(), calendar.isleap(y)): y
+            for y in range(2001, 2029)
+        }.values()
+    )
+)
+
+FINDING_KINDS = (
+    "unreachable",  # suplement nigdy nie trafia do planu
+    "conflicted",  # planowany, ale zawsze usuwany przez CONFLICTS
+    "rule_never_fires",  # reguła harmonogramu bez żadnej sygnatury
+    "require_undone",  # require_supplements cofnięte przez konflikty
+    "allow_only_drops_core",  # allow_only usuwa suplement z CORE_SET
+)
+
+
+@dataclass(frozen=True)
+class Finding:
+    kind: str  # jeden z FINDING_KINDS
+    subject: str  # supplement_id / id reguły / id override'u
+    detail: str
+
+    def describe(self) -> str:
+        return f"{self.kind}: {self.subject} - {self.detail}"
+
+
+@dataclass(frozen=True)
+class SpecAnalysis:
+    findings: list[Finding]
+    signatures: int  # przeanalizowane sygnatury (miesiąc, eventy, zbiór)
+    reachable: frozenset[str]  # suplementy obecne w jakimkolwiek dniu
+
+    @property
+    def ok(self) -> bool:
+        return not self.findings
+
+    def of_kind(self, kind: str) -> list[Finding]:
+        return [f for f in self.findings if f.kind == kind]
+
+
+def _day_classes(
+    M: dict[str, Any], month: int
+) -> dict[tuple[str, ...], set[tuple[int, int]]]:
+    """
+    Zestaw eventów dnia -> pary (tydzień od 1 stycznia, dzień tygodnia),
+    w których występuje (dni miesiąca we wszystkich typach roku).
+    """
+    key = _event_priority_key(M)
+    out: dict[tuple[str, ...], set[tuple[int, int]]] = {}
+    for y in _YEARS:
+        ev_days: dict[date, list[str]] = {}
+        for ev_id, ev in M["EVENTS"].items():
+            if ev["type"] == "pulse" and month in ev["months"]:
+                for x in _event_days_for_month(M, y, month, ev):
+                    ev_days.setdefault(x, []).append(ev_id)
+        d = date(y, month, 1)
+        while d.month == month:
+            evs = sorted(ev_days.get(d, []), key=key, reverse=True)
+            year_week = (d.timetuple().tm_yday - 1) // 7
+            out.setdefault(tuple(evs), set()).add((year_week, d.weekday()))
+            d += timedelta(days=1)
+    return out
+
+
+def _combine(
+    a: Iterable[frozenset[str]], b: Iterable[frozenset[str]]
+) -> set[frozenset[str]]:
+    bs = set(b)
+    return {x | y for x in a for y in bs}
+
+
+class _Schedule:
+    """
+    apply_schedule_rules dla jednego bloku rozłożone na wymiary.
+    """
+
+    def __init__(
+        self,
+        M: dict[str, Any],
+        block_id: str,
+        linked: frozenset[str],
+        fired: set[str],
+    ):
+        base = set(M["CORE_SET"])
+        self.by_weekday: list[set[str]] = [set() for _ in range(7)]
+        self.year_rules: list[tuple[str, str, int, int]] = []
+        custom: list[tuple[str, str, int, int]] = []
+        by_flag: dict[str, set[str]] = {}
+
+        for sid, spec in M["SUPPLEMENTS"].items():
+            for rule in spec.get("schedule_rules", []):
+                ab = rule.get("active_blocks")
+                rtype = rule["type"]
+                if rtype == "event_only" or (
+                    ab is not None and block_id not in ab
+                ):
+                    continue
+                rid = str(rule.get("id", sid))
+                params = rule.get("params", {})
+                if rtype == "daily":
+                    base.add(sid)
+                    fired.add(rid)
+                elif rtype == "week_pattern":
+                    for wd in params["days_included"]:
+                        if 0 <= wd < 7:
+                            self.by_weekday[wd].add(sid)
+                            fired.add(rid)
+                elif rtype == "times_per_week":
+                    last = 5 if params.get("weekdays_only") else 7
+                    for wd in params["fixed_days"]:
+                        if 0 <= wd < last:
+                            self.by_weekday[wd].add(sid)
+                            fired.add(rid)
+                elif rtype == "cycle_weeks":
+                    on_w = int(params["on_weeks"])
+                    period = on_w + int(params["off_weeks"])
+                    entry = (rid, sid, on_w, period)
+                    if params.get("alignment", "custom_date") == "year_start":
+                        self.year_rules.append(entry)
+                    else:
+                        custom.append(entry)
+                elif rtype == "optional":
+                    by_flag.setdefault(params["flag"], set()).add(sid)
+                    fired.add(rid)
+                else:
+                    raise ValueError(f"Unknown schedule rule type: {rtype}")
+
+        # tydzień od kotwicy: każda faza okresu wspólnego (NWW okresów)
+        cycle: set[frozenset[str]] = {frozenset()}
+        if custom:
+            lcm = math.lcm(*(p for *_, p in custom))
+            cycle = set()
+            for w in range(lcm):
+                on = set()
+                for rid, sid, on_w, period in custom:
+                    if w % period < on_w:
+                        on.add(sid)
+                        fired.add(rid)
+                cycle.add(frozenset(on))
+
+        self.linked = linked
+        self.union = base.union(*cycle, *by_flag.values())
+        # wymiary niezależne od daty: faza kotwicy x flagi
+        combos = _combine(
+            {frozenset(base) & linked}, (s & linked for s in cycle)
+        )
+        for sids in by_flag.values():
+            combos = _combine(combos, (frozenset(), frozenset(sids) & linked))
+        self.combos = combos
+        self.fired = fired
+
+    def sets(
+        self, days: set[tuple[int, int]]
+    ) -> tuple[set[frozenset[str]], set[str]]:
+        """
+        (zbiory powiązanych suplementów, suma wszystkich zbiorów) dla dni
+        o parach (tydzień roku, dzień tygodnia) z `days`.
+        """
+        dated: set[frozenset[str]] = set()
+        for yw, wd in days:
+            on = set(self.by_weekday[wd])
+            for rid, sid, on_w, period in self.year_rules:
+                if yw % period < on_w:
+                    on.add(sid)
+                    self.fired.add(rid)
+            dated.add(frozenset(on))
+        union = self.union.union(*dated)
+        return _combine(self.combos, (s & self.linked for s in dated)), union
+
+
+def _removed_by(
+    M: dict[str, Any],
+    sid: str,
+    block_id: str,
+    events: tuple[str, ...],
+    before: set[str],
+) -> str:
+    for a, bs in M["CONFLICTS"]["supplement_exclusions"].items():
+        if a in before and sid in bs:
+            return f"supplement_exclusions.{a}"
+    if sid in M["CONFLICTS"]["block_exclusions"].get(block_id, ()):
+        return f"block_exclusions.{block_id}"
+    for ev_id in events:
+        override_id = M["EVENTS"][ev_id]["override_id"]
+        ov = M["CONFLICTS"]["event_overrides"][override_id]
+        if ov["effect"] == "remove_all" or sid not in ov["allowed_set"]:
+            return f"event_overrides.{override_id}"
+    return "CONFLICTS"
+
+
+def analyze_spec(M_raw: ModelSource) -> SpecAnalysis:
+    """
+    Raport problemów speca (FINDING_KINDS) dla dowolnych parametrów
+    runtime (kotwica, flagi); patrz docstring modułu.
+    """
+    M = prepare_model(M_raw)
+    supps = M["SUPPLEMENTS"]
+    core = set(M["CORE_SET"])
+    overrides = M["CONFLICTS"]["event_overrides"]
+    exclusions = _supplement_exclusion_pairs(M)
+    requires = {
+        sid: [
+            r
+            for c in spec.get("constraints", [])
+            if c["type"] == "require_supplements"
+            for r in c["params"]["supplement_ids"]
+        ]
+        for sid, spec in supps.items()
+    }
+    linked = {x for a, bs in exclusions for x in (a, *bs)}
+    for sid, spec in supps.items():
+        for c in spec.get("constraints", []):
+            if c["type"] in ("exclude_supplements", "require_supplements"):
+                linked.add(sid)
+                linked.update(c["params"]["supplement_ids"])
+
+    fired: set[str] = set()
+    schedules: dict[str, _Schedule] = {}
+    scheduled: set[str] = set()  # po apply_schedule_rules
+    constrained: set[str] = set()  # po constraints (+ event_only)
+    final: set[str] = set()
+    undone: dict[tuple[str, str, str], str] = {}
+    core_drops: dict[str, set[str]] = {}
+    n = 0
+
+    for month in range(1, 13):
+        block_id = M["BLOCK_CALENDAR"][month]
+        sched = schedules.get(block_id)
+        if sched is None:
+            sched = schedules[block_id] = _Schedule(
+                M, block_id, frozenset(linked), fired
+            )
+        for events, days in _day_classes(M, month).items():
+            f = _compile_day_filter(M, block_id, list(events), exclusions)
+            if f.add:
+                for sid in f.add:
+                    for rule in supps[sid].get("schedule_rules", []):
+                        if rule["type"] == "event_only" and (
+                            rule["params"]["event_id"] in events
+                        ):
+                            fired.add(str(rule.get("id", sid)))
+            combos, union = sched.sets(days)
+            scheduled |= union
+            # niepowiązane suplementy: jeden zbiór (każdy element osobno)
+            for s in [*combos, union - linked]:
+                n += 1
+                pre = _apply_constraints(M, month, block_id, set(s))
+                constrained |= pre | f.add
+                kept = set(pre)
+                for a, bs in f.exclusions:
+                    if a in kept:
+                        kept -= bs
+                kept = (kept - f.drop) | f.add
+                day = kept if f.keep is None else kept & f.keep
+                final |= day
+
+                where = f"month {month} ({block_id}), events {list(events)}"
+                for sid in pre & day:
+                    for r in requires[sid]:
+                        if r not in day:
+                            cause = _removed_by(M, r, block_id, events, pre)
+                            undone.setdefault((sid, r, cause), where)
+                if f.keep is not None:
+                    for ev_id in events:
+                        ov = overrides[M["EVENTS"][ev_id]["override_id"]]
+                        if ov["effect"] == "allow_only":
+                            dropped = (kept & core) - set(ov["allowed_set"])
+                            if dropped:
+                                core_drops.setdefault(
+                                    M["EVENTS"][ev_id]["override_id"], set()
+                                ).update(dropped)
+
+    findings: list[Finding] = []
+    for sid in supps:
+        if sid in final:
+            continue
+        if sid in constrained:
+            findings.append(
+                Finding("conflicted", sid, "always removed by CONFLICTS")
+            )
+        elif sid in scheduled:
+            findings.append(
+                Finding("unreachable", sid, "always removed by constraints")
+            )
+        else:
+            findings.append(
+                Finding("unreachable", sid, "no rule or CORE_SET adds it")
+            )
+    for sid, spec in supps.items():
+        for rule in spec.get("schedule_rules", []):
+            rid = str(rule.get("id", sid))
+            if rid not in fired:
+                findings.append(
+                    Finding(
+                        "rule_never_fires",
+                        rid,
+                        f"{rule['type']} rule of {sid}",
+                    )
+                )
+    for (sid, r, cause), where in undone.items():
+        findings.append(
+            Finding(
+                "require_undone",
+                sid,
+                f"requires {r}, removed by {cause} ({where})",
+            )
+        )
+    for override_id, dropped in core_drops.items():
+        findings.append(
+            Finding(
+                "allow_only_drops_core",
+                override_id,
+                f"drops CORE_SET: {sorted(dropped)}",
+            )
+        )
+    return SpecAnalysis(
+        findings=findings, signatures=n, reachable=frozenset(final)
+    )
+
+
+def main(argv: list[str] | None = None) -> None:
+    from .snapshot import DEFAULT_SPEC_PATH, compile_model
+
+    ap = argparse.ArgumentParser(
+        description="Static analysis of a spec over all day signatures."
+    )
+    ap.add_argument("spec", nargs="*", default=[str(DEFAULT_SPEC_PATH)])
+    args = ap.parse_args(argv)
+
+    failed = False
+    for path in args.spec:
+        result = analyze_spec(compile_model(path))
+        for f in result.findings:
+            print(f"{path}: {f.describe()}")
+        print(
+            f"{path}: {result.signatures} signatures, "
+            f"{len(result.findings)} findings"
+        )
+        failed = failed or not result.ok
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Startup benchmark (cold start) dla mailera / CLI.
+
+Każdy pomiar to świeży interpreter (jak cron / serverless):
+- import_ms: `import longevity.mailer`
+- first_plan_ms: spec + model + plan na horyzont maila
+- total_ms: cały proces (start interpretera -> wyjście)
+
+Uruchom: python -m longevity.bench [--runs N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+_CHILD = """
+import json, time
+t0 = time.perf_counter()
+import longevity.mailer as mailer
+t1 = time.perf_counter()
+from datetime import date, timedelta
+from longevity import spec
+from longevity.engine import assemble_model_from_globals, generate_plan_range
+start = date.today()
+generate_plan_range(
+    assemble_model_from_globals(spec),
+    start,
+    start + timedelta(days=mailer.HORIZON_DAYS - 1),
+    off_week_start_date=date(2026, 2, 2),
+    cycle_anchor_date=date(2026, 1, 6),
+    flags={"enable_melissa": True},
+)
+t2 = time.perf_counter()
+res = {"import_ms": (t1 - t0) * 1e3, "first_plan_ms": (t2 - t1) * 1e3}
+print(json.dumps(res))
+"""
+
+
+def _child_env() -> dict[str, str]:
+    src_dir = str(Path(__file__).resolve().parents[1])
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        p for p in [src_dir, env.get("PYTHONPATH", "")] if p
+    )
+    return env
+
+
+def measure_startup(runs: int = 5) -> dict[str, dict[str, float]]:
+    """
+    Zwraca {metric: {"min": ..., "median": ...}} w milisekundach.
+    """
+    env = _child_env()
+    samples: dict[str, list[float]] = {
+        "import_ms": [],
+        "first_plan_ms": [],
+        "total_ms": [],
+    }
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        out = subprocess.run(
+            [sys.executable, "-c", _CHILD],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        )
+        total = (time.perf_counter() - t0) * 1e3
+        res = json.loads(out.stdout.strip().splitlines()[-1])
+        samples["import_ms"].append(res["import_ms"])
+        samples["first_plan_ms"].append(res["first_plan_ms"])
+        samples["total_ms"].append(total)
+
+    return {
+        k: {"min": min(v), "median": statistics.median(v)}
+        for k, v in samples.items()
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    ap.add_argument("--runs", type=int, default=5)
+    args = ap.parse_args(argv)
+
+    report = measure_startup(args.runs)
+    print(f"startup benchmark ({args.runs} runs, ms)")
+    for k, v in report.items():
+        print(f"  {k:<14} min={v['min']:8.2f}  median={v['median']:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
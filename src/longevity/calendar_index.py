@@ -0,0 +1,102 @@
+"""
+Wspólne tablice kalendarza dla zakresu dat.
+
+Fakty o dniu (ordinal, rok, miesiąc, dzień miesiąca, dzień tygodnia,
+dzień roku) liczone raz na zakres - etapy
+pipeline'u pracują na indeksach dni i intach, a obiekt `date` powstaje
+dopiero przy budowie wyniku (day(i)).
+"""
+
+from __future__ import annotations
+
+import calendar
+from array import array
+from dataclasses import dataclass
+from datetime import date
+from functools import cached_property
+
+
+@dataclass(frozen=True)
+class CalendarIndex:
+    start: date
+    ordinals: range  # dzień i -> date.toordinal()
+    years: array  # 'H'
+    months: bytes  # 1..12
+    mdays: bytes  # 1..31
+    weekdays: bytes  # Mon=0..Sun=6
+    ydays: array  # 'H', 1..366
+    # kolejne miesiące zakresu: (year, month, lo, hi), hi wyłącznie
+    month_runs: tuple[tuple[int, int, int, int], ...]
+
+    @classmethod
+    def build(cls, start: date, end: date) -> CalendarIndex:
+        if start > end:
+            raise ValueError(f"start must be <= end: {start} > {end}")
+        o_end = end.toordinal()
+
+        years = array("H")
+        months = bytearray()
+        mdays = bytearray()
+        ydays = array("H")
+        runs: list[tuple[int, int, int, int]] = []
+
+        d = start
+        lo = 0
+        while True:
+            mlen = calendar.monthrange(d.year, d.month)[1]
+            last = min(mlen, d.day + o_end - d.toordinal())
+            n = last - d.day + 1
+            yday = d.toordinal() - date(d.year, 1, 1).toordinal() + 1
+
+            years.extend([d.year] * n)
+            months.extend([d.month] * n)
+            mdays.extend(range(d.day, last + 1))
+            ydays.extend(range(yday, yday + n))
+            runs.append((d.year, d.month, lo, lo + n))
+
+            lo += n
+            if last < mlen:
+                break
+            d = date(d.year + d.month // 12, d.month % 12 + 1, 1)
+            if d > end:
+                break
+
+        ordinals = range(start.toordinal(), o_end + 1)
+        weekdays = bytes((o - 1) % 7 for o in ordinals)
+
+        return cls(
+            start=start,
+            ordinals=ordinals,
+            years=years,
+            months=bytes(months),
+            mdays=bytes(mdays),
+            weekdays=weekdays,
+            ydays=ydays,
+            month_runs=tuple(runs),
+        )
+
+    def __len__(self) -> int:
+        return len(self.ordinals)
+
+    def day(self, i: int) -> date:
+        return date.fromordinal(self.ordinals[i])
+
+    def index_of(self, d: date) -> int:
+        i = d.toordinal() - self.ordinals.start
+        if not 0 <= i < len(self.ordinals):
+            raise ValueError(f"Day not found: {d.isoformat()}")
+        return i
+
+    def weeks_from(self, anchor: date) -> list[int]:
+        """
+        Pełne tygodnie od kotwicy (ujemne przed kotwicą).
+        """
+        a = anchor.toordinal()
+        return [(o - a) // 7 for o in self.ordinals]
+
+    @cached_property
+    def year_weeks(self) -> list[int]:
+        """
+        Pełne tygodnie od 1 stycznia danego roku.
+        """
+        return [(yd - 1) // 7 for yd in self.ydays]
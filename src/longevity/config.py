@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+from functools import lru_cache
+from typing import Any
+
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -32,4 +35,16 @@ class Settings(BaseSettings):
     random_seed: int = Field(default=42, description="Global random seed")
 
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Settings tworzone leniwie (przy pierwszym użyciu), nie przy imporcie.
+    """
+    return Settings()
+
+
+def __getattr__(name: str) -> Any:
+    # kompatybilność wsteczna: `from longevity.config import settings`
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,394 @@
+"""
+Demon wysyłki maili (zamiast crona z .github/workflows/daily_mail.yml;
+po wdrożeniu demona cron wyłącza zmienna repozytorium MAIL_DAEMON=true).
+
+Model speca i plany trzymane są w pamięci: plan liczony raz na okno
+PLAN_WINDOW_DAYS dni per zestaw parametrów, a odbiorcy z tymi samymi
+parametrami dzielą plan i treść maila. Wysyłki czekają w kopcu (heapq)
+jako momenty UTC wyliczone z lokalnej godziny odbiorcy (zoneinfo - bez
+przesunięcia przy zmianie czasu). Zmiana pliku speca albo pliku
+odbiorców -> przeliczenie tylko tego, co się zmieniło.
+
+Plik odbiorców:
+    {"anna": {"email": "a@example.com", "tz": "Europe/Warsaw",
+              "send_at": "06:00", "profile": {"cycle_anchor_date": ...}}}
+(profile jak w feed.parse_profile)
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import json
+import os
+import threading
+import time as _time
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, time, timedelta, tzinfo
+from pathlib import Path
+from typing import Any
+
+from .engine import PLAN_PARAM_KEYS, DayPlan, _ensure, generate_plan_range
+from .feed import parse_profile
+from .mailer import HORIZON_DAYS, build_message, day_mail
+from .snapshot import DEFAULT_SPEC_PATH, compile_model
+
+DEFAULT_RELOAD_SECONDS = 60.0
+RETRY_SECONDS = 300.0
+PLAN_WINDOW_DAYS = 120  # >= HORIZON_DAYS
+
+_RECIPIENT_KEYS = ("email", "tz", "send_at", "profile")
+
+# (nadawca, adresat, wiadomość z CRLF bez dot-stuffingu)
+Envelope = tuple[str, str, bytes]
+
+
+# =========================
+# RECIPIENTS
+# =========================
+
+
+@dataclass(frozen=True)
+class Recipient:
+    recipient_id: str
+    email: str
+    tz: tzinfo
+    send_at: time  # czas lokalny odbiorcy
+    params_key: str  # profil jako JSON - klucz współdzielonych planów
+    params: dict[str, Any]  # parametry generate_plan_range
+
+
+def parse_recipient(recipient_id: str, raw: dict[str, Any]) -> Recipient:
+    from zoneinfo import ZoneInfo
+
+    unknown = set(raw) - set(_RECIPIENT_KEYS)
+    _ensure(not unknown, f"Unknown recipient keys: {sorted(unknown)}")
+    _ensure(bool(raw.get("email")), f"Recipient {recipient_id} has no email")
+    profile = raw.get("profile", {})
+    parsed = parse_profile(profile)
+    return Recipient(
+        recipient_id=recipient_id,
+        email=str(raw["email"]),
+        tz=ZoneInfo(raw.get("tz", "UTC")),
+        send_at=time.fromisoformat(raw.get("send_at", "06:00")),
+        params_key=json.dumps(profile, sort_keys=True),
+        params={k: parsed[k] for k in PLAN_PARAM_KEYS if k in parsed},
+    )
+
+
+def load_recipients(path: str | os.PathLike[str]) -> dict[str, Recipient]:
+    with open(path, encoding="utf-8") as f:
+        raw = json.load(f)
+    _ensure(isinstance(raw, dict), "Recipients file must contain an object")
+    return {str(rid): parse_recipient(str(rid), r) for rid, r in raw.items()}
+
+
+def next_send(r: Recipient, after: datetime) -> datetime:
+    """
+    Pierwszy moment (UTC) późniejszy niż `after` z godziną r.send_at
+    czasu lokalnego odbiorcy.
+    """
+    day = after.astimezone(r.tz).date()
+    while True:
+        t = datetime.combine(day, r.send_at, tzinfo=r.tz)
+        if t > after:
+            return t.astimezone(UTC)
+        day += timedelta(days=1)
+
+
+# =========================
+# SMTP
+# =========================
+
+
+class SmtpTransport:
+    """
+    Jedno połączenie SMTP na paczkę maili. security: "ssl" (SMTP_SSL),
+    "starttls" albo "plain" (np. lokalny serwer testowy); logowanie
+    tylko, gdy podano użytkownika.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        *,
+        user: str = "",
+        password: str = "",
+        security: str = "ssl",
+    ):
+        _ensure(
+            security in ("ssl", "starttls", "plain"),
+            f"Unknown SMTP security: {security!r}",
+        )
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.security = security
+
+    def send_many(self, envelopes: list[Envelope]) -> list[bool]:
+        """
+        Błąd połączenia -> OSError (smtplib.SMTPException też nim jest);
+        odrzucenie pojedynczego maila -> False na jego pozycji.
+        """
+        import smtplib
+
+        cls = smtplib.SMTP_SSL if self.security == "ssl" else smtplib.SMTP
+        ok: list[bool] = []
+        with cls(self.host, self.port) as s:
+            if self.security == "starttls":
+                s.starttls()
+            if self.user:
+                s.login(self.user, self.password)
+            for sender, to, data in envelopes:
+                try:
+                    s.sendmail(sender, [to], data)
+                    ok.append(True)
+                except (
+                    smtplib.SMTPRecipientsRefused,
+                    smtplib.SMTPSenderRefused,
+                    smtplib.SMTPDataError,
+                ) as e:
+                    print(f"Send to {to} failed: {e}")
+                    ok.append(False)
+        return ok
+
+
+# =========================
+# SCHEDULER
+# =========================
+
+
+class MailScheduler:
+    """
+    Kopiec (moment UTC, seq, recipient_id, generacja, dzień ponowienia).
+    Zmiana odbiorcy podbija jego generację - stare wpisy kopca są
+    pomijane przy zdjęciu, bez przebudowy kopca.
+    """
+
+    def __init__(
+        self,
+        recipients_path: str | os.PathLike[str],
+        transport: SmtpTransport,
+        *,
+        spec_path: str | os.PathLike[str] = DEFAULT_SPEC_PATH,
+        sender: str = "longevity@localhost",
+    ):
+        self.recipients_path = Path(recipients_path)
+        self.spec_path = Path(spec_path)
+        self.transport = transport
+        self.sender = sender
+        self.recipients: dict[str, Recipient] = {}
+        self._heap: list[tuple[float, int, str, int, date | None]] = []
+        self._seq = itertools.count()
+        self._generation: dict[str, int] = {}
+        self._last_sent: dict[str, date] = {}  # id -> lokalny dzień
+        self._spec_stat: tuple[int, int] | None = None
+        self._recipients_stat: tuple[int, int] | None = None
+        self._model: dict[str, Any] = {}
+        # params_key -> plany okna; (params_key, dzień) -> mail bez "To:"
+        self._plans: dict[str, list[DayPlan]] = {}
+        self._mails: dict[tuple[str, date], bytes] = {}
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    @staticmethod
+    def _stat(path: Path) -> tuple[int, int]:
+        st = path.stat()
+        return st.st_mtime_ns, st.st_size
+
+    def reload(self, now: datetime) -> None:
+        """
+        Rekompilacja modelu (zmiana speca) i przeplanowanie tylko
+        zmienionych / nowych odbiorców.
+        """
+        spec_stat = self._stat(self.spec_path)
+        if spec_stat != self._spec_stat:
+            self._model = compile_model(self.spec_path)
+            self._plans.clear()
+            self._mails.clear()
+            self._spec_stat = spec_stat
+
+        stat = self._stat(self.recipients_path)
+        if stat == self._recipients_stat:
+            return
+        new = load_recipients(self.recipients_path)
+        for rid in set(self.recipients) - set(new):
+            self._generation[rid] += 1
+            self._last_sent.pop(rid, None)
+        for rid, r in new.items():
+            if self.recipients.get(rid) != r:
+                self._generation[rid] = self._generation.get(rid, 0) + 1
+                self._push(next_send(r, now), rid)
+        self.recipients = new
+        self._recipients_stat = stat
+
+    def _push(
+        self, at: datetime, rid: str, retry_day: date | None = None
+    ) -> None:
+        heapq.heappush(
+            self._heap,
+            (
+                at.timestamp(),
+                next(self._seq),
+                rid,
+                self._generation[rid],
+                retry_day,
+            ),
+        )
+
+    def next_wakeup(self) -> float | None:
+        return self._heap[0][0] if self._heap else None
+
+    def _day_plans(self, r: Recipient, day: date) -> list[DayPlan]:
+        plans = self._plans.get(r.params_key)
+        last = day + timedelta(days=HORIZON_DAYS - 1)
+        if plans is None or not plans[0].day <= day <= last <= plans[-1].day:
+            plans = self._plans[r.params_key] = generate_plan_range(
+                self._model,
+                day,
+                day + timedelta(days=PLAN_WINDOW_DAYS - 1),
+                **r.params,
+            )
+        i = (day - plans[0].day).days
+        return plans[i : i + HORIZON_DAYS]
+
+    def _mail(self, r: Recipient, day: date) -> bytes:
+        """
+        Wiadomość spłaszczona raz na (parametry, dzień); odbiorca dokleja
+        tylko nagłówek To (budowa EmailMessage to ~2 ms na mail).
+        """
+        key = (r.params_key, day)
+        mail = self._mails.get(key)
+        if mail is None:
+            from email.policy import SMTP
+
+            plans = self._day_plans(r, day)
+            subject, body, attachment = day_mail(plans[0], plans)
+            msg = build_message(
+                from_email=self.sender,
+                to_email=None,
+                subject=subject,
+                body=body,
+                attachment_txt=attachment,
+            )
+            mail = self._mails[key] = msg.as_bytes(policy=SMTP)
+        return mail
+
+    def run_due(self, now: datetime) -> int:
+        """
+        Wysyłka wszystkich wpisów z momentem <= now (jedno połączenie
+        SMTP); zwraca liczbę wysłanych maili.
+        """
+        ts = now.timestamp()
+        due: list[tuple[Recipient, date]] = []
+        while self._heap and self._heap[0][0] <= ts:
+            at, _, rid, gen, retry_day = heapq.heappop(self._heap)
+            if self._generation.get(rid) != gen:
+                continue
+            r = self.recipients[rid]
+            if retry_day is None:
+                fired = datetime.fromtimestamp(at, UTC)
+                day = fired.astimezone(r.tz).date()
+                self._push(next_send(r, fired), rid)
+            else:
+                day = retry_day
+            if self._last_sent.get(rid) != day:
+                due.append((r, day))
+        if not due:
+            return 0
+
+        batch: list[tuple[Recipient, date, Envelope]] = []
+        for r, day in due:
+            try:
+                mail = self._mail(r, day)
+            except ValueError as e:
+                print(f"[{r.recipient_id}] plan error: {e}")
+                continue
+            data = f"To: {r.email}\r\n".encode() + mail
+            batch.append((r, day, (self.sender, r.email, data)))
+
+        try:
+            ok = self.transport.send_many([e for _, _, e in batch])
+        except OSError as e:
+            print(f"SMTP error, retrying in {RETRY_SECONDS:.0f}s: {e}")
+            retry = now + timedelta(seconds=RETRY_SECONDS)
+            for r, day, _ in batch:
+                if retry.astimezone(r.tz).date() == day:
+                    self._push(retry, r.recipient_id, retry_day=day)
+            return 0
+
+        sent = 0
+        for (r, day, _), done in zip(batch, ok, strict=True):
+            if done:
+                self._last_sent[r.recipient_id] = day
+                sent += 1
+        # treści z dni, które już minęły we wszystkich strefach
+        oldest = min(day for _, day in due) - timedelta(days=1)
+        for key in [k for k in self._mails if k[1] < oldest]:
+            del self._mails[key]
+        return sent
+
+    def run(
+        self,
+        *,
+        stop: threading.Event | None = None,
+        reload_seconds: float = DEFAULT_RELOAD_SECONDS,
+    ) -> None:
+        stop = stop if stop is not None else threading.Event()
+        next_reload = 0.0
+        while not stop.is_set():
+            now = datetime.now(UTC)
+            if now.timestamp() >= next_reload:
+                try:
+                    self.reload(now)
+                except (OSError, ValueError) as e:
+                    print(f"Reload failed: {e}")
+                next_reload = now.timestamp() + reload_seconds
+            self.run_due(now)
+            wake = next_reload
+            top = self.next_wakeup()
+            if top is not None:
+                wake = min(wake, top)
+            stop.wait(max(0.0, wake - _time.time()))
+
+
+def main(argv: list[str] | None = None) -> None:
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Daily plan mail daemon.")
+    ap.add_argument("recipients", help="JSON file: recipient_id -> config")
+    ap.add_argument("--spec", default=str(DEFAULT_SPEC_PATH))
+    ap.add_argument("--sender", default=os.environ.get("SMTP_USER", ""))
+    ap.add_argument(
+        "--security", choices=("ssl", "starttls", "plain"), default="ssl"
+    )
+    ap.add_argument(
+        "--reload-seconds", type=float, default=DEFAULT_RELOAD_SECONDS
+    )
+    args = ap.parse_args(argv)
+
+    transport = SmtpTransport(
+        os.environ.get("SMTP_HOST", "localhost"),
+        int(os.environ.get("SMTP_PORT", "465")),
+        user=os.environ.get("SMTP_USER", ""),
+        password=os.environ.get("SMTP_PASS", ""),
+        security=args.security,
+    )
+    scheduler = MailScheduler(
+        args.recipients,
+        transport,
+        spec_path=args.spec,
+        sender=args.sender or "longevity@localhost",
+    )
+    print(f"Mail daemon start ({args.recipients})")
+    try:
+        scheduler.run(reload_seconds=args.reload_seconds)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
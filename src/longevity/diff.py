@@ -0,0 +1,176 @@
+"""
+Różnice między dwiema osiami czasu (np. stara i nowa wersja spec albo
+nowe parametry użytkownika).
+
+Porównanie idzie po kompaktowych danych Timeline: maska suplementów
+(int), indeks bloku i indeks zestawu eventów na dzień. Dzień bez zmian
+kosztuje trzy porównania intów; DayDiff powstaje tylko dla dni zmienionych.
+iter_timeline_diff strumieniuje wynik po dniach.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from datetime import date
+
+from .timeline import Timeline
+
+
+@dataclass(frozen=True)
+class DayDiff:
+    day: date
+    added: tuple[str, ...]
+    removed: tuple[str, ...]
+    old_block_id: str | None  # None = dzień spoza starej osi
+    new_block_id: str | None  # None = dzień spoza nowej osi
+    events_added: tuple[str, ...]
+    events_removed: tuple[str, ...]
+
+    @property
+    def block_changed(self) -> bool:
+        return self.old_block_id != self.new_block_id
+
+
+@dataclass
+class DiffSummary:
+    changed_days: int = 0
+    block_changes: int = 0
+    event_changes: int = 0
+    first_changed: date | None = None
+    last_changed: date | None = None
+    # supplement_id -> liczba dni
+    added: dict[str, int] = field(default_factory=dict)
+    removed: dict[str, int] = field(default_factory=dict)
+
+    def _count(self, dd: DayDiff) -> None:
+        self.changed_days += 1
+        if self.first_changed is None:
+            self.first_changed = dd.day
+        self.last_changed = dd.day
+        if dd.block_changed:
+            self.block_changes += 1
+        if dd.events_added or dd.events_removed:
+            self.event_changes += 1
+        for sid in dd.added:
+            self.added[sid] = self.added.get(sid, 0) + 1
+        for sid in dd.removed:
+            self.removed[sid] = self.removed.get(sid, 0) + 1
+
+
+@dataclass(frozen=True)
+class TimelineDiff:
+    days: list[DayDiff]
+    summary: DiffSummary
+
+    def __bool__(self) -> bool:
+        return bool(self.days)
+
+    def changed_days(self) -> list[date]:
+        return [dd.day for dd in self.days]
+
+
+class _Side:
+    """
+    Jedna oś czasu przemapowana na wspólne słowniki (bity suplementów,
+    bloki, zestawy eventów) - porównanie dni to porównanie intów.
+    """
+
+    def __init__(
+        self,
+        tl: Timeline,
+        bit: dict[str, int],
+        block_code: dict[str, int],
+        event_code: dict[frozenset[str], int],
+    ):
+        self.offset = tl.start.toordinal()
+        if tuple(bit) == tl.supplement_ids:
+            self.masks = tl.masks  # ta sama kolejność bitów
+        else:
+            remap: dict[int, int] = {}
+            self.masks = []
+            for m in tl.masks:
+                r = remap.get(m)
+                if r is None:
+                    r = 0
+                    for b, sid in enumerate(tl.supplement_ids):
+                        if m >> b & 1:
+                            r |= bit[sid]
+                    remap[m] = r
+                self.masks.append(r)
+        blocks = [
+            block_code.setdefault(b, len(block_code)) for b in tl.block_ids
+        ]
+        self.blocks = [blocks[b] for b in tl.blocks]
+        codes = [
+            event_code.setdefault(frozenset(es), len(event_code))
+            for es in tl.event_sets
+        ]
+        self.events = [codes[e] for e in tl.events]
+
+    def at(self, ordinal: int) -> tuple[int, int, int] | None:
+        i = ordinal - self.offset
+        if not 0 <= i < len(self.masks):
+            return None
+        return self.masks[i], self.blocks[i], self.events[i]
+
+
+def iter_timeline_diff(old: Timeline, new: Timeline) -> Iterator[DayDiff]:
+    """
+    DayDiff dla każdego zmienionego dnia z sumy zakresów obu osi,
+    w kolejności dni.
+    """
+    ids = list(new.supplement_ids) + [
+        sid for sid in old.supplement_ids if sid not in new.supplement_ids
+    ]
+    bit = {sid: 1 << i for i, sid in enumerate(ids)}
+    block_code: dict[str, int] = {}
+    event_code: dict[frozenset[str], int] = {}
+    a = _Side(old, bit, block_code, event_code)
+    b = _Side(new, bit, block_code, event_code)
+    block_of = list(block_code)
+    events_of = list(event_code)
+
+    lo = min(old.start, new.start).toordinal()
+    hi = max(old.end, new.end).toordinal()
+    for o in range(lo, hi + 1):
+        x, y = a.at(o), b.at(o)
+        if x == y:
+            continue
+        mx, bx, ex = x if x is not None else (0, -1, -1)
+        my, by, ey = y if y is not None else (0, -1, -1)
+        evx = events_of[ex] if ex >= 0 else frozenset()
+        evy = events_of[ey] if ey >= 0 else frozenset()
+        yield DayDiff(
+            day=date.fromordinal(o),
+            added=tuple(sid for sid in ids if bit[sid] & my & ~mx),
+            removed=tuple(sid for sid in ids if bit[sid] & mx & ~my),
+            old_block_id=block_of[bx] if bx >= 0 else None,
+            new_block_id=block_of[by] if by >= 0 else None,
+            events_added=tuple(sorted(evy - evx)),
+            events_removed=tuple(sorted(evx - evy)),
+        )
+
+
+def diff_timelines(old: Timeline, new: Timeline) -> TimelineDiff:
+    """
+    Pełny wynik iter_timeline_diff + podsumowanie. Dla identycznych osi
+    (te same słowniki i dane) kończy się na porównaniu bajtów.
+    """
+    if (
+        old.start == new.start
+        and old.supplement_ids == new.supplement_ids
+        and old.block_ids == new.block_ids
+        and old.event_sets == new.event_sets
+        and old.blocks == new.blocks
+        and old.events == new.events
+        and old.masks == new.masks
+    ):
+        return TimelineDiff(days=[], summary=DiffSummary())
+
+    days: list[DayDiff] = []
+    summary = DiffSummary()
+    for dd in iter_timeline_diff(old, new):
+        days.append(dd)
+        summary._count(dd)
+    return TimelineDiff(days=days, summary=summary)
@@ -1,12 +1,47 @@
 from __future__ import annotations
 
 import calendar
-import csv
-import hashlib
+import os
 import re
+from collections.abc import Iterable, Iterator, Mapping
 from dataclasses import dataclass
-from datetime import date, datetime, timedelta
-from typing import Any, cast
+from datetime import UTC, date, datetime, timedelta
+from typing import TYPE_CHECKING, Any, TypeAlias, TypedDict, cast
+
+from .calendar_index import CalendarIndex
+
+if TYPE_CHECKING:
+    from .overlay import ModelOverlay
+
+# Znacznik modelu już zwalidowanego i znormalizowanego (np. ze snapshotu).
+NORMALIZED_KEY = "__normalized__"
+# supplement_id -> ranga w globalnej kolejności pozycji dnia
+# (liczona w normalize_model; patrz _item_ranks)
+ITEM_RANK_KEY = "__item_rank__"
+
+# Model: surowy dict (assemble_model_from_globals), dict znormalizowany,
+# ścieżka do snapshotu (longevity.snapshot) albo nakładka użytkownika
+# (longevity.overlay).
+ModelSource: TypeAlias = (
+    "dict[str, Any] | str | os.PathLike[str] | ModelOverlay"
+)
+
+
+class PlanParams(TypedDict, total=False):
+    """
+    Parametry runtime generate_plan_range / generate_timeline (kwargs).
+    """
+
+    off_week_start_date: date | Iterable[date] | None
+    off_week_week_of_year: int | Iterable[int] | None
+    cycle_anchor_date: date | None
+    flags: dict[str, bool] | None
+    skip_windows: Iterable[tuple[date, date]] | None
+
+
+# nazwy parametrów runtime (np. klucze profilu w feed / demonie maili)
+PLAN_PARAM_KEYS: tuple[str, ...] = tuple(PlanParams.__annotations__)
+
 
 # =========================
 # OUTPUT TYPES
@@ -161,6 +196,48 @@ def validate_model(M: dict[str, Any]) -> None:
         )
 
 
+def normalize_supplement(spec: dict[str, Any]) -> dict[str, Any]:
+    """
+    Normalizacja jednego wpisu SUPPLEMENTS (kopie, bez mutowania wejścia).
+    """
+    spec2 = dict(spec)
+
+    # constraints
+    cons2 = []
+    for c in spec2.get("constraints", []):
+        c2 = dict(c)
+        params = dict(c2.get("params", {}))
+        if "blocks" in params:
+            params["blocks"] = _to_sorted_list(params["blocks"])
+        if "supplement_ids" in params:
+            params["supplement_ids"] = _to_sorted_list(
+                params["supplement_ids"]
+            )
+        if "months_included" in params:
+            params["months_included"] = _to_sorted_list(
+                params["months_included"]
+            )
+        c2["params"] = params
+        cons2.append(c2)
+    spec2["constraints"] = cons2
+
+    # schedule_rules
+    rules2 = []
+    for r in spec2.get("schedule_rules", []):
+        r2 = dict(r)
+        r2["active_blocks"] = _to_sorted_list(r2.get("active_blocks"))
+        params = dict(r2.get("params", {}))
+        if "days_included" in params:
+            params["days_included"] = _to_sorted_list(params["days_included"])
+        if "fixed_days" in params:
+            params["fixed_days"] = _to_sorted_list(params["fixed_days"])
+        r2["params"] = params
+        rules2.append(r2)
+    spec2["schedule_rules"] = rules2
+
+    return spec2
+
+
 def normalize_model(M: dict[str, Any]) -> dict[str, Any]:
     """
     Normalizacja BEZ mutowania M wejściowego.
@@ -168,8 +245,11 @@ def normalize_model(M: dict[str, Any]) -> dict[str, Any]:
     """
     N: dict[str, Any] = dict(M)
 
-    # Copy subtrees we mutate
-    N["SUPPLEMENTS"] = {k: dict(v) for k, v in M["SUPPLEMENTS"].items()}
+    # Copy subtrees we mutate (SUPPLEMENTS: kopie w normalize_supplement)
+    N["SUPPLEMENTS"] = {
+        sid: normalize_supplement(spec)
+        for sid, spec in M["SUPPLEMENTS"].items()
+    }
     N["EVENTS"] = {k: dict(v) for k, v in M["EVENTS"].items()}
     N["CONFLICTS"] = dict(M["CONFLICTS"])
 
@@ -177,55 +257,36 @@ def normalize_model(M: dict[str, Any]) -> dict[str, Any]:
     if isinstance(N["CORE_SET"], set):
         N["CORE_SET"] = sorted(list(N["CORE_SET"]))
 
-    # Normalize SUPPLEMENTS internals
-    for sid, spec in list(N["SUPPLEMENTS"].items()):
-        spec2 = dict(spec)
-
-        # constraints
-        cons2 = []
-        for c in spec2.get("constraints", []):
-            c2 = dict(c)
-            params = dict(c2.get("params", {}))
-            if "blocks" in params:
-                params["blocks"] = _to_sorted_list(params["blocks"])
-            if "supplement_ids" in params:
-                params["supplement_ids"] = _to_sorted_list(
-                    params["supplement_ids"]
-                )
-            if "months_included" in params:
-                params["months_included"] = _to_sorted_list(
-                    params["months_included"]
-                )
-            c2["params"] = params
-            cons2.append(c2)
-        spec2["constraints"] = cons2
-
-        # schedule_rules
-        rules2 = []
-        for r in spec2.get("schedule_rules", []):
-            r2 = dict(r)
-            r2["active_blocks"] = _to_sorted_list(r2.get("active_blocks"))
-            params = dict(r2.get("params", {}))
-            if "days_included" in params:
-                params["days_included"] = _to_sorted_list(
-                    params["days_included"]
-                )
-            if "fixed_days" in params:
-                params["fixed_days"] = _to_sorted_list(params["fixed_days"])
-            r2["params"] = params
-            rules2.append(r2)
-        spec2["schedule_rules"] = rules2
-
-        N["SUPPLEMENTS"][sid] = spec2
-
     # Normalize EVENTS months
     for _, ev in N["EVENTS"].items():
         if isinstance(ev.get("months"), set):
             ev["months"] = sorted(list(ev["months"]))
 
+    N[ITEM_RANK_KEY] = compute_item_ranks(N)
+    N[NORMALIZED_KEY] = True
     return N
 
 
+def prepare_model(M_raw: ModelSource) -> dict[str, Any]:
+    """
+    Model gotowy dla generatora:
+    - ścieżka -> snapshot (rekompilacja, gdy nieaktualny),
+    - dict znormalizowany -> bez zmian (bez ponownej walidacji i kopii),
+    - ModelOverlay (longevity.overlay) -> baza + delta użytkownika,
+    - surowy dict -> validate_model + normalize_model.
+    """
+    if isinstance(M_raw, (str, os.PathLike)):
+        from .snapshot import load_model
+
+        return load_model(M_raw)
+    if not isinstance(M_raw, dict):
+        return M_raw.materialize()
+    if M_raw.get(NORMALIZED_KEY):
+        return M_raw
+    validate_model(M_raw)
+    return normalize_model(M_raw)
+
+
 # =========================
 # EVENT RESOLUTION
 # =========================
@@ -269,6 +330,31 @@ def _event_days_for_month(
     return resolved[:desired_len]
 
 
+def _event_priority_key(M: dict[str, Any]) -> Any:
+    return lambda e: int(M["EVENTS"][e].get("priority", 0))
+
+
+def _events_by_day(M: dict[str, Any], cal: CalendarIndex) -> list[list[str]]:
+    """
+    active_events_on_day dla całego zakresu: dni eventów liczone raz na
+    (miesiąc, event), nie raz na dzień.
+    """
+    out: list[list[str]] = [[] for _ in range(len(cal))]
+    o0 = cal.ordinals.start
+    for y, m, lo, hi in cal.month_runs:
+        for ev_id, ev in M["EVENTS"].items():
+            if ev["type"] == "pulse" and m in ev["months"]:
+                for x in _event_days_for_month(M, y, m, ev):
+                    i = x.toordinal() - o0
+                    if lo <= i < hi:
+                        out[i].append(ev_id)
+    key = _event_priority_key(M)
+    for evs in out:
+        if len(evs) > 1:
+            evs.sort(key=key, reverse=True)
+    return out
+
+
 def active_events_on_day(M: dict[str, Any], d: date) -> list[str]:
     evs: list[str] = []
     for ev_id, ev in M["EVENTS"].items():
@@ -276,9 +362,7 @@ def active_events_on_day(M: dict[str, Any], d: date) -> list[str]:
             days = _event_days_for_month(M, d.year, d.month, ev)
             if d in days:
                 evs.append(ev_id)
-    evs.sort(
-        key=lambda e: int(M["EVENTS"][e].get("priority", 0)), reverse=True
-    )
+    evs.sort(key=_event_priority_key(M), reverse=True)
     return evs
 
 
@@ -288,6 +372,11 @@ def active_events_on_day(M: dict[str, Any], d: date) -> list[str]:
 
 
 def base_by_block(M: dict[str, Any], d: date, block_id: str) -> set[str]:
+    return _block_base(M, block_id)
+
+
+def _block_base(M: dict[str, Any], block_id: str) -> set[str]:
+    # baza nie zależy od daty - pętla dni nie buduje obiektów date
     return set(M["CORE_SET"])  # CORE daily (can be removed by OFF WEEK)
 
 
@@ -299,7 +388,35 @@ def apply_schedule_rules(
     flags: dict[str, bool],
     cycle_anchor_date: date | None,
 ) -> set[str]:
-    wd = _weekday_index(d)
+    return _apply_schedule_rules(
+        M,
+        block_id,
+        current,
+        flags,
+        wd=_weekday_index(d),
+        year_week=_weeks_between(date(d.year, 1, 1), d),
+        cycle_week=(
+            None
+            if cycle_anchor_date is None
+            else _weeks_between(cycle_anchor_date, d)
+        ),
+    )
+
+
+def _apply_schedule_rules(
+    M: dict[str, Any],
+    block_id: str,
+    current: set[str],
+    flags: dict[str, bool],
+    *,
+    wd: int,
+    year_week: int,
+    cycle_week: int | None,
+) -> set[str]:
+    """
+    apply_schedule_rules na faktach kalendarza (CalendarIndex) zamiast
+    na obiekcie date; *_week = pełne tygodnie od kotwicy.
+    """
 
     def blocks_ok(active_blocks: list[str] | None) -> bool:
         if active_blocks is None:
@@ -331,23 +448,23 @@ def apply_schedule_rules(
             elif rtype == "cycle_weeks":
                 align = params.get("alignment", "custom_date")
 
-                anchor: date
+                weeks: int
                 if align == "year_start":
-                    anchor = date(d.year, 1, 1)
+                    weeks = year_week
                 elif align == "custom_date":
                     _ensure(
-                        cycle_anchor_date is not None,
+                        cycle_week is not None,
                         "cycle_anchor_date required",
                     )
-                    assert cycle_anchor_date is not None
-                    anchor = cycle_anchor_date
+                    assert cycle_week is not None
+                    weeks = cycle_week
                 else:
                     raise ValueError(f"Unknown alignment: {align}")
 
                 on_w = int(params["on_weeks"])
                 off_w = int(params["off_weeks"])
                 period = on_w + off_w
-                w = _weeks_between(anchor, d) % period
+                w = weeks % period
                 if w < on_w:
                     current.add(sid)
 
@@ -367,6 +484,12 @@ def apply_schedule_rules(
 
 def apply_constraints(
     M: dict[str, Any], d: date, block_id: str, current: set[str]
+) -> set[str]:
+    return _apply_constraints(M, d.month, block_id, current)
+
+
+def _apply_constraints(
+    M: dict[str, Any], month: int, block_id: str, current: set[str]
 ) -> set[str]:
     # fixed-point because require_supplements can add items
     changed = True
@@ -387,7 +510,7 @@ def apply_constraints(
                         current.discard(sid)
 
                 elif ctype == "seasonal":
-                    if d.month not in params["months_included"]:
+                    if month not in params["months_included"]:
                         current.discard(sid)
 
                 elif ctype == "exclude_supplements":
@@ -461,42 +584,242 @@ def apply_events(
     return current
 
 
-def apply_global_exceptions(
+@dataclass(frozen=True)
+class _DayFilter:
+    """
+    apply_supplement_exclusions + apply_block_exclusions + apply_events
+    złożone raz na (block_id, zestaw eventów); kolejność etapów bez zmian.
+    """
+
+    exclusions: tuple[tuple[str, frozenset[str]], ...]  # (a, usuwane bs)
+    drop: frozenset[str]  # block_exclusions bloku
+    add: frozenset[str]  # suplementy event_only aktywnych eventów
+    keep: frozenset[str] | None  # przecięcie overrides; None = bez limitu
+
+    def apply(self, current: set[str]) -> set[str]:
+        for a, bs in self.exclusions:
+            if a in current:
+                current -= bs
+        current = (current - self.drop) | self.add
+        return current if self.keep is None else current & self.keep
+
+
+def _supplement_exclusion_pairs(
     M: dict[str, Any],
-    d: date,
-    current: set[str],
+) -> tuple[tuple[str, frozenset[str]], ...]:
+    return tuple(
+        (a, frozenset(bs))
+        for a, bs in M["CONFLICTS"]["supplement_exclusions"].items()
+    )
+
+
+def _compile_day_filter(
+    M: dict[str, Any],
+    block_id: str,
     events: list[str],
-    off_week_start_date: date | None,
-    off_week_week_of_year: int | None,
-) -> set[str]:
+    exclusions: tuple[tuple[str, frozenset[str]], ...] | None = None,
+) -> _DayFilter:
+    active = set(events)
+    add = frozenset(
+        sid
+        for sid, spec in M["SUPPLEMENTS"].items()
+        for rule in spec.get("schedule_rules", [])
+        if rule["type"] == "event_only"
+        and rule["params"]["event_id"] in active
+    )
+
+    keep: frozenset[str] | None = None
+    for ev_id in events:
+        override_id = M["EVENTS"][ev_id]["override_id"]
+        override = M["CONFLICTS"]["event_overrides"][override_id]
+        effect = override["effect"]
+        if effect == "allow_only":
+            allowed = frozenset(override["allowed_set"])
+            keep = allowed if keep is None else keep & allowed
+        elif effect == "remove_all":
+            keep = frozenset()
+        else:
+            raise ValueError(f"Unknown override effect: {effect}")
+
+    return _DayFilter(
+        exclusions=(
+            _supplement_exclusion_pairs(M)
+            if exclusions is None
+            else exclusions
+        ),
+        drop=frozenset(M["CONFLICTS"]["block_exclusions"].get(block_id, ())),
+        add=add,
+        keep=keep,
+    )
+
+
+@dataclass(frozen=True)
+class ExceptionInterval:
+    start: date
+    end: date  # włącznie
+    exception_id: str
+    effect: str
+    forbidden_events: frozenset[str]
+
+
+def _as_list(x: Any) -> list[Any]:
+    if x is None:
+        return []
+    if isinstance(x, (date, int)):
+        return [x]
+    return list(x)
+
+
+def _events_in_interval(M: dict[str, Any], lo: date, hi: date) -> set[str]:
+    """
+    Eventy aktywne w dowolnym dniu [lo, hi] - liczone per miesiąc,
+    nie per dzień.
+    """
+    found: set[str] = set()
+    y, m = lo.year, lo.month
+    while (y, m) <= (hi.year, hi.month):
+        for ev_id, ev in M["EVENTS"].items():
+            if ev_id in found or ev["type"] != "pulse":
+                continue
+            if m in ev["months"] and any(
+                lo <= x <= hi for x in _event_days_for_month(M, y, m, ev)
+            ):
+                found.add(ev_id)
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+    return found
+
+
+def resolve_exception_intervals(
+    M: dict[str, Any],
+    start: date,
+    end: date,
+    *,
+    off_week_start_date: date | Iterable[date] | None = None,
+    off_week_week_of_year: int | Iterable[int] | None = None,
+    skip_windows: Iterable[tuple[date, date]] | None = None,
+    check_events: bool = True,
+) -> list[ExceptionInterval]:
+    """
+    GLOBAL_EXCEPTIONS + parametry runtime -> posortowane przedziały dni
+    (przycięte do [start, end]):
+    - off_week_start_date: jeden lub wiele poniedziałków,
+    - off_week_week_of_year: numer(y) tygodnia ISO, w każdym roku zakresu,
+    - skip_windows: okna użytkownika (np. urlop) [od, do] włącznie.
+    hard_exclusion_of_events sprawdzane raz na przedział (check_events).
+    """
+    starts = _as_list(off_week_start_date)
+    for s in starts:
+        _ensure(
+            s.weekday() == 0,
+            "off_week_start_date must be a Monday (weekday=0)",
+        )
+    weeks = _as_list(off_week_week_of_year)
+    for w in weeks:
+        _ensure(1 <= int(w) <= 53, f"Invalid off_week_week_of_year: {w}")
+
+    out: list[ExceptionInterval] = []
     for ex in M["GLOBAL_EXCEPTIONS"]:
         if ex["type"] != "off_week":
             continue
+        dur = int(ex["duration_days"])
+        ex_starts = list(starts)
+        # tydzień ISO roku y może zaczynać się w grudniu roku y - 1 (np.
+        # 1. tydzień 2030 = 2029-12-31), stąd end.year + 1; przycięcie
+        # do [start, end] niżej
+        first_year = (start - timedelta(days=dur)).year
+        for y in range(first_year, end.year + 2):
+            for w in weeks:
+                try:
+                    ex_starts.append(date.fromisocalendar(y, int(w), 1))
+                except ValueError:
+                    continue  # rok bez 53. tygodnia ISO
+        for s in dict.fromkeys(ex_starts):
+            lo = max(s, start)
+            hi = min(s + timedelta(days=dur - 1), end)
+            if lo <= hi:
+                out.append(
+                    ExceptionInterval(
+                        start=lo,
+                        end=hi,
+                        exception_id=str(ex.get("id", "off_week")),
+                        effect=ex["effect"],
+                        forbidden_events=frozenset(
+                            ex.get("hard_exclusion_of_events", ())
+                        ),
+                    )
+                )
 
-        in_off = False
-        if off_week_start_date is not None:
-            start = off_week_start_date
-            end = start + timedelta(days=int(ex["duration_days"]) - 1)
-            in_off = start <= d <= end
-        elif off_week_week_of_year is not None:
-            raise NotImplementedError(
-                "off_week_week_of_year not implemented; "
-                "use off_week_start_date"
+    for a, b in skip_windows or ():
+        _ensure(a <= b, f"skip window start after end: {a} > {b}")
+        lo, hi = max(a, start), min(b, end)
+        if lo <= hi:
+            out.append(
+                ExceptionInterval(
+                    start=lo,
+                    end=hi,
+                    exception_id="skip_window",
+                    effect="remove_all",
+                    forbidden_events=frozenset(),
+                )
             )
 
-        if in_off:
-            forbidden = set(ex.get("hard_exclusion_of_events", set()))
-            overlap = forbidden.intersection(set(events))
+    for iv in out:
+        if iv.effect != "remove_all":
+            raise ValueError(f"Unknown GLOBAL_EXCEPTIONS effect: {iv.effect}")
+        if check_events and iv.forbidden_events:
+            overlap = iv.forbidden_events & _events_in_interval(
+                M, iv.start, iv.end
+            )
             _ensure(
                 len(overlap) == 0,
-                f"OFF WEEK overlaps forbidden events: {overlap}",
+                f"OFF WEEK overlaps forbidden events: {set(overlap)}",
             )
 
-            if ex["effect"] == "remove_all":
-                return set()
-            raise ValueError(
-                f"Unknown GLOBAL_EXCEPTIONS effect: {ex['effect']}"
-            )
+    out.sort(key=lambda iv: (iv.start, iv.end))
+    return out
+
+
+def _merge_intervals(
+    intervals: list[ExceptionInterval],
+) -> list[tuple[date, date]]:
+    merged: list[tuple[date, date]] = []
+    for iv in intervals:  # posortowane po start
+        if merged and iv.start <= merged[-1][1] + timedelta(days=1):
+            merged[-1] = (merged[-1][0], max(merged[-1][1], iv.end))
+        else:
+            merged.append((iv.start, iv.end))
+    return merged
+
+
+def apply_global_exceptions(
+    M: dict[str, Any],
+    d: date,
+    current: set[str],
+    events: list[str],
+    off_week_start_date: date | Iterable[date] | None,
+    off_week_week_of_year: int | Iterable[int] | None,
+    skip_windows: Iterable[tuple[date, date]] | None = None,
+) -> set[str]:
+    """
+    Wariant jednodniowy (explain / pojedyncze wywołania). Generator
+    rozwiązuje wyjątki raz na zakres (resolve_exception_intervals).
+    """
+    for iv in resolve_exception_intervals(
+        M,
+        d,
+        d,
+        off_week_start_date=off_week_start_date,
+        off_week_week_of_year=off_week_week_of_year,
+        skip_windows=skip_windows,
+        check_events=False,
+    ):
+        overlap = iv.forbidden_events.intersection(events)
+        _ensure(
+            len(overlap) == 0,
+            f"OFF WEEK overlaps forbidden events: {set(overlap)}",
+        )
+        # effect == "remove_all" (sprawdzone w resolve_exception_intervals)
+        return set()
 
     return current
 
@@ -506,7 +829,7 @@ def apply_global_exceptions(
 # =========================
 
 
-def _items_from_ids(M: dict[str, Any], ids: set[str]) -> list[DayItem]:
+def _items_from_ids(M: dict[str, Any], ids: Iterable[str]) -> list[DayItem]:
     items: list[DayItem] = []
     for sid in ids:
         spec = M["SUPPLEMENTS"][sid]
@@ -524,79 +847,218 @@ def _items_from_ids(M: dict[str, Any], ids: set[str]) -> list[DayItem]:
     return items
 
 
-def _sort_items(M: dict[str, Any], items: list[DayItem]) -> list[DayItem]:
+def compute_item_ranks(M: dict[str, Any]) -> dict[str, int]:
+    """
+    Kolejność pozycji dnia (timing_hint_order, priorytet malejąco,
+    supplement_id) jest porządkiem liniowym na suplementach - liczona
+    raz na model jako ranga int.
+    """
     order = M["NORMALIZATION_RULES"]["ordering"]["timing_hint_order"]
     timing_rank = {v: i for i, v in enumerate(order)}
 
-    def key(it: DayItem):
-        tr = timing_rank.get(it.timing_hint, len(order))
-        return (tr, -it.priority, it.supplement_id)
+    def key(sid: str) -> tuple[int, int, str]:
+        spec = M["SUPPLEMENTS"][sid]
+        dose = spec.get("default_dose")
+        timing = dose.get("timing_hint") if isinstance(dose, dict) else None
+        tr = timing_rank.get(timing, len(order))
+        return (tr, -int(spec.get("priority", 0)), sid)
 
-    return sorted(items, key=key)
+    return {sid: r for r, sid in enumerate(sorted(M["SUPPLEMENTS"], key=key))}
 
 
-def generate_year_plan(
-    M_raw: dict[str, Any],
-    year: int,
+def _item_ranks(M: dict[str, Any]) -> dict[str, int]:
+    ranks: dict[str, int] | None = M.get(ITEM_RANK_KEY)
+    if ranks is None:
+        # model znormalizowany poza normalize_model
+        ranks = compute_item_ranks(M)
+    return ranks
+
+
+def _ordered_items(M: dict[str, Any], ids: Iterable[str]) -> list[DayItem]:
+    """
+    DayItem dla `ids` w kolejności rang (sort po jednym int).
+    """
+    return _items_from_ids(M, sorted(ids, key=_item_ranks(M).__getitem__))
+
+
+def _day_ids(
+    M: dict[str, Any],
+    cal: CalendarIndex,
+    i: int,
+    day_filter: _DayFilter,
+    flags: dict[str, bool],
+    cycle_weeks: list[int] | None,
+    in_exception: bool,
+) -> tuple[str, set[str]]:
+    """
+    Pipeline dnia i -> (block_id, suplementy), bez DayItem.
+    """
+    block_id = M["BLOCK_CALENDAR"][cal.months[i]]
+
+    # pipeline
+    current = _block_base(M, block_id)
+    current = _apply_schedule_rules(
+        M,
+        block_id,
+        current,
+        flags,
+        wd=cal.weekdays[i],
+        year_week=cal.year_weeks[i],
+        cycle_week=None if cycle_weeks is None else cycle_weeks[i],
+    )
+    current = _apply_constraints(M, cal.months[i], block_id, current)
+    # apply_supplement_exclusions + apply_block_exclusions + apply_events
+    current = day_filter.apply(current)
+    # apply_global_exceptions: przedziały rozwiązane raz na zakres
+    if in_exception:
+        current = set()
+    return block_id, current
+
+
+def _day_plan(
+    M: dict[str, Any],
+    d: date,
+    block_id: str,
+    events: list[str],
+    items: list[DayItem],
+) -> DayPlan:
+    is_pulse_day = len(events) > 0
+    # OFF WEEK = remove_all -> pusta lista
+    is_off_week = (len(items) == 0) and (not is_pulse_day)
+
+    return DayPlan(
+        day=d,
+        block_id=block_id,
+        block_name=M["BLOCKS"][block_id].get("name", block_id),
+        items=items,
+        events=events,
+        is_off_week=is_off_week,
+        is_pulse_day=is_pulse_day,
+    )
+
+
+def _iter_day_ids(
+    M: dict[str, Any],
+    start: date,
+    end: date,
     *,
-    off_week_start_date: date | None = None,
-    off_week_week_of_year: int | None = None,
+    off_week_start_date: date | Iterable[date] | None = None,
+    off_week_week_of_year: int | Iterable[int] | None = None,
     cycle_anchor_date: date | None = None,
     flags: dict[str, bool] | None = None,
-) -> list[DayPlan]:
+    skip_windows: Iterable[tuple[date, date]] | None = None,
+) -> Iterator[tuple[int, str, list[str], set[str]]]:
+    """
+    (indeks dnia, block_id, eventy, suplementy) dla kolejnych dni
+    [start, end] - wspólny rdzeń generate_plan_range i osi czasu.
+    """
     flags = flags or {}
-
-    validate_model(M_raw)
-    M = normalize_model(M_raw)
-
-    if off_week_start_date is not None:
-        _ensure(
-            off_week_start_date.weekday() == 0,
-            "off_week_start_date must be a Monday (weekday=0)",
+    _ensure(start <= end, f"start must be <= end: {start} > {end}")
+
+    cal = CalendarIndex.build(start, end)
+
+    in_exception = bytearray(len(cal))
+    for lo_d, hi_d in _merge_intervals(
+        resolve_exception_intervals(
+            M,
+            start,
+            end,
+            off_week_start_date=off_week_start_date,
+            off_week_week_of_year=off_week_week_of_year,
+            skip_windows=skip_windows,
         )
+    ):
+        lo, hi = cal.index_of(lo_d), cal.index_of(hi_d) + 1
+        in_exception[lo:hi] = b"\x01" * (hi - lo)
+
+    events_by_day = _events_by_day(M, cal)
+    cycle_weeks = (
+        None
+        if cycle_anchor_date is None
+        else cal.weeks_from(cycle_anchor_date)
+    )
 
-    plans: list[DayPlan] = []
-    d = date(year, 1, 1)
-    last = date(year, 12, 31)
-
-    while d <= last:
-        block_id = M["BLOCK_CALENDAR"][d.month]
-        events = active_events_on_day(M, d)
+    exclusions = _supplement_exclusion_pairs(M)
+    filters: dict[tuple[str, tuple[str, ...]], _DayFilter] = {}
+    for i, events in enumerate(events_by_day):
+        key = (M["BLOCK_CALENDAR"][cal.months[i]], tuple(events))
+        f = filters.get(key)
+        if f is None:
+            f = filters[key] = _compile_day_filter(
+                M, key[0], events, exclusions
+            )
+        block_id, current = _day_ids(
+            M, cal, i, f, flags, cycle_weeks, bool(in_exception[i])
+        )
+        yield i, block_id, events, current
 
-        block_name = M["BLOCKS"][block_id].get("name", block_id)
-        is_pulse_day = len(events) > 0
 
-        # pipeline
-        current = base_by_block(M, d, block_id)
-        current = apply_schedule_rules(
-            M, d, block_id, current, flags, cycle_anchor_date
-        )
-        current = apply_constraints(M, d, block_id, current)
-        current = apply_supplement_exclusions(M, current)
-        current = apply_block_exclusions(M, block_id, current)
-        current = apply_events(M, d, current, events)
-        current = apply_global_exceptions(
-            M, d, current, events, off_week_start_date, off_week_week_of_year
+def generate_plan_range(
+    M_raw: ModelSource,
+    start: date,
+    end: date,
+    *,
+    off_week_start_date: date | Iterable[date] | None = None,
+    off_week_week_of_year: int | Iterable[int] | None = None,
+    cycle_anchor_date: date | None = None,
+    flags: dict[str, bool] | None = None,
+    skip_windows: Iterable[tuple[date, date]] | None = None,
+) -> list[DayPlan]:
+    """
+    Plan dla zakresu dat [start, end] (włącznie).
+    Pozwala policzyć tylko potrzebne dni (np. mailer: dziś + 30 dni)
+    zamiast całego roku. M_raw: patrz prepare_model.
+    Wyjątki globalne: patrz resolve_exception_intervals.
+    """
+    M = prepare_model(M_raw)
+    o0 = start.toordinal()
+    # DayItem raz na suplement (niemutowalne - współdzielone przez dni),
+    # kolejność dnia = sort po randze int
+    rank = _item_ranks(M).__getitem__
+    table = {
+        it.supplement_id: it for it in _items_from_ids(M, M["SUPPLEMENTS"])
+    }
+    return [
+        _day_plan(
+            M,
+            date.fromordinal(o0 + i),
+            block_id,
+            events,
+            [table[sid] for sid in sorted(current, key=rank)],
         )
-        # OFF WEEK = remove_all -> pusta lista
-        is_off_week = (len(current) == 0) and (not is_pulse_day)
-
-        items = _sort_items(M, _items_from_ids(M, current))
-        plans.append(
-            DayPlan(
-                day=d,
-                block_id=block_id,
-                block_name=block_name,
-                items=items,
-                events=events,
-                is_off_week=is_off_week,
-                is_pulse_day=is_pulse_day,
-            )
+        for i, block_id, events, current in _iter_day_ids(
+            M,
+            start,
+            end,
+            off_week_start_date=off_week_start_date,
+            off_week_week_of_year=off_week_week_of_year,
+            cycle_anchor_date=cycle_anchor_date,
+            flags=flags,
+            skip_windows=skip_windows,
         )
+    ]
 
-        d += timedelta(days=1)
 
-    return plans
+def generate_year_plan(
+    M_raw: ModelSource,
+    year: int,
+    *,
+    off_week_start_date: date | Iterable[date] | None = None,
+    off_week_week_of_year: int | Iterable[int] | None = None,
+    cycle_anchor_date: date | None = None,
+    flags: dict[str, bool] | None = None,
+    skip_windows: Iterable[tuple[date, date]] | None = None,
+) -> list[DayPlan]:
+    return generate_plan_range(
+        M_raw,
+        date(year, 1, 1),
+        date(year, 12, 31),
+        off_week_start_date=off_week_start_date,
+        off_week_week_of_year=off_week_week_of_year,
+        cycle_anchor_date=cycle_anchor_date,
+        flags=flags,
+        skip_windows=skip_windows,
+    )
 
 
 # =========================
@@ -610,16 +1072,7 @@ def export_csv(plans, path: str) -> None:
     Kolumny: date, block, events, morning, any, evening
     W komórkach: lista "name (dose)" rozdzielona " | "
     """
-
-    def fmt_item(it: DayItem) -> str:
-        # it: DayItem from engine
-        dose = it.dose
-        if isinstance(dose, dict):
-            amt = dose.get("amount")
-            unit = dose.get("unit")
-            if amt is not None or unit is not None:
-                return f"{it.name} ({amt} {unit})".strip()
-        return f"{it.name}"
+    import csv
 
     with open(path, "w", newline="", encoding="utf-8") as f:
         w = csv.writer(f)
@@ -633,7 +1086,9 @@ def export_csv(plans, path: str) -> None:
                 None: [],
             }
             for it in p.items:
-                buckets.get(it.timing_hint, buckets[None]).append(fmt_item(it))
+                buckets.get(it.timing_hint, buckets[None]).append(
+                    format_item_label(it)
+                )
 
             # 'any' + None można zlać do "any" jeśli chcesz;
             # tu trzymam rozdzielnie: None -> any
@@ -651,6 +1106,51 @@ def export_csv(plans, path: str) -> None:
             )
 
 
+# =========================
+# TEXT
+# =========================
+
+
+def format_item_label(it: DayItem) -> str:
+    """
+    Etykieta pozycji: "name (amount unit)" albo samo name, gdy dawka
+    bez ilości i jednostki (CSV, ICS, mail, export).
+    """
+    dose = it.dose
+    if isinstance(dose, dict):
+        amt = dose.get("amount")
+        unit = dose.get("unit")
+        if amt is not None or unit is not None:
+            return f"{it.name} ({amt} {unit})".strip()
+    return it.name
+
+
+def format_day_text(p: DayPlan, b: Mapping[str, list[str]]) -> str:
+    """
+    Tekst dnia (mail, build_30day_text, TextSink) z etykiet pogrupowanych
+    wg pory: b = {"morning": [...], "any": [...], "evening": [...]}.
+    """
+    events = list(p.events)
+    if p.is_off_week:
+        events = ["off_week"] + events
+    ev = ", ".join(events) if events else "-"
+
+    lines = []
+    lines.append(f"DATA: {p.day.isoformat()}")
+    lines.append(f"MODUŁ: {p.block_id}")
+    lines.append(f"EVENTY: {ev}")
+    lines.append("")
+    lines.append("RANO:")
+    lines.extend([f"- {x}" for x in b["morning"]] or ["- (brak)"])
+    lines.append("")
+    lines.append("W CIĄGU DNIA:")
+    lines.extend([f"- {x}" for x in b["any"]] or ["- (brak)"])
+    lines.append("")
+    lines.append("WIECZÓR:")
+    lines.extend([f"- {x}" for x in b["evening"]] or ["- (brak)"])
+    return "\n".join(lines)
+
+
 # =========================
 # ICS
 # =========================
@@ -666,12 +1166,67 @@ def _ics_escape(s: str) -> str:
     )
 
 
-def _dtstamp_utc() -> str:
-    # DTSTAMP in UTC, format: YYYYMMDDTHHMMSSZ
-    return datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+def _dtstamp_utc(now: datetime | None = None) -> str:
+    # DTSTAMP in UTC, format: YYYYMMDDTHHMMSSZ; now = chwila eksportu
+    if now is None:
+        now = datetime.now(UTC)
+    elif now.tzinfo is None:
+        now = now.replace(tzinfo=UTC)
+    return now.astimezone(UTC).strftime("%Y%m%dT%H%M%SZ")
+
+
+@dataclass
+class IcsState:
+    """
+    Stan poprzednich eksportów ICS: uid -> (digest treści dnia, SEQUENCE,
+    LAST-MODIFIED). Dzień bez zmian dostaje te same wartości (VEVENT
+    identyczny bajtowo), zmieniony - SEQUENCE + 1 i znacznik czasu
+    eksportu. Znacznik nigdy nie jest późniejszy niż `now`.
+    """
+
+    entries: dict[str, tuple[str, int, str]]
+
+    def stamp(self, uid: str, digest: str, now: str) -> tuple[int, str]:
+        prev = self.entries.get(uid)
+        if prev is not None and prev[0] == digest:
+            if prev[2] > now:  # stan zapisany z późniejszym zegarem
+                self.entries[uid] = (digest, prev[1], now)
+                return prev[1], now
+            return prev[1], prev[2]
+        seq = 0 if prev is None else prev[1] + 1
+        self.entries[uid] = (digest, seq, now)
+        return seq, now
+
+    @classmethod
+    def load(cls, path: str | os.PathLike[str]) -> IcsState:
+        import json
+
+        if not os.path.exists(path):
+            return cls(entries={})
+        with open(path, encoding="utf-8") as f:
+            raw = json.load(f)
+        return cls(
+            entries={k: (v[0], int(v[1]), v[2]) for k, v in raw.items()}
+        )
+
+    def save(self, path: str | os.PathLike[str]) -> None:
+        import json
+
+        tmp = f"{os.fspath(path)}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, sort_keys=True, separators=(",", ":"))
+        os.replace(tmp, path)
+
+
+def _event_digest(lines: list[str]) -> str:
+    import hashlib
+
+    return hashlib.sha256("\n".join(lines).encode()).hexdigest()[:16]
 
 
 def _uid_for_day(prefix: str, d: date) -> str:
+    import hashlib
+
     # stable UID per day, deterministic
     h = hashlib.sha1(f"{prefix}:{d.isoformat()}".encode()).hexdigest()[:16]
     return f"{prefix}-{d.strftime('%Y%m%d')}-{h}@longevity"
@@ -681,20 +1236,16 @@ def _format_day_items_for_desc(items: list[DayItem]) -> tuple[str, str, str]:
     """
     Returns 3 lines: morning/any/evening as bullet-like text (no markdown)
     """
-
-    def fmt(it: DayItem) -> str:
-        dose = it.dose
-        if isinstance(dose, dict):
-            amt = dose.get("amount")
-            unit = dose.get("unit")
-            if amt is not None or unit is not None:
-                return f"{it.name} ({amt} {unit})".strip()
-        return it.name
-
-    morning = [fmt(it) for it in items if it.timing_hint == "morning"]
-    evening = [fmt(it) for it in items if it.timing_hint == "evening"]
+    morning = [
+        format_item_label(it) for it in items if it.timing_hint == "morning"
+    ]
+    evening = [
+        format_item_label(it) for it in items if it.timing_hint == "evening"
+    ]
     any_ = [
-        fmt(it) for it in items if it.timing_hint not in ("morning", "evening")
+        format_item_label(it)
+        for it in items
+        if it.timing_hint not in ("morning", "evening")
     ]
 
     line_m = "MORNING: " + (" | ".join(morning) if morning else "-")
@@ -710,21 +1261,104 @@ def export_ics(
     calendar_name: str = "Longevity 4.8",
     uid_prefix: str = "longevity48",
     include_empty_days: bool = True,
+    state_path: str | None = None,
+    now: datetime | None = None,
 ) -> None:
     """
     ICS: VEVENT per day (all-day event).
     Summary zawiera blok + ewentualnie eventy (np. Fisetin).
     Description: rozpiska morning/any/evening.
+    state_path: plik IcsState (JSON, opcjonalny) - SEQUENCE/LAST-MODIFIED
+    zmieniają się tylko dla dni, których treść się zmieniła od
+    poprzedniego eksportu; bez niego nic poza `path` nie jest zapisywane
+    (SEQUENCE 0, DTSTAMP = now).
+    now: chwila eksportu (patrz render_ics).
     """
-    dtstamp = _dtstamp_utc()
+    state = IcsState.load(state_path) if state_path else None
+    text = render_ics(
+        plans,
+        calendar_name=calendar_name,
+        uid_prefix=uid_prefix,
+        include_empty_days=include_empty_days,
+        state=state,
+        now=now,
+    )
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        f.write(text)
+    if state is not None and state_path:
+        state.save(state_path)
+
+
+def _ics_header(calendar_name: str) -> list[str]:
+    return [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//Longevity 4.8//Schedule//EN",
+        "CALSCALE:GREGORIAN",
+        f"X-WR-CALNAME:{_ics_escape(calendar_name)}",
+    ]
+
+
+def _ics_vevent(
+    p: DayPlan,
+    desc: str,
+    uid_prefix: str,
+    state: IcsState,
+    now: str,
+) -> list[str]:
+    # all-day event: DTSTART=DATE, DTEND=DATE(next day)
+    d0 = p.day.strftime("%Y%m%d")
+    d1 = (p.day + timedelta(days=1)).strftime("%Y%m%d")
+
+    uid = _uid_for_day(uid_prefix, p.day)
+
+    # SUMMARY
+    # przykład: "NAD" / "DETOX • Fisetin"
+    ev_label = ""
+    if p.events:
+        ev_label = " • " + " & ".join(p.events)
+    summary = f"{p.block_id}{ev_label}"
+
+    content = [
+        f"DTSTART;VALUE=DATE:{d0}",
+        f"DTEND;VALUE=DATE:{d1}",
+        f"SUMMARY:{_ics_escape(summary)}",
+        f"DESCRIPTION:{_ics_escape(desc)}",
+    ]
+    seq, stamp = state.stamp(uid, _event_digest(content), now)
+
+    return [
+        "BEGIN:VEVENT",
+        f"UID:{uid}",
+        f"DTSTAMP:{stamp}",
+        f"LAST-MODIFIED:{stamp}",
+        f"SEQUENCE:{seq}",
+        *content,
+        "END:VEVENT",
+    ]
+
 
-    lines: list[str] = []
-    lines.append("BEGIN:VCALENDAR")
-    lines.append("VERSION:2.0")
-    lines.append("PRODID:-//Longevity 4.8//Schedule//EN")
-    lines.append("CALSCALE:GREGORIAN")
-    lines.append(f"X-WR-CALNAME:{_ics_escape(calendar_name)}")
+def render_ics(
+    plans,
+    *,
+    calendar_name: str = "Longevity 4.8",
+    uid_prefix: str = "longevity48",
+    include_empty_days: bool = True,
+    state: IcsState | None = None,
+    now: datetime | None = None,
+) -> str:
+    """
+    Treść pliku ICS (export_ics bez zapisu - np. dla feedu HTTP).
+    SEQUENCE/DTSTAMP/LAST-MODIFIED wg digestu treści dnia w `state`
+    (patrz IcsState); bez `state` każdy dzień jest nowy (SEQUENCE 0).
+    now: chwila eksportu (domyślnie bieżąca, UTC) - DTSTAMP nigdy jej
+    nie przekracza; podana jawnie daje wynik powtarzalny bajtowo.
+    """
+    if state is None:
+        state = IcsState(entries={})
+    stamp = _dtstamp_utc(now)
 
+    lines = _ics_header(calendar_name)
     for p in plans:
         if (
             (not include_empty_days)
@@ -733,19 +1367,6 @@ def export_ics(
         ):
             continue
 
-        # all-day event: DTSTART=DATE, DTEND=DATE(next day)
-        d0 = p.day.strftime("%Y%m%d")
-        d1 = (p.day + timedelta(days=1)).strftime("%Y%m%d")
-
-        uid = _uid_for_day(uid_prefix, p.day)
-
-        # SUMMARY
-        # przykład: "NAD" / "DETOX • Fisetin"
-        ev_label = ""
-        if p.events:
-            ev_label = " • " + " & ".join(p.events)
-        summary = f"{p.block_id}{ev_label}"
-
         # DESCRIPTION
         if len(p.items) == 0:
             desc = "OFF/EMPTY DAY"
@@ -753,23 +1374,14 @@ def export_ics(
             m, a, e = _format_day_items_for_desc(p.items)
             desc = "\n".join([m, a, e])
 
-        lines.append("BEGIN:VEVENT")
-        lines.append(f"UID:{uid}")
-        lines.append(f"DTSTAMP:{dtstamp}")
-        lines.append(f"DTSTART;VALUE=DATE:{d0}")
-        lines.append(f"DTEND;VALUE=DATE:{d1}")
-        lines.append(f"SUMMARY:{_ics_escape(summary)}")
-        lines.append(f"DESCRIPTION:{_ics_escape(desc)}")
-        lines.append("END:VEVENT")
+        lines.extend(_ics_vevent(p, desc, uid_prefix, state, stamp))
 
     lines.append("END:VCALENDAR")
 
     # Fold lines to 75 octets? Większość klientów działa bez tego,
     # ale lepiej zwinąć.
     folded = _ics_fold_lines(lines)
-
-    with open(path, "w", encoding="utf-8", newline="\n") as f:
-        f.write("\n".join(folded) + "\n")
+    return "\n".join(folded) + "\n"
 
 
 def _ics_fold_lines(lines: list[str]) -> list[str]:
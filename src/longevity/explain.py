@@ -0,0 +1,354 @@
+"""
+Explain / trace: który etap pipeline'u (i która reguła) dodał albo usunął
+suplement danego dnia.
+
+Osobna ścieżka kodu: generate_plan_range nie wie nic o śledzeniu, więc
+gdy explain jest wyłączony, nic nie kosztuje. Tu każdy etap wołany jest
+osobno, a zmiany wykrywane są przez różnicę zbiorów przed/po etapie;
+regułę odpowiedzialną za zmianę wskazuje ponowna ewaluacja pojedynczej
+reguły tymi samymi funkcjami etapów.
+"""
+
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any
+
+from .engine import (
+    ModelSource,
+    _ensure,
+    active_events_on_day,
+    apply_block_exclusions,
+    apply_constraints,
+    apply_events,
+    apply_global_exceptions,
+    apply_schedule_rules,
+    apply_supplement_exclusions,
+    base_by_block,
+    prepare_model,
+    resolve_exception_intervals,
+)
+
+
+@dataclass(frozen=True)
+class TraceRecord:
+    day: date
+    supplement_id: str
+    stage: str  # nazwa etapu z PIPELINE
+    action: str  # "add" | "remove"
+    rule_id: str | None  # id reguły / constraintu / konfliktu / wyjątku
+
+    def describe(self) -> str:
+        verb = "added" if self.action == "add" else "removed"
+        rule = f" ({self.rule_id})" if self.rule_id else ""
+        return (
+            f"{self.day.isoformat()} {self.supplement_id} {verb} "
+            f"by {self.stage}{rule}"
+        )
+
+
+class Explanation:
+    """
+    Rekordy posortowane po dniu (i kolejności etapów w dniu).
+    """
+
+    def __init__(self, records: list[TraceRecord]):
+        self.records = records
+        self._ordinals = [r.day.toordinal() for r in records]
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def query(
+        self,
+        start: date | None = None,
+        end: date | None = None,
+        *,
+        supplement_id: str | None = None,
+        stage: str | None = None,
+        action: str | None = None,
+    ) -> list[TraceRecord]:
+        lo = (
+            0
+            if start is None
+            else bisect_left(self._ordinals, start.toordinal())
+        )
+        hi = (
+            len(self.records)
+            if end is None
+            else bisect_right(self._ordinals, end.toordinal())
+        )
+        return [
+            r
+            for r in self.records[lo:hi]
+            if (supplement_id is None or r.supplement_id == supplement_id)
+            and (stage is None or r.stage == stage)
+            and (action is None or r.action == action)
+        ]
+
+    def why_missing(self, d: date, supplement_id: str) -> list[TraceRecord]:
+        """
+        Usunięcia suplementu w danym dniu (pusta lista = nigdy nie dodany).
+        """
+        return self.query(d, d, supplement_id=supplement_id, action="remove")
+
+
+# =========================
+# RULE ATTRIBUTION
+# =========================
+
+
+def _with_supplement(
+    M: dict[str, Any], sid: str, **fields: Any
+) -> dict[str, Any]:
+    return {
+        **M,
+        "SUPPLEMENTS": {sid: {**M["SUPPLEMENTS"][sid], **fields}},
+    }
+
+
+def _schedule_rule_id(
+    M: dict[str, Any],
+    d: date,
+    block_id: str,
+    sid: str,
+    flags: dict[str, bool],
+    cycle_anchor_date: date | None,
+) -> str | None:
+    for rule in M["SUPPLEMENTS"][sid].get("schedule_rules", []):
+        M1 = _with_supplement(M, sid, schedule_rules=[rule])
+        got = apply_schedule_rules(
+            M1, d, block_id, set(), flags, cycle_anchor_date
+        )
+        if sid in got:
+            return str(rule["id"])
+    return None
+
+
+def _constraint_rule_id(
+    M: dict[str, Any],
+    d: date,
+    block_id: str,
+    sid: str,
+    action: str,
+    before: set[str],
+    after: set[str],
+) -> str | None:
+    supps = M["SUPPLEMENTS"]
+    if action == "remove":
+        # własne filtry suplementu (allowed/exclude_blocks, seasonal)
+        if sid in supps:
+            for c in supps[sid].get("constraints", []):
+                if c["type"] in ("exclude_supplements", "require_supplements"):
+                    continue
+                M1 = _with_supplement(M, sid, constraints=[c])
+                if sid not in apply_constraints(M1, d, block_id, {sid}):
+                    return str(c["id"])
+        # exclude_supplements innego suplementu
+        for other in before:
+            for c in supps[other].get("constraints", []):
+                if c["type"] == "exclude_supplements" and sid in c.get(
+                    "params", {}
+                ).get("supplement_ids", []):
+                    return str(c["id"])
+        return None
+
+    for other in after:
+        for c in supps[other].get("constraints", []):
+            if c["type"] == "require_supplements" and sid in c.get(
+                "params", {}
+            ).get("supplement_ids", []):
+                return str(c["id"])
+    return None
+
+
+def _supplement_exclusion_rule_id(
+    M: dict[str, Any], sid: str, before: set[str]
+) -> str | None:
+    for a, bs in M["CONFLICTS"]["supplement_exclusions"].items():
+        if a in before and sid in bs:
+            return f"supplement_exclusions.{a}"
+    return None
+
+
+def _event_rule_id(
+    M: dict[str, Any], sid: str, action: str, events: list[str]
+) -> str | None:
+    if action == "add":
+        for rule in M["SUPPLEMENTS"][sid].get("schedule_rules", []):
+            if rule["type"] == "event_only" and (
+                rule["params"]["event_id"] in events
+            ):
+                return str(rule["id"])
+        return None
+    for ev_id in events:
+        override_id = M["EVENTS"][ev_id]["override_id"]
+        override = M["CONFLICTS"]["event_overrides"][override_id]
+        if override["effect"] == "remove_all" or (
+            override["effect"] == "allow_only"
+            and sid not in override["allowed_set"]
+        ):
+            return f"event_overrides.{override_id}"
+    return None
+
+
+def _exception_rule_id(
+    M: dict[str, Any],
+    d: date,
+    off_week_start_date: date | Iterable[date] | None,
+    off_week_week_of_year: int | Iterable[int] | None,
+    skip_windows: list[tuple[date, date]] | None,
+) -> str | None:
+    for iv in resolve_exception_intervals(
+        M,
+        d,
+        d,
+        off_week_start_date=off_week_start_date,
+        off_week_week_of_year=off_week_week_of_year,
+        skip_windows=skip_windows,
+        check_events=False,
+    ):
+        return iv.exception_id
+    return None
+
+
+# =========================
+# TRACED PIPELINE
+# =========================
+
+
+def _trace_day(
+    M: dict[str, Any],
+    d: date,
+    flags: dict[str, bool],
+    off_week_start_date: date | Iterable[date] | None,
+    off_week_week_of_year: int | Iterable[int] | None,
+    cycle_anchor_date: date | None,
+    skip_windows: list[tuple[date, date]] | None,
+    out: list[TraceRecord],
+) -> None:
+    block_id = M["BLOCK_CALENDAR"][d.month]
+    events = active_events_on_day(M, d)
+
+    def record(stage: str, before: set[str], after: set[str]) -> None:
+        for action, sids in (
+            ("add", after - before),
+            ("remove", before - after),
+        ):
+            for sid in sorted(sids):
+                if stage == "base_by_block":
+                    rule_id: str | None = "CORE_SET"
+                elif stage == "apply_schedule_rules":
+                    rule_id = _schedule_rule_id(
+                        M, d, block_id, sid, flags, cycle_anchor_date
+                    )
+                elif stage == "apply_constraints":
+                    rule_id = _constraint_rule_id(
+                        M, d, block_id, sid, action, before, after
+                    )
+                elif stage == "apply_supplement_exclusions":
+                    rule_id = _supplement_exclusion_rule_id(M, sid, before)
+                elif stage == "apply_block_exclusions":
+                    rule_id = f"block_exclusions.{block_id}"
+                elif stage == "apply_events":
+                    rule_id = _event_rule_id(M, sid, action, events)
+                else:
+                    rule_id = _exception_rule_id(
+                        M,
+                        d,
+                        off_week_start_date,
+                        off_week_week_of_year,
+                        skip_windows,
+                    )
+                out.append(TraceRecord(d, sid, stage, action, rule_id))
+
+    cur = base_by_block(M, d, block_id)
+    record("base_by_block", set(), cur)
+
+    before = set(cur)
+    cur = apply_schedule_rules(M, d, block_id, cur, flags, cycle_anchor_date)
+    record("apply_schedule_rules", before, cur)
+
+    before = set(cur)
+    cur = apply_constraints(M, d, block_id, cur)
+    record("apply_constraints", before, cur)
+
+    before = set(cur)
+    cur = apply_supplement_exclusions(M, cur)
+    record("apply_supplement_exclusions", before, cur)
+
+    before = set(cur)
+    cur = apply_block_exclusions(M, block_id, cur)
+    record("apply_block_exclusions", before, cur)
+
+    before = set(cur)
+    cur = apply_events(M, d, cur, events)
+    record("apply_events", before, cur)
+
+    before = set(cur)
+    cur = apply_global_exceptions(
+        M,
+        d,
+        cur,
+        events,
+        off_week_start_date,
+        off_week_week_of_year,
+        skip_windows,
+    )
+    record("apply_global_exceptions", before, cur)
+
+
+def explain_range(
+    M_raw: ModelSource,
+    start: date,
+    end: date,
+    *,
+    off_week_start_date: date | Iterable[date] | None = None,
+    off_week_week_of_year: int | Iterable[int] | None = None,
+    cycle_anchor_date: date | None = None,
+    flags: dict[str, bool] | None = None,
+    skip_windows: Iterable[tuple[date, date]] | None = None,
+) -> Explanation:
+    """
+    Jak generate_plan_range, ale zamiast planów zwraca ślad zmian.
+    """
+    flags = flags or {}
+    _ensure(start <= end, f"start must be <= end: {start} > {end}")
+    M = prepare_model(M_raw)
+    # listy (iterowane raz per dzień) + walidacja jak w generate_plan_range
+    if off_week_start_date is not None and not isinstance(
+        off_week_start_date, date
+    ):
+        off_week_start_date = list(off_week_start_date)
+    if off_week_week_of_year is not None and not isinstance(
+        off_week_week_of_year, int
+    ):
+        off_week_week_of_year = list(off_week_week_of_year)
+    windows = list(skip_windows) if skip_windows is not None else None
+    resolve_exception_intervals(
+        M,
+        start,
+        end,
+        off_week_start_date=off_week_start_date,
+        off_week_week_of_year=off_week_week_of_year,
+        skip_windows=windows,
+    )
+
+    records: list[TraceRecord] = []
+    d = start
+    while d <= end:
+        _trace_day(
+            M,
+            d,
+            flags,
+            off_week_start_date,
+            off_week_week_of_year,
+            cycle_anchor_date,
+            windows,
+            records,
+        )
+        d += timedelta(days=1)
+    return Explanation(records)
@@ -0,0 +1,332 @@
+"""
+Eksport jednym przejściem: plan (lista albo strumień DayPlan) czytany
+raz, a każdy dzień trafia jednocześnie do wielu ujść - CSV, ICS, JSON
+Lines, tekst maila.
+
+Etykieta "name (dose)" formatowana jest raz na suplement (DayFormatter),
+podział na morning/any/evening raz na dzień; ujścia tylko składają
+gotowe fragmenty. Wynik każdego ujścia jest identyczny z odpowiednią
+funkcją jednoformatową (export_csv, export_ics, build_30day_text).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from abc import ABC, abstractmethod
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import IO, Any
+
+from .engine import (
+    DayItem,
+    DayPlan,
+    IcsState,
+    _dtstamp_utc,
+    _ics_fold_lines,
+    _ics_header,
+    _ics_vevent,
+    format_day_text,
+    format_item_label,
+)
+
+
+@dataclass(frozen=True)
+class DayFormat:
+    morning: list[str]
+    evening: list[str]
+    other: list[str]  # timing poza morning/evening, w kolejności items
+    csv_any: list[str]  # "any", potem pozostałe (jak w export_csv)
+
+
+class DayFormatter:
+    """
+    Cache etykiet per supplement_id (jeden model na eksport).
+    """
+
+    def __init__(self) -> None:
+        self._labels: dict[str, str] = {}
+
+    def label(self, it: DayItem) -> str:
+        s = self._labels.get(it.supplement_id)
+        if s is None:
+            s = self._labels[it.supplement_id] = format_item_label(it)
+        return s
+
+    def day(self, p: DayPlan) -> DayFormat:
+        morning: list[str] = []
+        evening: list[str] = []
+        other: list[str] = []
+        any_: list[str] = []
+        rest: list[str] = []
+        for it in p.items:
+            s = self.label(it)
+            hint = it.timing_hint
+            if hint == "morning":
+                morning.append(s)
+            elif hint == "evening":
+                evening.append(s)
+            else:
+                other.append(s)
+                (any_ if hint == "any" else rest).append(s)
+        return DayFormat(morning, evening, other, any_ + rest)
+
+
+# =========================
+# SINKS
+# =========================
+
+
+class Sink(ABC):
+    """
+    Ujście eksportu: begin() -> day() per dzień -> end().
+    Ścieżka: plik otwierany w begin() i zamykany w end()/close().
+    """
+
+    encoding = "utf-8"
+    newline: str | None = "\n"
+
+    def __init__(self, path: str | os.PathLike[str]):
+        self.path = path
+        self._f: IO[str] | None = None
+
+    def begin(self) -> None:
+        self._f = open(
+            self.path, "w", encoding=self.encoding, newline=self.newline
+        )
+
+    def write(self, s: str) -> None:
+        assert self._f is not None
+        self._f.write(s)
+
+    @abstractmethod
+    def day(self, p: DayPlan, fmt: DayFormat) -> None:
+        """Zapis jednego dnia (fmt - gotowe etykiety z DayFormatter)."""
+
+    def end(self) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+
+class CsvSink(Sink):
+    newline = ""
+
+    def begin(self) -> None:
+        import csv
+
+        super().begin()
+        assert self._f is not None
+        self._w = csv.writer(self._f)
+        self._w.writerow(
+            ["date", "block", "events", "morning", "any", "evening"]
+        )
+
+    def day(self, p: DayPlan, fmt: DayFormat) -> None:
+        self._w.writerow(
+            [
+                p.day.isoformat(),
+                p.block_id,
+                ",".join(p.events),
+                " | ".join(fmt.morning),
+                " | ".join(fmt.csv_any),
+                " | ".join(fmt.evening),
+            ]
+        )
+
+
+class IcsSink(Sink):
+    def __init__(
+        self,
+        path: str | os.PathLike[str],
+        *,
+        calendar_name: str = "Longevity 4.8",
+        uid_prefix: str = "longevity48",
+        include_empty_days: bool = True,
+        state: IcsState | None = None,
+        now: datetime | None = None,
+    ):
+        super().__init__(path)
+        self.calendar_name = calendar_name
+        self.uid_prefix = uid_prefix
+        self.include_empty_days = include_empty_days
+        self.state = IcsState(entries={}) if state is None else state
+        self.now = now
+        self._now = ""
+
+    def _lines(self, lines: list[str]) -> None:
+        # zwijanie linii działa per linia - można pisać strumieniowo
+        for line in _ics_fold_lines(lines):
+            self.write(line + "\n")
+
+    def begin(self) -> None:
+        super().begin()
+        self._now = _dtstamp_utc(self.now)
+        self._lines(_ics_header(self.calendar_name))
+
+    def day(self, p: DayPlan, fmt: DayFormat) -> None:
+        if not self.include_empty_days and not p.items and not p.events:
+            return
+        if not p.items:
+            desc = "OFF/EMPTY DAY"
+        else:
+            m, a, e = fmt.morning, fmt.other, fmt.evening
+            desc = "\n".join(
+                [
+                    "MORNING: " + (" | ".join(m) if m else "-"),
+                    "ANY: " + (" | ".join(a) if a else "-"),
+                    "EVENING: " + (" | ".join(e) if e else "-"),
+                ]
+            )
+        self._lines(
+            _ics_vevent(p, desc, self.uid_prefix, self.state, self._now)
+        )
+
+    def end(self) -> None:
+        self._lines(["END:VCALENDAR"])
+        super().end()
+
+
+def _json_default(x: Any) -> Any:
+    if isinstance(x, (set, frozenset)):
+        return sorted(x)
+    raise TypeError(f"Not JSON serializable: {type(x).__name__}")
+
+
+def _dumps(x: Any) -> str:
+    return json.dumps(x, ensure_ascii=False, default=_json_default)
+
+
+class JsonlEncoder:
+    """
+    Linia JSON dnia sklejana z gotowych fragmentów: item per
+    supplement_id, blok i zestaw eventów liczone raz (json.dumps tylko
+    przy pierwszym wystąpieniu). Wynik = json.dumps obiektu dnia.
+    """
+
+    def __init__(self) -> None:
+        self._items: dict[str, str] = {}
+        self._blocks: dict[str, str] = {}
+        self._events: dict[tuple[str, ...], str] = {}
+
+    def _item(self, it: DayItem) -> str:
+        s = self._items.get(it.supplement_id)
+        if s is None:
+            s = self._items[it.supplement_id] = _dumps(
+                {
+                    "id": it.supplement_id,
+                    "timing": it.timing_hint,
+                    "priority": it.priority,
+                    "dose": it.dose,
+                }
+            )
+        return s
+
+    def line(self, p: DayPlan) -> str:
+        block = self._blocks.get(p.block_id)
+        if block is None:
+            block = self._blocks[p.block_id] = _dumps(p.block_id)
+        key = tuple(p.events)
+        events = self._events.get(key)
+        if events is None:
+            events = self._events[key] = _dumps(p.events)
+        items = ", ".join([self._item(it) for it in p.items])
+        return (
+            f'{{"date": "{p.day.isoformat()}", "block": {block}, '
+            f'"events": {events}, '
+            f'"is_off_week": {"true" if p.is_off_week else "false"}, '
+            f'"items": [{items}]}}\n'
+        )
+
+
+def iter_jsonl(plans: Iterable[DayPlan]) -> Iterator[str]:
+    """
+    Strumień linii JSON Lines (z '\\n') dla dowolnego iteratora planów.
+    """
+    enc = JsonlEncoder()
+    for p in plans:
+        yield enc.line(p)
+
+
+def export_jsonl(plans: Iterable[DayPlan], path: str) -> None:
+    """
+    JSON Lines: 1 linia = 1 dzień
+    {"date", "block", "events", "is_off_week",
+     "items": [{"id", "timing", "priority", "dose"}]}
+    """
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        f.writelines(iter_jsonl(plans))
+
+
+class JsonlSink(Sink):
+    """
+    Jeden obiekt JSON na dzień (patrz export_jsonl).
+    """
+
+    def begin(self) -> None:
+        super().begin()
+        self._enc = JsonlEncoder()
+
+    def day(self, p: DayPlan, fmt: DayFormat) -> None:
+        self.write(self._enc.line(p))
+
+
+class TextSink(Sink):
+    """
+    Tekst maila (jak build_30day_text) dla dni [start, start + days).
+    """
+
+    def __init__(
+        self, path: str | os.PathLike[str], start: date, days: int = 30
+    ):
+        super().__init__(path)
+        self.start = start
+        self.days = days
+        self._chunks: list[str] = []
+        self._next = 0  # indeks następnego oczekiwanego dnia
+
+    def _fill_until(self, i: int) -> None:
+        while self._next < min(i, self.days):
+            d = self.start + timedelta(days=self._next)
+            self._chunks.append(
+                f"DATA: {d.isoformat()}\nBRAK PLANU DLA TEJ DATY\n"
+            )
+            self._next += 1
+
+    def day(self, p: DayPlan, fmt: DayFormat) -> None:
+        i = (p.day - self.start).days
+        if not self._next <= i < self.days:
+            return
+        self._fill_until(i)
+        b = {"morning": fmt.morning, "any": fmt.other, "evening": fmt.evening}
+        self._chunks.append(format_day_text(p, b))
+        self._chunks.append("\n")
+        self._next = i + 1
+
+    def end(self) -> None:
+        self._fill_until(self.days)
+        self.write("\n".join(self._chunks).strip() + "\n")
+        super().end()
+
+
+def export_all(plans: Iterable[DayPlan], sinks: list[Sink]) -> None:
+    """
+    Jedno przejście po `plans` (lista albo generator) do wszystkich ujść.
+    """
+    fmt = DayFormatter()
+    try:
+        for s in sinks:
+            s.begin()
+        for p in plans:
+            f = fmt.day(p)
+            for s in sinks:
+                s.day(p, f)
+        for s in sinks:
+            s.end()
+    finally:
+        for s in sinks:
+            s.close()
@@ -0,0 +1,361 @@
+"""
+Lokalny serwer subskrypcji ICS (stdlib http.server).
+
+    GET /calendar/<profile_id>.ics[?from=YYYY-MM-DD&to=YYYY-MM-DD]
+
+Wyrenderowane feedy (bajty ICS + wersja gzip + ETag) trzymane są w LRU
+kluczowanym odciskiem speca, parametrami profilu i zakresem dat - kolejne
+odpytania klientów kalendarza nie generują planu ponownie. Obsługuje
+If-None-Match (304) i Accept-Encoding: gzip; wariant gzip ma własny
+ETag (sufiks -gzip), bo jego bajty różnią się od wersji identity.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs, urlsplit
+
+from .engine import (
+    PLAN_PARAM_KEYS,
+    IcsState,
+    _ensure,
+    generate_plan_range,
+    render_ics,
+)
+from .snapshot import DEFAULT_SPEC_PATH, compile_model, spec_fingerprint
+
+DEFAULT_CACHE_SIZE = 256
+MAX_FEED_DAYS = 3660  # ~10 lat na jedno zapytanie
+
+# klucze profilu przekazywane do render_ics (PLAN_PARAM_KEYS ->
+# generate_plan_range)
+_ICS_KEYS = ("calendar_name", "uid_prefix")
+
+_PATH_RE = re.compile(r"/calendar/([A-Za-z0-9_.-]+)\.ics")
+
+
+# =========================
+# PROFILES
+# =========================
+
+
+def _parse_dates(x: Any) -> date | list[date]:
+    if isinstance(x, list):
+        return [date.fromisoformat(v) for v in x]
+    return date.fromisoformat(x)
+
+
+def parse_profile(raw: dict[str, Any]) -> dict[str, Any]:
+    """
+    Profil z JSON (daty jako ISO) -> parametry generate_plan_range
+    + opcje ICS.
+    """
+    unknown = set(raw) - set(_ICS_KEYS) - set(PLAN_PARAM_KEYS)
+    _ensure(not unknown, f"Unknown profile keys: {sorted(unknown)}")
+    out = dict(raw)
+    for k in ("off_week_start_date", "cycle_anchor_date"):
+        if raw.get(k) is not None:
+            out[k] = _parse_dates(raw[k])
+    if raw.get("skip_windows") is not None:
+        out["skip_windows"] = [
+            (date.fromisoformat(a), date.fromisoformat(b))
+            for a, b in raw["skip_windows"]
+        ]
+    return out
+
+
+def load_profiles(path: str | os.PathLike[str]) -> dict[str, dict[str, Any]]:
+    """
+    {"profile_id": {"cycle_anchor_date": "2026-01-05", ...}, ...}
+    """
+    with open(path, encoding="utf-8") as f:
+        raw = json.load(f)
+    _ensure(isinstance(raw, dict), "Profiles file must contain an object")
+    return {str(pid): dict(p) for pid, p in raw.items()}
+
+
+# =========================
+# CACHE + SERVICE
+# =========================
+
+
+@dataclass(frozen=True)
+class RenderedFeed:
+    etag: str
+    body: bytes
+    gzipped: bytes
+
+    @property
+    def etag_gzip(self) -> str:
+        return self.etag[:-1] + '-gzip"'
+
+
+def _rendered(body: bytes) -> RenderedFeed:
+    import gzip
+    import hashlib
+
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    return RenderedFeed(etag, body, gzip.compress(body, mtime=0))
+
+
+class FeedCache:
+    """
+    LRU: klucz -> RenderedFeed (bezpieczne dla wątków serwera).
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE):
+        _ensure(maxsize > 0, "maxsize must be > 0")
+        self.maxsize = maxsize
+        self._data: OrderedDict[tuple[Any, ...], RenderedFeed] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get_or_render(
+        self, key: tuple[Any, ...], render: Callable[[], bytes]
+    ) -> RenderedFeed:
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is not None:
+                self._data.move_to_end(key)
+                return hit
+        # render poza lockiem - równoległe zapytania o różne feedy
+        feed = _rendered(render())
+        with self._lock:
+            self._data[key] = feed
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+        return feed
+
+
+class FeedService:
+    """
+    Profile + model speca (rekompilowany, gdy plik speca się zmieni)
+    + cache feedów.
+    """
+
+    def __init__(
+        self,
+        profiles: dict[str, dict[str, Any]],
+        *,
+        spec_path: str | os.PathLike[str] = DEFAULT_SPEC_PATH,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        state_dir: str | os.PathLike[str] | None = None,
+    ):
+        self.spec_path = Path(spec_path)
+        # IcsState per profil (SEQUENCE rośnie tylko dla zmienionych dni);
+        # state_dir -> stan przeżywa restart serwera
+        self.state_dir = Path(state_dir) if state_dir is not None else None
+        if self.state_dir is not None:
+            self.state_dir.mkdir(parents=True, exist_ok=True)
+        self._states: dict[str, IcsState] = {}
+        self._state_lock = threading.Lock()
+        # id -> (klucz z surowego JSON, sparsowany profil)
+        self._profiles = {
+            pid: (json.dumps(raw, sort_keys=True), parse_profile(raw))
+            for pid, raw in profiles.items()
+        }
+        self.cache = FeedCache(cache_size)
+        self._stat: tuple[int, int] | None = None
+        self._fingerprint = ""
+        self._model: dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def _current_model(self) -> tuple[str, dict[str, Any]]:
+        st = self.spec_path.stat()
+        stat = (st.st_mtime_ns, st.st_size)
+        with self._lock:
+            if stat != self._stat:
+                self._model = compile_model(self.spec_path)
+                self._fingerprint = spec_fingerprint(self.spec_path)
+                self._stat = stat
+            return self._fingerprint, self._model
+
+    def _state(self, profile_id: str) -> IcsState:
+        state = self._states.get(profile_id)
+        if state is None:
+            if self.state_dir is not None:
+                state = IcsState.load(self.state_dir / f"{profile_id}.json")
+            else:
+                state = IcsState(entries={})
+            self._states[profile_id] = state
+        return state
+
+    def feed(self, profile_id: str, start: date, end: date) -> RenderedFeed:
+        """
+        KeyError: nieznany profil.
+        """
+        raw_key, profile = self._profiles[profile_id]
+        fingerprint, M = self._current_model()
+
+        def render() -> bytes:
+            params = {k: profile[k] for k in PLAN_PARAM_KEYS if k in profile}
+            opts = {k: profile[k] for k in _ICS_KEYS if k in profile}
+            plans = generate_plan_range(M, start, end, **params)
+            with self._state_lock:
+                state = self._state(profile_id)
+                text = render_ics(plans, state=state, **opts)
+                if self.state_dir is not None:
+                    state.save(self.state_dir / f"{profile_id}.json")
+            return text.encode("utf-8")
+
+        key = (fingerprint, profile_id, raw_key, start, end)
+        return self.cache.get_or_render(key, render)
+
+
+# =========================
+# HTTP
+# =========================
+
+
+def feed_range(query: dict[str, list[str]], today: date) -> tuple[date, date]:
+    """
+    ?from=&to= (ISO). Domyślnie: od 1 stycznia bieżącego roku, rok do
+    przodu od `from`.
+    """
+    start = (
+        date.fromisoformat(query["from"][0])
+        if "from" in query
+        else date(today.year, 1, 1)
+    )
+    if "to" in query:
+        end = date.fromisoformat(query["to"][0])
+    elif start.month == 2 and start.day == 29:
+        end = date(start.year + 1, 2, 28)
+    else:
+        end = start.replace(year=start.year + 1) - timedelta(days=1)
+    _ensure(start <= end, f"from must be <= to: {start} > {end}")
+    _ensure(
+        (end - start).days < MAX_FEED_DAYS,
+        f"Feed range longer than {MAX_FEED_DAYS} days",
+    )
+    return start, end
+
+
+def _etag_matches(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    for tag in header.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def _accepts_gzip(header: str | None) -> bool:
+    for part in (header or "").split(","):
+        name, *params = [x.strip() for x in part.split(";")]
+        if name.lower() in ("gzip", "*"):
+            q = 1.0
+            for p in params:
+                if p.startswith("q="):
+                    try:
+                        q = float(p[2:])
+                    except ValueError:
+                        q = 0.0
+            return q > 0
+    return False
+
+
+def make_handler(service: FeedService) -> type[BaseHTTPRequestHandler]:
+    class FeedHandler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            self._serve(head=False)
+
+        def do_HEAD(self) -> None:
+            self._serve(head=True)
+
+        def _serve(self, head: bool) -> None:
+            url = urlsplit(self.path)
+            m = _PATH_RE.fullmatch(url.path)
+            if m is None:
+                self.send_error(404, "Not found")
+                return
+            try:
+                start, end = feed_range(parse_qs(url.query), date.today())
+            except ValueError as e:
+                self.send_error(400, str(e))
+                return
+            try:
+                feed = service.feed(m.group(1), start, end)
+            except KeyError:
+                self.send_error(404, "Unknown profile")
+                return
+            except ValueError as e:
+                # np. OFF WEEK profilu nachodzi na zakazany event
+                self.send_error(500, str(e))
+                return
+
+            gz = _accepts_gzip(self.headers.get("Accept-Encoding"))
+            etag = feed.etag_gzip if gz else feed.etag
+            if _etag_matches(self.headers.get("If-None-Match"), etag):
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Vary", "Accept-Encoding")
+                self.end_headers()
+                return
+
+            body = feed.gzipped if gz else feed.body
+            self.send_response(200)
+            self.send_header("Content-Type", "text/calendar; charset=utf-8")
+            self.send_header("ETag", etag)
+            self.send_header("Vary", "Accept-Encoding")
+            self.send_header("Cache-Control", "max-age=300")
+            if gz:
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if not head:
+                self.wfile.write(body)
+
+    return FeedHandler
+
+
+def make_server(
+    service: FeedService, host: str = "127.0.0.1", port: int = 8080
+) -> ThreadingHTTPServer:
+    return ThreadingHTTPServer((host, port), make_handler(service))
+
+
+def main(argv: list[str] | None = None) -> None:
+    import argparse
+
+    ap = argparse.ArgumentParser(description="Serve ICS feeds per profile.")
+    ap.add_argument("profiles", help="JSON file: profile_id -> params")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8080)
+    ap.add_argument("--spec", default=str(DEFAULT_SPEC_PATH))
+    ap.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE)
+    ap.add_argument("--state-dir", help="directory for per-profile IcsState")
+    args = ap.parse_args(argv)
+
+    service = FeedService(
+        load_profiles(args.profiles),
+        spec_path=args.spec,
+        cache_size=args.cache_size,
+        state_dir=args.state_dir,
+    )
+    server = make_server(service, args.host, args.port)
+    print(f"Serving ICS feeds on http://{args.host}:{server.server_port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Kolumnowy eksport osi czasu do NumPy / pandas (analiza w JupyterLab).
+
+Macierz "dzień x suplement" powstaje z kolumn Timeline (bitmapa dni per
+suplement -> np.unpackbits), a bloki / eventy / flagi dnia z buforów
+bytes/array bez kopiowania przez Pythona - bez słowników per wiersz.
+
+numpy i pandas (extra `frames`: pip install 'longevity[frames]')
+importowane leniwie: `import longevity.timeline` ich nie wymaga.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+from .engine import ModelSource, _ensure, prepare_model
+from .timeline import OFF_WEEK, PULSE_DAY, Timeline
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+LAYOUTS = ("long", "wide")
+
+
+def _require(*modules: str) -> None:
+    import importlib
+
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except ImportError as e:
+            raise ImportError(
+                f"{name} is required for longevity.frames; install the "
+                "'frames' extra: pip install 'longevity[frames]'"
+            ) from e
+
+
+@dataclass(frozen=True)
+class TimelineArrays:
+    """
+    Dane osi czasu jako tablice; słowniki (supplement_ids, block_ids,
+    event_ids) indeksowane kodami z tablic.
+    """
+
+    supplement_ids: tuple[str, ...]
+    block_ids: tuple[str, ...]
+    block_names: tuple[str, ...]
+    event_ids: tuple[str, ...]
+    day: np.ndarray  # datetime64[D], n_days
+    block: np.ndarray  # uint8, n_days -> block_ids
+    is_off_week: np.ndarray  # bool, n_days
+    is_pulse_day: np.ndarray  # bool, n_days
+    events: np.ndarray  # bool, n_days x n_events
+    taken: np.ndarray  # bool, n_days x n_supplements
+    timing: np.ndarray  # object, n_supplements (None = brak)
+    priority: np.ndarray  # int64, n_supplements
+
+    def __len__(self) -> int:
+        return len(self.day)
+
+
+def _day_bits(col: int, n: int) -> np.ndarray:
+    import numpy as np
+
+    raw = np.frombuffer(col.to_bytes((n + 7) // 8, "little"), np.uint8)
+    return np.unpackbits(raw, count=n, bitorder="little").view(bool)
+
+
+def to_arrays(tl: Timeline, M_raw: ModelSource) -> TimelineArrays:
+    """
+    Timeline -> TimelineArrays (timing / priority z modelu, jak w
+    DayItem).
+    """
+    _require("numpy")
+    import numpy as np
+
+    M = prepare_model(M_raw)
+    n = len(tl)
+
+    taken = np.zeros((n, len(tl.supplement_ids)), dtype=bool)
+    for j, col in enumerate(tl.columns):
+        if col:
+            taken[:, j] = _day_bits(col, n)
+
+    event_ids = tuple(sorted({e for es in tl.event_sets for e in es}))
+    pos = {e: k for k, e in enumerate(event_ids)}
+    set_flags = np.zeros((len(tl.event_sets), len(event_ids)), dtype=bool)
+    for s, es in enumerate(tl.event_sets):
+        for e in es:
+            set_flags[s, pos[e]] = True
+    event_codes = np.frombuffer(tl.events, dtype=np.uint16)
+
+    flags = np.frombuffer(tl.day_flags, dtype=np.uint8)
+    timing: list[str | None] = []
+    priority: list[int] = []
+    for sid in tl.supplement_ids:
+        spec = M["SUPPLEMENTS"][sid]
+        dose = spec.get("default_dose")
+        timing.append(
+            dose.get("timing_hint") if isinstance(dose, dict) else None
+        )
+        priority.append(int(spec.get("priority", 0)))
+
+    return TimelineArrays(
+        supplement_ids=tl.supplement_ids,
+        block_ids=tl.block_ids,
+        block_names=tl.block_names,
+        event_ids=event_ids,
+        day=np.datetime64(tl.start, "D") + np.arange(n),
+        block=np.frombuffer(tl.blocks, dtype=np.uint8),
+        is_off_week=(flags & OFF_WEEK).astype(bool),
+        is_pulse_day=(flags & PULSE_DAY).astype(bool),
+        events=set_flags[event_codes],
+        taken=taken,
+        timing=np.array(timing, dtype=object),
+        priority=np.array(priority, dtype=np.int64),
+    )
+
+
+def _categorical(codes: np.ndarray, categories: Any) -> pd.Categorical:
+    import pandas as pd
+
+    return pd.Categorical.from_codes(codes, categories=list(categories))
+
+
+def to_dataframe(
+    tl: Timeline, M_raw: ModelSource, *, layout: str = "long"
+) -> pd.DataFrame:
+    """
+    layout="long": wiersz = (dzień, suplement przyjmowany tego dnia);
+        kolumny day, supplement_id, timing, priority, block,
+        is_off_week, is_pulse_day + bool per event id.
+        Kolejność: dni rosnąco, suplementy w kolejności supplement_ids.
+    layout="wide": indeks day, kolumna bool per supplement_id.
+    """
+    _require("numpy", "pandas")
+    import numpy as np
+    import pandas as pd
+
+    _ensure(layout in LAYOUTS, f"Unknown layout: {layout!r}")
+    a = to_arrays(tl, M_raw)
+
+    if layout == "wide":
+        return pd.DataFrame(
+            a.taken,
+            index=pd.DatetimeIndex(a.day, name="day"),
+            columns=list(a.supplement_ids),
+        )
+
+    rows, sups = np.nonzero(a.taken)
+    timing_ids = sorted({t for t in a.timing if t is not None})
+    timing_code = np.array(
+        [-1 if t is None else timing_ids.index(t) for t in a.timing],
+        dtype=np.int64,
+    )
+    data: dict[str, Any] = {
+        "day": a.day[rows],
+        "supplement_id": _categorical(sups, a.supplement_ids),
+        "timing": _categorical(timing_code[sups], timing_ids),
+        "priority": a.priority[sups],
+        "block": _categorical(a.block[rows], a.block_ids),
+        "is_off_week": a.is_off_week[rows],
+        "is_pulse_day": a.is_pulse_day[rows],
+    }
+    for k, e in enumerate(a.event_ids):
+        data[e] = a.events[rows, k]
+    return pd.DataFrame(data)
@@ -0,0 +1,289 @@
+"""
+Kompaktowy ICS: serie RRULE zamiast jednego VEVENT na dzień.
+
+Na osi czasu (Timeline) horyzont dzielony jest na segmenty kolejnych dni
+z tym samym blokiem. W segmencie każdy suplement to jedna seria:
+FREQ=DAILY (CORE) albo FREQ=WEEKLY;BYDAY=... (week_pattern /
+times_per_week), z EXDATE dla pominiętych dni (OFF WEEK, puls, cykle).
+Gdy dni są nieregularne (EXDATE więcej niż wystąpień), suplement
+emitowany jest jako wielodniowe wydarzenia dla kolejnych ciągów dni.
+Bloki to wielodniowe wydarzenia all-day, eventy (pulsy) - wielodniowe
+serie FREQ=YEARLY, gdy puls wypada w tych samych dniach w kolejnych
+latach (inaczej osobne wydarzenia per ciąg dni).
+DTSTAMP = chwila eksportu (`now`).
+"""
+
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+from typing import Any
+
+from .engine import (
+    ModelSource,
+    _dtstamp_utc,
+    _ics_escape,
+    _ics_fold_lines,
+    _items_from_ids,
+    format_item_label,
+    prepare_model,
+)
+from .timeline import Timeline
+
+_BYDAY = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+
+
+def _d(o: int) -> str:
+    return date.fromordinal(o).strftime("%Y%m%d")
+
+
+def _runs(bits: int) -> list[tuple[int, int]]:
+    """
+    Ciągi jedynek: [(lo, hi)] - indeksy bitów, hi wyłącznie.
+    """
+    out: list[tuple[int, int]] = []
+    base = 0
+    while bits:
+        low = (bits & -bits).bit_length() - 1
+        bits >>= low
+        base += low
+        n = (~bits & (bits + 1)).bit_length() - 1  # długość ciągu jedynek
+        out.append((base, base + n))
+        bits >>= n
+        base += n
+    return out
+
+
+def _segments(tl: Timeline) -> list[tuple[int, int]]:
+    """
+    Kolejne dni z tym samym blokiem: [(lo, hi)], hi wyłącznie.
+    """
+    out: list[tuple[int, int]] = []
+    lo = 0
+    for i in range(1, len(tl) + 1):
+        if i == len(tl) or tl.blocks[i] != tl.blocks[lo]:
+            out.append((lo, i))
+            lo = i
+    return out
+
+
+def _supplement_label(M: dict[str, Any], sid: str) -> str:
+    (it,) = _items_from_ids(M, [sid])
+    label = format_item_label(it)
+    if it.timing_hint:
+        label += f" · {it.timing_hint}"
+    return label
+
+
+class _Writer:
+    def __init__(self, uid_prefix: str, stamp: str):
+        self.uid_prefix = uid_prefix
+        self.stamp = stamp
+        self.lines: list[str] = []
+
+    def event(
+        self,
+        kind: str,
+        key: str,
+        o_start: int,
+        o_end: int,
+        summary: str,
+        extra: tuple[str, ...] = (),
+    ) -> None:
+        d0 = _d(o_start)
+        self.lines.extend(
+            [
+                "BEGIN:VEVENT",
+                f"UID:{self.uid_prefix}-{kind}-{key}-{d0}@longevity",
+                f"DTSTAMP:{self.stamp}",
+                f"DTSTART;VALUE=DATE:{d0}",
+                f"DTEND;VALUE=DATE:{_d(o_end)}",
+                f"SUMMARY:{_ics_escape(summary)}",
+                *extra,
+                "END:VEVENT",
+            ]
+        )
+
+
+def _supplement_series(
+    w: _Writer, sid: str, label: str, o0: int, seg_lo: int, bits: int
+) -> None:
+    """
+    Jedna seria RRULE dla dni `bits` (bit j = dzień o0 + seg_lo + j) albo
+    wydarzenia per ciąg dni, gdy wzorzec tygodniowy jest nieregularny.
+    """
+    days = [j for lo, hi in _runs(bits) for j in range(lo, hi)]
+    first, last = days[0], days[-1]
+    base = o0 + seg_lo
+    weekdays = {(base + j - 1) % 7 for j in days}
+    expected = [
+        j for j in range(first, last + 1) if (base + j - 1) % 7 in weekdays
+    ]
+    exdates = sorted(set(expected) - set(days))
+
+    if len(days) > 1 and len(exdates) <= len(days):
+        if len(weekdays) == 7:
+            rule = "FREQ=DAILY"
+        else:
+            byday = ",".join(_BYDAY[x] for x in sorted(weekdays))
+            rule = f"FREQ=WEEKLY;BYDAY={byday}"
+        extra = [f"RRULE:{rule};UNTIL={_d(base + last)}"]
+        if exdates:
+            extra.append(
+                "EXDATE;VALUE=DATE:" + ",".join(_d(base + j) for j in exdates)
+            )
+        w.event("s", sid, base + first, base + first + 1, label, tuple(extra))
+        return
+
+    for lo, hi in _runs(bits):
+        w.event("s", sid, base + lo, base + hi, label)
+
+
+def _emit_group(
+    w: _Writer, sid: str, label: str, o0: int, col: int, lo: int, hi: int
+) -> None:
+    bits = (col >> lo) & ((1 << (hi - lo)) - 1)
+    _supplement_series(w, sid, label, o0, lo, bits)
+
+
+def _event_series(w: _Writer, ev_id: str, runs: list[tuple[int, int]]) -> None:
+    """
+    Ciągi dni eventu (ordinale, hi wyłącznie) -> serie FREQ=YEARLY dla
+    tych samych (miesiąc, dzień, długość) w kolejnych latach.
+    """
+    by_key: dict[tuple[int, int, int], list[int]] = {}
+    for lo, hi in runs:
+        d = date.fromordinal(lo)
+        by_key.setdefault((d.month, d.day, hi - lo), []).append(lo)
+    for (_, _, n), starts in by_key.items():
+        years = [date.fromordinal(o).year for o in starts]
+        if len(starts) > 1 and years == list(range(years[0], years[-1] + 1)):
+            rule = f"RRULE:FREQ=YEARLY;UNTIL={_d(starts[-1])}"
+            w.event("e", ev_id, starts[0], starts[0] + n, ev_id, (rule,))
+            continue
+        for o in starts:
+            w.event("e", ev_id, o, o + n, ev_id)
+
+
+def render_ics_rrule(
+    tl: Timeline,
+    M_raw: ModelSource,
+    *,
+    calendar_name: str = "Longevity 4.8",
+    uid_prefix: str = "longevity48",
+    now: datetime | None = None,
+) -> str:
+    """
+    ICS z seriami RRULE dla osi czasu `tl` (patrz opis modułu).
+    now: chwila eksportu (DTSTAMP; domyślnie bieżąca, UTC).
+    """
+    M = prepare_model(M_raw)
+    w = _Writer(uid_prefix, _dtstamp_utc(now))
+    o0 = tl.start.toordinal()
+    segments = _segments(tl)
+
+    # bloki: jedno wielodniowe wydarzenie na segment
+    for lo, hi in segments:
+        b = tl.blocks[lo]
+        w.event(
+            "b",
+            tl.block_ids[b],
+            o0 + lo,
+            o0 + hi,
+            f"{tl.block_ids[b]} - {tl.block_names[b]}",
+        )
+
+    # eventy (pulsy): serie roczne ciągów dni
+    event_days: dict[str, int] = {}
+    for i, e in enumerate(tl.events):
+        for ev_id in tl.event_sets[e]:
+            event_days[ev_id] = event_days.get(ev_id, 0) | (1 << i)
+    for ev_id, bits in event_days.items():
+        runs = [(o0 + lo, o0 + hi) for lo, hi in _runs(bits)]
+        _event_series(w, ev_id, runs)
+
+    # suplementy: seria per segment bloku; sąsiednie segmenty z tym samym
+    # zestawem dni tygodnia (np. CORE codziennie) łączone w jedną serię
+    for sid, col in zip(tl.supplement_ids, tl.columns, strict=True):
+        if not col:
+            continue
+        label = _supplement_label(M, sid)
+        group: tuple[int, int, frozenset[int]] | None = None
+        for lo, hi in segments:
+            bits = (col >> lo) & ((1 << (hi - lo)) - 1)
+            if not bits:
+                continue
+            wds = frozenset(
+                (o0 + lo + j - 1) % 7
+                for a, b in _runs(bits)
+                for j in range(a, min(b, a + 7))
+            )
+            if group is not None and group[1] == lo and group[2] == wds:
+                group = (group[0], hi, wds)
+                continue
+            if group is not None:
+                _emit_group(w, sid, label, o0, col, group[0], group[1])
+            group = (lo, hi, wds)
+        if group is not None:
+            _emit_group(w, sid, label, o0, col, group[0], group[1])
+
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//Longevity 4.8//Schedule//EN",
+        "CALSCALE:GREGORIAN",
+        f"X-WR-CALNAME:{_ics_escape(calendar_name)}",
+        *w.lines,
+        "END:VCALENDAR",
+    ]
+    return "\n".join(_ics_fold_lines(lines)) + "\n"
+
+
+def export_ics_rrule(
+    tl: Timeline,
+    M_raw: ModelSource,
+    path: str,
+    *,
+    calendar_name: str = "Longevity 4.8",
+    uid_prefix: str = "longevity48",
+    now: datetime | None = None,
+) -> None:
+    text = render_ics_rrule(
+        tl,
+        M_raw,
+        calendar_name=calendar_name,
+        uid_prefix=uid_prefix,
+        now=now,
+    )
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        f.write(text)
+
+
+def expand_rrule_days(
+    dtstart: date, rule: str, exdates: set[date]
+) -> list[date]:
+    """
+    Rozwinięcie serii w formie emitowanej przez render_ics_rrule
+    (FREQ=DAILY|WEEKLY|YEARLY, BYDAY, UNTIL) - do weryfikacji i podglądu.
+    Zwraca dni rozpoczęcia wystąpień.
+    """
+    parts = dict(p.split("=", 1) for p in rule.split(";"))
+    u = parts["UNTIL"]
+    until = date(int(u[:4]), int(u[4:6]), int(u[6:8]))
+    if parts["FREQ"] == "YEARLY":
+        years = range(dtstart.year, until.year + 1)
+        return [
+            x
+            for x in (dtstart.replace(year=y) for y in years)
+            if x <= until and x not in exdates
+        ]
+    if parts["FREQ"] == "DAILY":
+        allowed = set(range(7))
+    else:
+        allowed = {_BYDAY.index(x) for x in parts["BYDAY"].split(",")}
+    out: list[date] = []
+    d = dtstart
+    while d <= until:
+        if d.weekday() in allowed and d not in exdates:
+            out.append(d)
+        d += timedelta(days=1)
+    return out
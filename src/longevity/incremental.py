@@ -0,0 +1,204 @@
+"""
+Przeliczenie osi czasu po zmianie parametrów runtime - tylko dni, na
+które zmiana może wpłynąć.
+
+Zależności parametrów (poza nimi dzień zależy tylko od kalendarza
+i modelu):
+- off_week_start_date / off_week_week_of_year / skip_windows:
+  dni, których przynależność do wyjątku globalnego się zmienia,
+- flags: dni z blokiem, w którym aktywna jest reguła optional dla
+  zmienionej flagi,
+- cycle_anchor_date: dni, w których reguła cycle_weeks (custom_date)
+  zmienia fazę on/off, w blokach tej reguły.
+
+Bloki i eventy nie zależą od parametrów - zmieniają się tylko maski
+suplementów i flagi dnia.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import Any
+
+from .engine import (
+    ModelSource,
+    _ensure,
+    _merge_intervals,
+    generate_plan_range,
+    prepare_model,
+    resolve_exception_intervals,
+)
+from .timeline import OFF_WEEK, PULSE_DAY, Timeline
+
+_EXCEPTION_KEYS = (
+    "off_week_start_date",
+    "off_week_week_of_year",
+    "skip_windows",
+)
+PARAM_KEYS = (*_EXCEPTION_KEYS, "cycle_anchor_date", "flags")
+
+
+def _exception_ranges(
+    M: dict[str, Any], tl: Timeline, params: dict[str, Any], check: bool
+) -> list[tuple[int, int]]:
+    return [
+        (tl.index_of(lo_d), tl.index_of(hi_d) + 1)
+        for lo_d, hi_d in _merge_intervals(
+            resolve_exception_intervals(
+                M,
+                tl.start,
+                tl.end,
+                **{k: params.get(k) for k in _EXCEPTION_KEYS},
+                check_events=check,
+            )
+        )
+    ]
+
+
+def _block_days(tl: Timeline, blocks: set[str] | None) -> list[int]:
+    """
+    Indeksy dni z blokiem z `blocks` (None = każdy blok).
+    """
+    if blocks is None:
+        return list(range(len(tl)))
+    codes = {b for b, bid in enumerate(tl.block_ids) if bid in blocks}
+    return [i for i, b in enumerate(tl.blocks) if b in codes]
+
+
+def _rules(M: dict[str, Any], rtype: str) -> list[dict[str, Any]]:
+    return [
+        rule
+        for spec in M["SUPPLEMENTS"].values()
+        for rule in spec.get("schedule_rules", [])
+        if rule["type"] == rtype
+    ]
+
+
+def _active_blocks(rule: dict[str, Any]) -> set[str] | None:
+    ab = rule.get("active_blocks")
+    return None if ab is None else set(ab)
+
+
+def _affected(
+    M: dict[str, Any],
+    tl: Timeline,
+    old: dict[str, Any],
+    new: dict[str, Any],
+) -> bytearray:
+    unknown = (set(old) | set(new)) - set(PARAM_KEYS)
+    _ensure(not unknown, f"Unknown parameters: {sorted(unknown)}")
+    hit = bytearray(len(tl))
+
+    if any(old.get(k) != new.get(k) for k in _EXCEPTION_KEYS):
+        # dzień zmienia się, gdy należy do wyjątku tylko po jednej stronie
+        a = _exception_ranges(M, tl, old, check=False)
+        b = _exception_ranges(M, tl, new, check=True)
+        for lo, hi in set(a) ^ set(b):
+            for i in range(lo, hi):
+                hit[i] ^= 1
+
+    old_flags, new_flags = old.get("flags") or {}, new.get("flags") or {}
+    changed = {
+        k
+        for k in set(old_flags) | set(new_flags)
+        if bool(old_flags.get(k, False)) != bool(new_flags.get(k, False))
+    }
+    for rule in _rules(M, "optional"):
+        if rule["params"]["flag"] in changed:
+            for i in _block_days(tl, _active_blocks(rule)):
+                hit[i] = 1
+
+    a_old, a_new = old.get("cycle_anchor_date"), new.get("cycle_anchor_date")
+    if a_old != a_new:
+        o0 = tl.start.toordinal()
+        for rule in _rules(M, "cycle_weeks"):
+            params = rule.get("params", {})
+            if params.get("alignment", "custom_date") != "custom_date":
+                continue
+            on_w = int(params["on_weeks"])
+            period = on_w + int(params["off_weeks"])
+            days = _block_days(tl, _active_blocks(rule))
+            if a_old is None or a_new is None:
+                for i in days:
+                    hit[i] = 1
+                continue
+            x, y = a_old.toordinal(), a_new.toordinal()
+            for i in days:
+                o = o0 + i
+                if ((o - x) // 7 % period < on_w) != (
+                    (o - y) // 7 % period < on_w
+                ):
+                    hit[i] = 1
+    return hit
+
+
+def _ranges(hit: bytearray) -> list[tuple[int, int]]:
+    out: list[tuple[int, int]] = []
+    i, n = 0, len(hit)
+    while True:
+        lo = hit.find(1, i)
+        if lo < 0:
+            return out
+        hi = hit.find(0, lo)
+        hi = n if hi < 0 else hi
+        out.append((lo, hi))
+        i = hi
+
+
+def affected_ranges(
+    M_raw: ModelSource,
+    tl: Timeline,
+    old_params: dict[str, Any],
+    new_params: dict[str, Any],
+) -> list[tuple[date, date]]:
+    """
+    Przedziały dni [od, do] osi `tl`, które mogą się zmienić przy
+    przejściu old_params -> new_params (klucze jak w
+    generate_plan_range).
+    """
+    M = prepare_model(M_raw)
+    hit = _affected(M, tl, old_params, new_params)
+    return [(tl.day(lo), tl.day(hi - 1)) for lo, hi in _ranges(hit)]
+
+
+def update_timeline(
+    M_raw: ModelSource,
+    tl: Timeline,
+    old_params: dict[str, Any],
+    new_params: dict[str, Any],
+) -> Timeline:
+    """
+    Oś `tl` (policzona z old_params) przeliczona dla new_params; wynik
+    jak generate_timeline(M, tl.start, tl.end, **new_params).
+    """
+    M = prepare_model(M_raw)
+    ranges = _ranges(_affected(M, tl, old_params, new_params))
+    if not ranges:
+        return tl
+
+    bit = {sid: 1 << b for b, sid in enumerate(tl.supplement_ids)}
+    masks = list(tl.masks)
+    day_flags = bytearray(tl.day_flags)
+    for lo, hi in ranges:
+        plans = generate_plan_range(
+            M, tl.day(lo), tl.day(hi - 1), **new_params
+        )
+        for i, p in enumerate(plans, lo):
+            m = 0
+            for it in p.items:
+                m |= bit[it.supplement_id]
+            masks[i] = m
+            day_flags[i] = (OFF_WEEK if p.is_off_week else 0) | (
+                PULSE_DAY if p.is_pulse_day else 0
+            )
+    return Timeline(
+        start=tl.start,
+        supplement_ids=tl.supplement_ids,
+        block_ids=tl.block_ids,
+        block_names=tl.block_names,
+        event_sets=tl.event_sets,
+        masks=masks,
+        blocks=tl.blocks,
+        events=tl.events,
+        day_flags=bytes(day_flags),
+    )
@@ -1,78 +1,55 @@
 from __future__ import annotations
 
 import os
-import smtplib
 from datetime import date, timedelta
-from email.message import EmailMessage
+from typing import TYPE_CHECKING
 
-from . import spec
 from .engine import (
-    DayItem,
     DayPlan,
+    ModelSource,
     assemble_model_from_globals,
-    generate_year_plan,
+    format_day_text,
+    format_item_label,
+    generate_plan_range,
 )
 
+if TYPE_CHECKING:
+    from email.message import EmailMessage
+
+# Ile dni planu liczy mailer (dziś + załącznik z kolejnymi dniami)
+HORIZON_DAYS = 30
 
-def _bucket_items(p: DayPlan) -> dict[str, list[str]]:
-    def fmt(it: DayItem) -> str:
-        dose = it.dose
-        if isinstance(dose, dict):
-            amt = dose.get("amount")
-            unit = dose.get("unit")
-            if amt is not None or unit is not None:
-                return f"{it.name} ({amt} {unit})".strip()
-        return it.name
 
+def _bucket_items(p: DayPlan) -> dict[str, list[str]]:
     buckets: dict[str, list[str]] = {"morning": [], "any": [], "evening": []}
     for it in p.items:
         if it.timing_hint == "morning":
-            buckets["morning"].append(fmt(it))
+            buckets["morning"].append(format_item_label(it))
         elif it.timing_hint == "evening":
-            buckets["evening"].append(fmt(it))
+            buckets["evening"].append(format_item_label(it))
         else:
-            buckets["any"].append(fmt(it))
+            buckets["any"].append(format_item_label(it))
     return buckets
 
 
 def build_email_text(p: DayPlan) -> str:
-    b = _bucket_items(p)
-    events = list(p.events)
-    if p.is_off_week:
-        events = ["off_week"] + events
-    ev = ", ".join(events) if events else "-"
-
-    lines = []
-    lines.append(f"DATA: {p.day.isoformat()}")
-    lines.append(f"MODUŁ: {p.block_id}")
-    lines.append(f"EVENTY: {ev}")
-    lines.append("")
-    lines.append("RANO:")
-    lines.extend([f"- {x}" for x in b["morning"]] or ["- (brak)"])
-    lines.append("")
-    lines.append("W CIĄGU DNIA:")
-    lines.extend([f"- {x}" for x in b["any"]] or ["- (brak)"])
-    lines.append("")
-    lines.append("WIECZÓR:")
-    lines.extend([f"- {x}" for x in b["evening"]] or ["- (brak)"])
-    return "\n".join(lines)
+    return format_day_text(p, _bucket_items(p))
 
 
-def send_email_smtp(
+def build_message(
     *,
-    smtp_host: str,
-    smtp_port: int,
-    smtp_user: str,
-    smtp_password: str,
-    to_email: str,
+    from_email: str,
+    to_email: str | None,
     subject: str,
     body: str,
     attachment_txt: tuple[str, str] | None = None,
-    use_tls: bool = True,
-) -> None:
+) -> EmailMessage:
+    from email.message import EmailMessage
+
     msg = EmailMessage()
-    msg["From"] = smtp_user
-    msg["To"] = to_email
+    msg["From"] = from_email
+    if to_email is not None:
+        msg["To"] = to_email
     msg["Subject"] = subject
     msg.set_content(body)
 
@@ -84,6 +61,31 @@ def send_email_smtp(
             subtype="plain",
             filename=filename,
         )
+    return msg
+
+
+def send_email_smtp(
+    *,
+    smtp_host: str,
+    smtp_port: int,
+    smtp_user: str,
+    smtp_password: str,
+    to_email: str,
+    subject: str,
+    body: str,
+    attachment_txt: tuple[str, str] | None = None,
+    use_tls: bool = True,
+) -> None:
+    # smtplib/email ładowane dopiero przy wysyłce (szybszy cold start)
+    import smtplib
+
+    msg = build_message(
+        from_email=smtp_user,
+        to_email=to_email,
+        subject=subject,
+        body=body,
+        attachment_txt=attachment_txt,
+    )
 
     if use_tls:
         with smtplib.SMTP(smtp_host, smtp_port) as s:
@@ -115,6 +117,19 @@ def build_30day_text(plans: list[DayPlan], start: date, days: int = 30) -> str:
     return "\n".join(chunks).strip() + "\n"
 
 
+def day_mail(
+    p: DayPlan, plans: list[DayPlan]
+) -> tuple[str, str, tuple[str, str]]:
+    """
+    (temat, treść, załącznik z HORIZON_DAYS dni od p.day) maila dnia.
+    """
+    target = p.day
+    horizon_txt = build_30day_text(plans, target, days=HORIZON_DAYS)
+    attach_name = f"longevity_next_30_days_{target.isoformat()}.txt"
+    subject = f"Longevity 4.8 — {p.day.isoformat()} ({p.block_id})"
+    return subject, build_email_text(p), (attach_name, horizon_txt)
+
+
 def main():
     print("Mailer start")
 
@@ -128,17 +143,23 @@ def main():
         else:
             print(f"ENV {k}={v}")
 
-    # 1) plan
-    M_raw = assemble_model_from_globals(spec)
-    plans = generate_year_plan(
+    # 1) plan: tylko dni potrzebne do maila, nie cały rok
+    # LONGEVITY_SNAPSHOT=spec.snap -> model ze snapshotu (bez spec.py)
+    target = date.today()
+    M_raw: ModelSource | None = os.environ.get("LONGEVITY_SNAPSHOT")
+    if not M_raw:
+        from . import spec
+
+        M_raw = assemble_model_from_globals(spec)
+    plans = generate_plan_range(
         M_raw,
-        2026,
+        target,
+        target + timedelta(days=HORIZON_DAYS - 1),
         off_week_start_date=date(2026, 2, 2),
         cycle_anchor_date=date(2026, 1, 6),
         flags={"enable_melissa": True},
     )
 
-    target = date.today()
     print("Target date:", target.isoformat())
     print(
         "Plans range:",
@@ -151,14 +172,9 @@ def main():
     print("Found day:", p is not None)
 
     if p is None:
-        raise RuntimeError(
-            "Target day not found in generated plans (year mismatch?)"
-        )
+        raise RuntimeError("Target day not found in generated plans")
 
-    body = build_email_text(p)
-    horizon_txt = build_30day_text(plans, target, days=30)
-    attach_name = f"longevity_next_30_days_{target.isoformat()}.txt"
-    subject = f"Longevity 4.8 — {p.day.isoformat()} ({p.block_id})"
+    subject, body, attachment = day_mail(p, plans)
     print("Subject:", subject)
     print("Body preview:", body[:120].replace("\n", " | "), "...")
 
@@ -170,7 +186,7 @@ def main():
         to_email="arkadiusz.pajda.97@onet.pl",
         subject=subject,
         body=body,
-        attachment_txt=(attach_name, horizon_txt),
+        attachment_txt=attachment,
         use_tls=False,
     )
 
@@ -1,7 +1,5 @@
 from datetime import date
 
-from dotenv import load_dotenv
-
 from longevity import spec
 from longevity.engine import (
     assemble_model_from_globals,
@@ -9,24 +7,33 @@ from longevity.engine import (
     generate_year_plan,
 )
 
-load_dotenv()
 
-M_raw = assemble_model_from_globals(spec)
+def main() -> None:
+    # dotenv tylko przy uruchomieniu, nie przy imporcie modułu
+    from dotenv import load_dotenv
 
-plans = generate_year_plan(
-    M_raw,
-    2026,
-    off_week_start_date=date(2026, 2, 2),  # poniedziałek
-    cycle_anchor_date=date(2026, 1, 6),
-    flags={"enable_melissa": True},
-)
+    load_dotenv()
+
+    M_raw = assemble_model_from_globals(spec)
+
+    plans = generate_year_plan(
+        M_raw,
+        2026,
+        off_week_start_date=date(2026, 2, 2),  # poniedziałek
+        cycle_anchor_date=date(2026, 1, 6),
+        flags={"enable_melissa": True},
+    )
+
+    # podgląd 1 dnia
+    p = plans[0]
+    print(p.day, p.block_id, p.events)
+    for it in p.items:
+        print("-", it.supplement_id, it.timing_hint, it.priority)
+
+    # zapis CSV
+    export_csv(plans, "longevity_2026.csv")
+    print("CSV saved: longevity_2026.csv")
 
-# podgląd 1 dnia
-p = plans[0]
-print(p.day, p.block_id, p.events)
-for it in p.items:
-    print("-", it.supplement_id, it.timing_hint, it.priority)
 
-# zapis CSV
-export_csv(plans, "longevity_2026.csv")
-print("CSV saved: longevity_2026.csv")
+if __name__ == "__main__":
+    main()
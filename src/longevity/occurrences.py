@@ -0,0 +1,169 @@
+"""
+Indeks odwrotny: suplement -> bitmapa dni, w których występuje.
+
+Zapytania typu "wszystkie dni z nmn w Q2", "następny dzień z
+fisetin_pulse po dziś", "ile dni d3k2 w tym roku" oraz część wspólna /
+suma kilku suplementów to operacje na intach (shift, &, |, bit_count),
+bez skanowania list DayPlan.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from .engine import DayPlan, ModelSource
+from .timeline import Timeline, timeline_from_plans
+
+
+@dataclass(frozen=True)
+class DaySet:
+    """
+    Zbiór dni osi czasu: bit i = dzień start + i (i < length).
+    """
+
+    start: date
+    length: int
+    bits: int
+
+    def _same_axis(self, other: DaySet) -> None:
+        if (self.start, self.length) != (other.start, other.length):
+            raise ValueError("DaySet operands must share the same date axis")
+
+    def __and__(self, other: DaySet) -> DaySet:
+        self._same_axis(other)
+        return DaySet(self.start, self.length, self.bits & other.bits)
+
+    def __or__(self, other: DaySet) -> DaySet:
+        self._same_axis(other)
+        return DaySet(self.start, self.length, self.bits | other.bits)
+
+    def __sub__(self, other: DaySet) -> DaySet:
+        self._same_axis(other)
+        return DaySet(self.start, self.length, self.bits & ~other.bits)
+
+    def __invert__(self) -> DaySet:
+        full = (1 << self.length) - 1
+        return DaySet(self.start, self.length, ~self.bits & full)
+
+    def __len__(self) -> int:
+        return self.bits.bit_count()
+
+    def __bool__(self) -> bool:
+        return self.bits != 0
+
+    def __contains__(self, d: object) -> bool:
+        if not isinstance(d, date):
+            return False
+        i = (d - self.start).days
+        return 0 <= i < self.length and bool(self.bits >> i & 1)
+
+    def __iter__(self) -> Iterator[date]:
+        m = self.bits
+        while m:
+            low = m & -m
+            yield self.start + timedelta(days=low.bit_length() - 1)
+            m ^= low
+
+    def _clip_index(self, d: date) -> int:
+        return min(max((d - self.start).days, 0), self.length)
+
+    def within(
+        self, start: date | None = None, end: date | None = None
+    ) -> DaySet:
+        """
+        Przycięcie do [start, end] (włącznie); oś czasu bez zmian.
+        """
+        lo = 0 if start is None else self._clip_index(start)
+        hi = (
+            self.length
+            if end is None
+            else self._clip_index(end + timedelta(days=1))
+        )
+        if hi <= lo:
+            return DaySet(self.start, self.length, 0)
+        window = ((1 << (hi - lo)) - 1) << lo
+        return DaySet(self.start, self.length, self.bits & window)
+
+    def first(self) -> date | None:
+        if not self.bits:
+            return None
+        low = self.bits & -self.bits
+        return self.start + timedelta(days=low.bit_length() - 1)
+
+    def last(self) -> date | None:
+        if not self.bits:
+            return None
+        return self.start + timedelta(days=self.bits.bit_length() - 1)
+
+    def next_after(self, d: date, *, inclusive: bool = False) -> date | None:
+        i = (d - self.start).days + (0 if inclusive else 1)
+        if i >= self.length:
+            return None
+        rest = self.bits >> max(i, 0)
+        if not rest:
+            return None
+        low = rest & -rest
+        return self.start + timedelta(days=max(i, 0) + low.bit_length() - 1)
+
+
+class OccurrenceIndex:
+    """
+    supplement_id -> DaySet, zbudowany z kolumn Timeline.
+    """
+
+    def __init__(self, timeline: Timeline):
+        self.start = timeline.start
+        self.length = len(timeline)
+        self._bits = dict(
+            zip(timeline.supplement_ids, timeline.columns, strict=True)
+        )
+
+    @classmethod
+    def from_plans(
+        cls, plans: list[DayPlan], M_raw: ModelSource
+    ) -> OccurrenceIndex:
+        return cls(timeline_from_plans(plans, M_raw))
+
+    def __contains__(self, supplement_id: object) -> bool:
+        return supplement_id in self._bits
+
+    def __getitem__(self, supplement_id: str) -> DaySet:
+        return DaySet(self.start, self.length, self._bits[supplement_id])
+
+    def supplement_ids(self) -> list[str]:
+        return list(self._bits)
+
+    def all_of(self, *supplement_ids: str) -> DaySet:
+        bits = (1 << self.length) - 1
+        for sid in supplement_ids:
+            bits &= self._bits[sid]
+        return DaySet(self.start, self.length, bits)
+
+    def any_of(self, *supplement_ids: str) -> DaySet:
+        bits = 0
+        for sid in supplement_ids:
+            bits |= self._bits[sid]
+        return DaySet(self.start, self.length, bits)
+
+    def days(
+        self,
+        supplement_id: str,
+        start: date | None = None,
+        end: date | None = None,
+    ) -> list[date]:
+        return list(self[supplement_id].within(start, end))
+
+    def count(
+        self,
+        supplement_id: str,
+        start: date | None = None,
+        end: date | None = None,
+    ) -> int:
+        return len(self[supplement_id].within(start, end))
+
+    def next_day(
+        self, supplement_id: str, after: date, *, inclusive: bool = False
+    ) -> date | None:
+        return self[supplement_id].next_after(after, inclusive=inclusive)
@@ -0,0 +1,185 @@
+"""
+Nakładki (copy-on-write) na wspólny, skompilowany model.
+
+Baza = znormalizowany model (normalize_model / snapshot), współdzielony
+przez wszystkich użytkowników i nigdy nie mutowany. Użytkownik trzyma
+tylko małą deltę, np.:
+
+    delta = {
+        "disable": ["melissa"],
+        "rule_params": {"nmn": {"nmn_4x_week": {"fixed_days": [0, 2]}}},
+        "supplements": {"d3k2": {"priority": 90}},
+        "block_calendar": {10: "MITO"},
+    }
+
+- disable: suplement nigdy się nie pojawia (także z CORE_SET),
+- rule_params: podmiana params wybranej reguły (np. przesunięcie
+  week_pattern),
+- supplements: podmiana pól wpisu SUPPLEMENTS,
+- block_calendar: podmiana bloku dla miesiąca.
+
+Rekompilowane (normalize_supplement) są tylko dotknięte suplementy;
+pełny model powstaje leniwie w materialize() i współdzieli resztę
+poddrzew z bazą.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any
+
+from .engine import (
+    ITEM_RANK_KEY,
+    NORMALIZED_KEY,
+    ModelSource,
+    _ensure,
+    compute_item_ranks,
+    normalize_supplement,
+    prepare_model,
+)
+
+_DELTA_KEYS = {"disable", "rule_params", "supplements", "block_calendar"}
+
+
+@dataclass(frozen=True, slots=True)
+class ModelOverlay:
+    base: dict[str, Any]
+    supplements: dict[str, dict[str, Any]]  # znormalizowane nadpisania
+    block_calendar: dict[int, str]
+    disabled: frozenset[str]
+
+    def materialize(self) -> dict[str, Any]:
+        """
+        Model dla generatora: płytka kopia top-level bazy + nadpisania.
+        Niedotknięte wpisy SUPPLEMENTS są współdzielone z bazą.
+        """
+        N = dict(self.base)
+        if self.supplements:
+            supps = dict(self.base["SUPPLEMENTS"])
+            supps.update(self.supplements)
+            N["SUPPLEMENTS"] = supps
+            # timing / priorytet mogły się zmienić
+            N[ITEM_RANK_KEY] = compute_item_ranks(N)
+        if self.block_calendar:
+            N["BLOCK_CALENDAR"] = {
+                **self.base["BLOCK_CALENDAR"],
+                **self.block_calendar,
+            }
+        if self.disabled:
+            N["CORE_SET"] = [
+                sid
+                for sid in self.base["CORE_SET"]
+                if sid not in self.disabled
+            ]
+        N[NORMALIZED_KEY] = True
+        return N
+
+
+def _disabled_spec(spec: dict[str, Any]) -> dict[str, Any]:
+    # brak reguł + pusty allowed_blocks: nie doda go ani harmonogram,
+    # ani event_only; odwołania innych suplementów usuwa _without_refs
+    out = dict(spec)
+    out["schedule_rules"] = []
+    out["constraints"] = [
+        {
+            "id": f"{spec.get('id', 'supplement')}_disabled",
+            "type": "allowed_blocks",
+            "params": {"blocks": []},
+        }
+    ]
+    return out
+
+
+_REF_CONSTRAINTS = ("require_supplements", "exclude_supplements")
+
+
+def _without_refs(
+    spec: dict[str, Any], disabled: frozenset[str]
+) -> dict[str, Any] | None:
+    """
+    Wpis bez odwołań require/exclude_supplements do wyłączonych
+    suplementów (None = bez zmian). Inaczej require dodawałby suplement,
+    który jego allowed_blocks od razu usuwa - constraints bez punktu stałego.
+    """
+    if not any(
+        c["type"] in _REF_CONSTRAINTS
+        and disabled.intersection(
+            c.get("params", {}).get("supplement_ids", ())
+        )
+        for c in spec.get("constraints", [])
+    ):
+        return None
+    constraints = []
+    for c in spec["constraints"]:
+        if c["type"] in _REF_CONSTRAINTS:
+            ids = [
+                x for x in c["params"]["supplement_ids"] if x not in disabled
+            ]
+            if not ids:
+                continue
+            c = {**c, "params": {**c["params"], "supplement_ids": ids}}
+        constraints.append(c)
+    return {**spec, "constraints": constraints}
+
+
+def overlay_model(base: ModelSource, delta: dict[str, Any]) -> ModelOverlay:
+    """
+    Buduje nakładkę użytkownika na bazę (dict / snapshot / inny overlay
+    jako baza zostanie zmaterializowany).
+    """
+    B = prepare_model(base)
+    unknown = set(delta) - _DELTA_KEYS
+    _ensure(not unknown, f"Unknown overlay delta keys: {sorted(unknown)}")
+
+    supps = B["SUPPLEMENTS"]
+    patched: dict[str, dict[str, Any]] = {}
+
+    for sid, fields in delta.get("supplements", {}).items():
+        _ensure(sid in supps, f"Overlay references unknown supplement: {sid}")
+        patched[sid] = {**supps[sid], **fields}
+
+    for sid, rules in delta.get("rule_params", {}).items():
+        _ensure(sid in supps, f"Overlay references unknown supplement: {sid}")
+        spec = dict(patched.get(sid, supps[sid]))
+        by_id = {r["id"]: r for r in spec.get("schedule_rules", [])}
+        for rule_id in rules:
+            _ensure(
+                rule_id in by_id,
+                f"Overlay references unknown rule: {sid}.{rule_id}",
+            )
+        spec["schedule_rules"] = [
+            {**r, "params": {**r.get("params", {}), **rules[r["id"]]}}
+            if r["id"] in rules
+            else r
+            for r in spec.get("schedule_rules", [])
+        ]
+        patched[sid] = spec
+
+    disabled = frozenset(delta.get("disable", ()))
+    for sid in disabled:
+        _ensure(sid in supps, f"Overlay references unknown supplement: {sid}")
+        patched[sid] = _disabled_spec(patched.get(sid, supps[sid]))
+    if disabled:
+        for sid in supps.keys() - disabled:
+            stripped = _without_refs(patched.get(sid, supps[sid]), disabled)
+            if stripped is not None:
+                patched[sid] = stripped
+
+    block_calendar = {
+        int(m): b for m, b in delta.get("block_calendar", {}).items()
+    }
+    for m, b in block_calendar.items():
+        _ensure(1 <= m <= 12, f"BLOCK_CALENDAR invalid month key: {m}")
+        _ensure(
+            b in B["BLOCKS"],
+            f"BLOCK_CALENDAR references unknown block: month={m} block={b}",
+        )
+
+    return ModelOverlay(
+        base=B,
+        supplements={
+            sid: normalize_supplement(spec) for sid, spec in patched.items()
+        },
+        block_calendar=block_calendar,
+        disabled=disabled,
+    )
@@ -0,0 +1,119 @@
+"""
+Generowanie długich horyzontów (50-100 lat) w shardach miesięcznych albo
+rocznych na puli procesów.
+
+Shard dostaje tylko swój kontekst: kotwicę cyklu (fazy liczone od niej
+bezwzględnie) oraz przedziały wyjątków przycięte do swojego zakresu -
+wyjątki (i konflikty z eventami) rozwiązywane są raz, w procesie
+głównym. Wyniki sklejane są w kolejności do jednej osi czasu.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from datetime import date, timedelta
+from typing import Any
+
+from .engine import (
+    ModelSource,
+    _ensure,
+    _merge_intervals,
+    prepare_model,
+    resolve_exception_intervals,
+)
+from .timeline import Timeline, concat_timelines, generate_timeline
+
+# model procesu roboczego (ustawiany raz przez initializer puli)
+_WORKER_MODEL: dict[str, Any] | None = None
+
+
+def _init_worker(M: dict[str, Any]) -> None:
+    global _WORKER_MODEL
+    _WORKER_MODEL = M
+
+
+def _run_shard(job: tuple[date, date, dict[str, Any]]) -> Timeline:
+    assert _WORKER_MODEL is not None
+    lo, hi, params = job
+    return generate_timeline(_WORKER_MODEL, lo, hi, **params)
+
+
+def shard_ranges(start: date, end: date, by: str) -> list[tuple[date, date]]:
+    """
+    [start, end] pocięty na miesiące albo lata kalendarzowe (włącznie).
+    """
+    _ensure(by in ("month", "year"), f"Unknown shard size: {by}")
+    out: list[tuple[date, date]] = []
+    lo = start
+    while lo <= end:
+        if by == "month":
+            nxt = date(lo.year + lo.month // 12, lo.month % 12 + 1, 1)
+        else:
+            nxt = date(lo.year + 1, 1, 1)
+        hi = min(nxt - timedelta(days=1), end)
+        out.append((lo, hi))
+        lo = nxt
+    return out
+
+
+def generate_timeline_parallel(
+    M_raw: ModelSource,
+    start: date,
+    end: date,
+    *,
+    shard: str = "year",
+    workers: int | None = None,
+    off_week_start_date: date | Iterable[date] | None = None,
+    off_week_week_of_year: int | Iterable[int] | None = None,
+    cycle_anchor_date: date | None = None,
+    flags: dict[str, bool] | None = None,
+    skip_windows: Iterable[tuple[date, date]] | None = None,
+) -> Timeline:
+    """
+    Jak generate_timeline, ale shardy liczone równolegle
+    (workers=None -> liczba rdzeni, workers=1 -> w bieżącym procesie).
+    """
+    _ensure(start <= end, f"start must be <= end: {start} > {end}")
+    M = prepare_model(M_raw)
+    coverage = _merge_intervals(
+        resolve_exception_intervals(
+            M,
+            start,
+            end,
+            off_week_start_date=off_week_start_date,
+            off_week_week_of_year=off_week_week_of_year,
+            skip_windows=skip_windows,
+        )
+    )
+
+    jobs: list[tuple[date, date, dict[str, Any]]] = []
+    for lo, hi in shard_ranges(start, end, shard):
+        windows = [
+            (max(a, lo), min(b, hi))
+            for a, b in coverage
+            if a <= hi and b >= lo
+        ]
+        params = {
+            "cycle_anchor_date": cycle_anchor_date,
+            "flags": flags,
+            "skip_windows": windows,
+        }
+        jobs.append((lo, hi, params))
+
+    if workers == 1 or len(jobs) == 1:
+        parts = [generate_timeline(M, lo, hi, **p) for lo, hi, p in jobs]
+    else:
+        import os
+        from concurrent.futures import ProcessPoolExecutor
+
+        n = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(
+            max_workers=n, initializer=_init_worker, initargs=(M,)
+        ) as pool:
+            parts = list(
+                pool.map(
+                    _run_shard, jobs, chunksize=max(1, len(jobs) // (n * 4))
+                )
+            )
+
+    return concat_timelines(parts)
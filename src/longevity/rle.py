@@ -0,0 +1,245 @@
+"""
+Kodowanie osi czasu ciągami (run-length) i okresami tygodniowymi.
+
+Dzień to symbol = (maska suplementów, blok, zestaw eventów, flagi);
+oś czasu to lista odcinków (start, wzorzec): dzień i odcinka ma symbol
+wzorzec[(i - start) % len(wzorzec)]. Wzorzec długości 1 to zwykły ciąg
+(np. OFF WEEK), długości 7 - powtarzający się tydzień w bloku, dłuższy
+- dni nieregularne zapisane wprost.
+
+Dostęp do dnia: bisect po startach odcinków; dekodowanie do DayPlan
+leniwie, z cache DayItem per maska dla ostatnio użytego modelu (inny
+model - np. nakładka - czyści cache). to_bytes/from_bytes: marshal.
+"""
+
+from __future__ import annotations
+
+import marshal
+from bisect import bisect_right
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from typing import Any
+
+from .engine import (
+    DayItem,
+    DayPlan,
+    ModelSource,
+    _ensure,
+    _ordered_items,
+    prepare_model,
+)
+from .timeline import OFF_WEEK, PULSE_DAY, Timeline
+
+RLE_FORMAT = "longevity-rle"
+RLE_VERSION = 1
+
+# tydzień: wzorzec musi się powtórzyć co najmniej dwa razy
+_PERIODS = (1, 7)
+
+
+def _encode_runs(
+    symbols: list[int],
+) -> tuple[list[int], list[tuple[int, ...]]]:
+    """
+    Zachłanne kodowanie: w każdym miejscu najdłuższy ciąg (okres 1) albo
+    powtarzający się tydzień (okres 7); reszta jako literały.
+    """
+    n = len(symbols)
+    starts: list[int] = []
+    patterns: list[tuple[int, ...]] = []
+    literal_start = 0
+
+    def flush(upto: int) -> None:
+        if upto > literal_start:
+            starts.append(literal_start)
+            patterns.append(tuple(symbols[literal_start:upto]))
+
+    i = 0
+    while i < n:
+        best_p, best_len = 0, 0
+        for p in _PERIODS:
+            j = i + p
+            if j > n:
+                continue
+            while j < n and symbols[j] == symbols[j - p]:
+                j += 1
+            if j - i >= 2 * p and j - i > best_len:
+                best_p, best_len = p, j - i
+        if best_p == 0:
+            i += 1
+            continue
+        flush(i)
+        starts.append(i)
+        patterns.append(tuple(symbols[i : i + best_p]))
+        i += best_len
+        literal_start = i
+    flush(n)
+    return starts, patterns
+
+
+@dataclass(frozen=True)
+class EncodedTimeline:
+    start: date
+    length: int
+    supplement_ids: tuple[str, ...]
+    block_ids: tuple[str, ...]
+    block_names: tuple[str, ...]
+    event_sets: tuple[tuple[str, ...], ...]
+    # symbol -> (maska, indeks bloku, indeks zestawu eventów, flagi dnia)
+    symbols: tuple[tuple[int, int, int, int], ...]
+    run_starts: tuple[int, ...]  # rosnąco, run_starts[0] == 0
+    patterns: tuple[tuple[int, ...], ...]  # równoległe do run_starts
+    # id(M) -> (M, maska -> DayItem); tylko ostatni model
+    _items: dict[int, tuple[dict[str, Any], dict[int, list[DayItem]]]] = field(
+        default_factory=dict, compare=False, repr=False
+    )
+
+    @classmethod
+    def from_timeline(cls, tl: Timeline) -> EncodedTimeline:
+        index: dict[tuple[int, int, int, int], int] = {}
+        symbols: list[int] = []
+        for i, m in enumerate(tl.masks):
+            key = (m, tl.blocks[i], tl.events[i], tl.day_flags[i])
+            s = index.get(key)
+            if s is None:
+                s = index[key] = len(index)
+            symbols.append(s)
+        starts, patterns = _encode_runs(symbols)
+        return cls(
+            start=tl.start,
+            length=len(tl),
+            supplement_ids=tl.supplement_ids,
+            block_ids=tl.block_ids,
+            block_names=tl.block_names,
+            event_sets=tl.event_sets,
+            symbols=tuple(index),
+            run_starts=tuple(starts),
+            patterns=tuple(patterns),
+        )
+
+    def __len__(self) -> int:
+        return self.length
+
+    @property
+    def end(self) -> date:
+        return self.start + timedelta(days=self.length - 1)
+
+    def symbol(self, i: int) -> tuple[int, int, int, int]:
+        _ensure(0 <= i < self.length, f"Day index out of range: {i}")
+        r = bisect_right(self.run_starts, i) - 1
+        pat = self.patterns[r]
+        return self.symbols[pat[(i - self.run_starts[r]) % len(pat)]]
+
+    def _iter_symbols(self) -> Iterator[tuple[int, int, int, int]]:
+        bounds = self.run_starts[1:] + (self.length,)
+        for lo, hi, pat in zip(
+            self.run_starts, bounds, self.patterns, strict=True
+        ):
+            p = len(pat)
+            for i in range(hi - lo):
+                yield self.symbols[pat[i % p]]
+
+    def to_timeline(self) -> Timeline:
+        from array import array
+
+        masks: list[int] = []
+        blocks = bytearray()
+        events = array("H")
+        day_flags = bytearray()
+        for m, b, e, f in self._iter_symbols():
+            masks.append(m)
+            blocks.append(b)
+            events.append(e)
+            day_flags.append(f)
+        return Timeline(
+            start=self.start,
+            supplement_ids=self.supplement_ids,
+            block_ids=self.block_ids,
+            block_names=self.block_names,
+            event_sets=self.event_sets,
+            masks=masks,
+            blocks=bytes(blocks),
+            events=events,
+            day_flags=bytes(day_flags),
+        )
+
+    # --- DayPlan
+
+    def _day_plan(
+        self, M: dict[str, Any], i: int, sym: tuple[int, int, int, int]
+    ) -> DayPlan:
+        m, b, e, f = sym
+        slot = self._items.get(id(M))
+        if slot is None or slot[0] is not M:
+            self._items.clear()
+            slot = self._items[id(M)] = (M, {})
+        items = slot[1].get(m)
+        if items is None:
+            ids = [
+                sid for k, sid in enumerate(self.supplement_ids) if m >> k & 1
+            ]
+            items = slot[1][m] = _ordered_items(M, ids)
+        return DayPlan(
+            day=self.start + timedelta(days=i),
+            block_id=self.block_ids[b],
+            block_name=self.block_names[b],
+            items=list(items),
+            events=list(self.event_sets[e]),
+            is_off_week=bool(f & OFF_WEEK),
+            is_pulse_day=bool(f & PULSE_DAY),
+        )
+
+    def day_plan(self, M_raw: ModelSource, d: date) -> DayPlan:
+        i = (d - self.start).days
+        _ensure(0 <= i < self.length, f"Day not found: {d.isoformat()}")
+        return self._day_plan(prepare_model(M_raw), i, self.symbol(i))
+
+    def iter_plans(self, M_raw: ModelSource) -> Iterator[DayPlan]:
+        M = prepare_model(M_raw)
+        for i, sym in enumerate(self._iter_symbols()):
+            yield self._day_plan(M, i, sym)
+
+    # --- serializacja
+
+    def to_bytes(self) -> bytes:
+        return marshal.dumps(
+            (
+                RLE_FORMAT,
+                RLE_VERSION,
+                self.start.toordinal(),
+                self.length,
+                self.supplement_ids,
+                self.block_ids,
+                self.block_names,
+                self.event_sets,
+                self.symbols,
+                self.run_starts,
+                self.patterns,
+            )
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> EncodedTimeline:
+        payload = marshal.loads(data)
+        _ensure(
+            isinstance(payload, tuple)
+            and len(payload) == 11
+            and payload[0] == RLE_FORMAT,
+            "Not an encoded timeline",
+        )
+        _ensure(
+            payload[1] == RLE_VERSION,
+            f"Unsupported encoded timeline version: {payload[1]}",
+        )
+        return cls(
+            start=date.fromordinal(payload[2]),
+            length=payload[3],
+            supplement_ids=payload[4],
+            block_ids=payload[5],
+            block_names=payload[6],
+            event_sets=payload[7],
+            symbols=payload[8],
+            run_starts=payload[9],
+            patterns=payload[10],
+        )
@@ -0,0 +1,163 @@
+"""
+Prekompilowany snapshot speca.
+
+Snapshot = zwalidowany i znormalizowany model (normalize_model) zapisany
+przez `marshal` (same proste typy: dict/list/set/str/int/None), razem z
+wersją formatu i odciskiem (sha256) pliku źródłowego speca.
+
+Uruchom: python -m longevity.snapshot [spec.py] -o spec.snap
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import importlib.util
+import marshal
+import os
+from pathlib import Path
+from typing import Any
+
+from .engine import (
+    assemble_model_from_globals,
+    normalize_model,
+    validate_model,
+)
+
+SNAPSHOT_FORMAT = "longevity-snapshot"
+# Podbić przy każdej zmianie normalize_model / struktury snapshotu.
+SNAPSHOT_VERSION = 2
+
+DEFAULT_SPEC_PATH = Path(__file__).with_name("spec.py")
+
+
+class StaleSnapshotError(ValueError):
+    pass
+
+
+def spec_fingerprint(spec_path: str | os.PathLike[str]) -> str:
+    data = Path(spec_path).read_bytes()
+    h = hashlib.sha256(data)
+    h.update(f":{SNAPSHOT_FORMAT}:{SNAPSHOT_VERSION}".encode())
+    return h.hexdigest()
+
+
+def _load_spec_module(spec_path: Path):
+    name = f"_longevity_spec_{hashlib.sha1(bytes(spec_path)).hexdigest()}"
+    mod_spec = importlib.util.spec_from_file_location(name, spec_path)
+    if mod_spec is None or mod_spec.loader is None:
+        raise ImportError(f"Cannot load spec module from {spec_path}")
+    module = importlib.util.module_from_spec(mod_spec)
+    mod_spec.loader.exec_module(module)
+    return module
+
+
+def compile_model(spec_path: str | os.PathLike[str]) -> dict[str, Any]:
+    """
+    spec.py -> zwalidowany + znormalizowany model (bez zapisu).
+    """
+    path = Path(spec_path).resolve()
+    M_raw = assemble_model_from_globals(_load_spec_module(path))
+    validate_model(M_raw)
+    return normalize_model(M_raw)
+
+
+def compile_snapshot(
+    spec_path: str | os.PathLike[str] = DEFAULT_SPEC_PATH,
+    out_path: str | os.PathLike[str] | None = None,
+) -> Path:
+    """
+    Kompiluje spec do pliku snapshotu. Zwraca ścieżkę snapshotu
+    (domyślnie obok speca: spec.py -> spec.snap).
+    """
+    src = Path(spec_path).resolve()
+    out = Path(out_path) if out_path is not None else src.with_suffix(".snap")
+    st = src.stat()
+    payload = (
+        SNAPSHOT_FORMAT,
+        SNAPSHOT_VERSION,
+        spec_fingerprint(src),
+        str(src),
+        (st.st_mtime_ns, st.st_size),
+        compile_model(src),
+    )
+    # zapis atomowy: tmp + replace
+    tmp = out.with_name(out.name + ".tmp")
+    tmp.write_bytes(marshal.dumps(payload))
+    os.replace(tmp, out)
+    return out
+
+
+def _read_payload(path: Path) -> tuple[Any, ...]:
+    payload = marshal.loads(path.read_bytes())
+    if (
+        not isinstance(payload, tuple)
+        or len(payload) != 6
+        or payload[0] != SNAPSHOT_FORMAT
+    ):
+        raise ValueError(f"Not a longevity snapshot: {path}")
+    return payload
+
+
+def _model(payload: tuple[Any, ...]) -> dict[str, Any]:
+    model: dict[str, Any] = payload[5]
+    return model
+
+
+def _is_fresh(payload: tuple[Any, ...]) -> bool:
+    _, version, fingerprint, source, stat_key, _ = payload
+    if version != SNAPSHOT_VERSION:
+        return False
+    src = Path(source)
+    try:
+        st = src.stat()
+    except FileNotFoundError:
+        # brak źródła -> nie da się przekompilować, ufamy snapshotowi
+        return True
+    # szybka ścieżka: mtime + rozmiar bez zmian -> bez hashowania
+    if (st.st_mtime_ns, st.st_size) == tuple(stat_key):
+        return True
+    return bool(spec_fingerprint(src) == fingerprint)
+
+
+def load_snapshot(
+    path: str | os.PathLike[str], *, check_stale: bool = True
+) -> dict[str, Any]:
+    """
+    Wczytuje znormalizowany model ze snapshotu.
+    check_stale=True -> StaleSnapshotError, gdy spec źródłowy się zmienił.
+    """
+    payload = _read_payload(Path(path))
+    if check_stale and not _is_fresh(payload):
+        raise StaleSnapshotError(f"Snapshot is stale: {path}")
+    return _model(payload)
+
+
+def load_model(path: str | os.PathLike[str]) -> dict[str, Any]:
+    """
+    Snapshot -> model; gdy snapshot jest nieaktualny (lub w starej wersji),
+    rekompiluje spec źródłowy i nadpisuje snapshot.
+    """
+    p = Path(path)
+    payload = _read_payload(p)
+    if _is_fresh(payload):
+        return _model(payload)
+    source = payload[3]
+    compile_snapshot(source, p)
+    return load_snapshot(p, check_stale=False)
+
+
+def main(argv: list[str] | None = None) -> None:
+    ap = argparse.ArgumentParser(
+        description="Compile a spec module into a model snapshot."
+    )
+    ap.add_argument("spec", nargs="?", default=str(DEFAULT_SPEC_PATH))
+    ap.add_argument("-o", "--out", default=None)
+    args = ap.parse_args(argv)
+
+    out = compile_snapshot(args.spec, args.out)
+    print(f"Snapshot saved: {out} ({spec_fingerprint(args.spec)[:16]})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+"""
+Trwały magazyn planów w SQLite (Settings.db_url).
+
+Tabele: profiles, supplements (profil x suplement: nazwa, timing,
+priorytet, dawka, ranga sortowania - per profil, bo nakładki i różne
+wersje specu zmieniają atrybuty), days (profil x dzień: blok, eventy,
+flagi) i day_items (profil x dzień x suplement). Zapis osi czasu idzie
+paczkami dni: DELETE zakresu + executemany w jednej transakcji na
+paczkę; WAL, więc odczyty API nie czekają na zapis.
+
+Indeksy: klucz główny days/day_items zaczyna się od (profile, day),
+dodatkowy indeks day_items(supplement_id, day) pod zapytania
+o wystąpienia.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+from collections.abc import Iterator, Mapping
+from datetime import date
+from typing import Any
+
+from .engine import (
+    DayItem,
+    DayPlan,
+    ModelSource,
+    _ensure,
+    _ordered_items,
+    prepare_model,
+)
+from .timeline import OFF_WEEK, PULSE_DAY, Timeline
+
+DEFAULT_BATCH_DAYS = 366
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profiles (
+    id INTEGER PRIMARY KEY,
+    profile_id TEXT NOT NULL UNIQUE,
+    params TEXT
+);
+CREATE TABLE IF NOT EXISTS supplements (
+    profile INTEGER NOT NULL REFERENCES profiles(id),
+    supplement_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    timing TEXT,
+    priority INTEGER NOT NULL,
+    dose TEXT,
+    rank INTEGER NOT NULL,
+    PRIMARY KEY (profile, supplement_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS days (
+    profile INTEGER NOT NULL REFERENCES profiles(id),
+    day TEXT NOT NULL,
+    block_id TEXT NOT NULL,
+    block_name TEXT NOT NULL,
+    events TEXT NOT NULL,
+    is_off_week INTEGER NOT NULL,
+    is_pulse_day INTEGER NOT NULL,
+    PRIMARY KEY (profile, day)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS day_items (
+    profile INTEGER NOT NULL,
+    day TEXT NOT NULL,
+    supplement_id TEXT NOT NULL,
+    PRIMARY KEY (profile, day, supplement_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS day_items_supplement_day
+    ON day_items (supplement_id, day);
+"""
+
+
+def sqlite_path(db_url: str) -> str:
+    """
+    sqlite:///./local.db -> ./local.db, sqlite:////abs.db -> /abs.db,
+    sqlite:///:memory: -> :memory:
+    """
+    prefix = "sqlite:///"
+    _ensure(
+        db_url.startswith(prefix),
+        f"Only sqlite:/// URLs are supported: {db_url!r}",
+    )
+    path = db_url[len(prefix) :]
+    _ensure(bool(path), f"Missing database path in {db_url!r}")
+    return path
+
+
+class PlanStore:
+    """
+    PlanStore() -> baza z get_settings().db_url.
+    """
+
+    def __init__(self, db_url: str | None = None):
+        if db_url is None:
+            from .config import get_settings
+
+            db_url = get_settings().db_url
+        self.path = sqlite_path(db_url)
+        self.con = sqlite3.connect(self.path)
+        if self.path != ":memory:":
+            self.con.execute("PRAGMA journal_mode=WAL")
+        self.con.execute("PRAGMA synchronous=NORMAL")
+        self.con.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self.con.close()
+
+    def __enter__(self) -> PlanStore:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    # --- zapis
+
+    def _profile_key(self, profile_id: str) -> int | None:
+        row = self.con.execute(
+            "SELECT id FROM profiles WHERE profile_id = ?", (profile_id,)
+        ).fetchone()
+        return None if row is None else int(row[0])
+
+    def _write_supplements(self, key: int, M: dict[str, Any]) -> None:
+        # wpisy spoza M zostają - mogą ich używać dni zapisane starszym
+        # specem poza nadpisywanym zakresem
+        items = _ordered_items(M, M["SUPPLEMENTS"])
+        self.con.executemany(
+            "INSERT OR REPLACE INTO supplements VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [
+                (
+                    key,
+                    it.supplement_id,
+                    it.name,
+                    it.timing_hint,
+                    it.priority,
+                    None if it.dose is None else json.dumps(it.dose),
+                    rank,
+                )
+                for rank, it in enumerate(items)
+            ],
+        )
+
+    def write_timeline(
+        self,
+        profile_id: str,
+        tl: Timeline,
+        M_raw: ModelSource,
+        *,
+        params: Mapping[str, object] | None = None,
+        batch_days: int = DEFAULT_BATCH_DAYS,
+    ) -> None:
+        """
+        Zapis (z nadpisaniem) dni osi czasu `tl` dla profilu; dni spoza
+        zakresu `tl` zostają bez zmian.
+        """
+        _ensure(batch_days > 0, "batch_days must be > 0")
+        M = prepare_model(M_raw)
+        raw_params = (
+            None
+            if params is None
+            else json.dumps(params, sort_keys=True, default=str)
+        )
+        with self.con:
+            self.con.execute(
+                "INSERT INTO profiles (profile_id, params) VALUES (?, ?) "
+                "ON CONFLICT(profile_id) "
+                "DO UPDATE SET params = excluded.params",
+                (profile_id, raw_params),
+            )
+            key = self._profile_key(profile_id)
+            assert key is not None
+            self._write_supplements(key, M)
+
+        o0 = tl.start.toordinal()
+        ids_by_mask: dict[int, list[str]] = {}
+        events = [",".join(es) for es in tl.event_sets]
+        for lo in range(0, len(tl), batch_days):
+            hi = min(lo + batch_days, len(tl))
+            days = [
+                date.fromordinal(o0 + i).isoformat() for i in range(lo, hi)
+            ]
+            day_rows: list[tuple[Any, ...]] = []
+            item_rows: list[tuple[Any, ...]] = []
+            for i, d in zip(range(lo, hi), days, strict=True):
+                b = tl.blocks[i]
+                f = tl.day_flags[i]
+                day_rows.append(
+                    (
+                        key,
+                        d,
+                        tl.block_ids[b],
+                        tl.block_names[b],
+                        events[tl.events[i]],
+                        int(bool(f & OFF_WEEK)),
+                        int(bool(f & PULSE_DAY)),
+                    )
+                )
+                m = tl.masks[i]
+                ids = ids_by_mask.get(m)
+                if ids is None:
+                    ids = ids_by_mask[m] = tl.ids_on(i)
+                item_rows.extend((key, d, sid) for sid in ids)
+            bounds = (key, days[0], days[-1])
+            with self.con:
+                self.con.execute(
+                    "DELETE FROM day_items "
+                    "WHERE profile = ? AND day BETWEEN ? AND ?",
+                    bounds,
+                )
+                self.con.execute(
+                    "DELETE FROM days "
+                    "WHERE profile = ? AND day BETWEEN ? AND ?",
+                    bounds,
+                )
+                self.con.executemany(
+                    "INSERT INTO days VALUES (?, ?, ?, ?, ?, ?, ?)", day_rows
+                )
+                self.con.executemany(
+                    "INSERT INTO day_items VALUES (?, ?, ?)", item_rows
+                )
+
+    # --- odczyt
+
+    def profile_ids(self) -> list[str]:
+        rows = self.con.execute(
+            "SELECT profile_id FROM profiles ORDER BY profile_id"
+        )
+        return [r[0] for r in rows]
+
+    def stored_range(self, profile_id: str) -> tuple[date, date] | None:
+        row = self.con.execute(
+            "SELECT MIN(day), MAX(day) FROM days JOIN profiles "
+            "ON days.profile = profiles.id WHERE profiles.profile_id = ?",
+            (profile_id,),
+        ).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return date.fromisoformat(row[0]), date.fromisoformat(row[1])
+
+    def _items_by_day(
+        self, key: int, start: str, end: str
+    ) -> Iterator[tuple[str, list[DayItem]]]:
+        rows = self.con.execute(
+            "SELECT i.day, s.supplement_id, s.name, s.timing, s.priority, "
+            "s.dose FROM day_items i JOIN supplements s "
+            "ON s.profile = i.profile "
+            "AND s.supplement_id = i.supplement_id "
+            "WHERE i.profile = ? AND i.day BETWEEN ? AND ? "
+            "ORDER BY i.day, s.rank",
+            (key, start, end),
+        )
+        cache: dict[str, DayItem] = {}
+        day: str | None = None
+        items: list[DayItem] = []
+        for d, sid, name, timing, priority, dose in rows:
+            if d != day:
+                if day is not None:
+                    yield day, items
+                day, items = d, []
+            it = cache.get(sid)
+            if it is None:
+                it = cache[sid] = DayItem(
+                    supplement_id=sid,
+                    name=name,
+                    timing_hint=timing,
+                    priority=priority,
+                    dose=None if dose is None else json.loads(dose),
+                )
+            items.append(it)
+        if day is not None:
+            yield day, items
+
+    def plan_range(
+        self, profile_id: str, start: date, end: date
+    ) -> list[DayPlan]:
+        """
+        Zapisane dni profilu z [start, end] (brakujące dni pomijane).
+        """
+        key = self._profile_key(profile_id)
+        if key is None:
+            raise ValueError(f"Unknown profile: {profile_id}")
+        lo, hi = start.isoformat(), end.isoformat()
+        items = dict(self._items_by_day(key, lo, hi))
+        rows = self.con.execute(
+            "SELECT day, block_id, block_name, events, is_off_week, "
+            "is_pulse_day FROM days "
+            "WHERE profile = ? AND day BETWEEN ? AND ? ORDER BY day",
+            (key, lo, hi),
+        )
+        return [
+            DayPlan(
+                day=date.fromisoformat(d),
+                block_id=block_id,
+                block_name=block_name,
+                items=list(items.get(d, ())),
+                events=events.split(",") if events else [],
+                is_off_week=bool(off),
+                is_pulse_day=bool(pulse),
+            )
+            for d, block_id, block_name, events, off, pulse in rows
+        ]
+
+    def occurrences(
+        self,
+        supplement_id: str,
+        start: date,
+        end: date,
+        profile_id: str | None = None,
+    ) -> list[tuple[str, date]]:
+        """
+        (profile_id, dzień) z suplementem w [start, end]; opcjonalnie
+        tylko dla jednego profilu.
+        """
+        sql = (
+            "SELECT p.profile_id, i.day FROM day_items i "
+            "JOIN profiles p ON p.id = i.profile "
+            "WHERE i.supplement_id = ? AND i.day BETWEEN ? AND ?"
+        )
+        args: list[Any] = [supplement_id, start.isoformat(), end.isoformat()]
+        if profile_id is not None:
+            sql += " AND p.profile_id = ?"
+            args.append(profile_id)
+        rows = self.con.execute(sql + " ORDER BY i.day, p.profile_id", args)
+        return [(pid, date.fromisoformat(d)) for pid, d in rows]
@@ -0,0 +1,219 @@
+"""
+Batched what-if: ocena wielu (cycle_anchor_date, off_week_start_date)
+w jednym przebiegu zamiast generate_year_plan per kandydat.
+
+Wspólna część (bloki, eventy, reguły niezależne od kotwicy, constraints,
+konflikty) liczona jest raz na dzień - dla każdego podzbioru suplementów
+z reguł cycle_weeks (alignment=custom_date). Kandydat to potem tylko
+lookup podzbioru per dzień + korekta za 7 dni OFF WEEK.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any
+
+from .engine import (
+    ModelSource,
+    _compile_day_filter,
+    _DayFilter,
+    _supplement_exclusion_pairs,
+    _weekday_index,
+    active_events_on_day,
+    apply_constraints,
+    apply_schedule_rules,
+    base_by_block,
+    prepare_model,
+)
+
+
+@dataclass(frozen=True)
+class SweepCandidate:
+    cycle_anchor_date: date
+    off_week_start_date: date
+    # dni OFF WEEK nachodzące na zakazane eventy
+    # (>0 -> generate_year_plan rzuciłby "OFF WEEK overlaps forbidden events")
+    off_week_event_conflicts: int
+    # suplement z reguły cycle_weeks -> liczba dni w planie
+    on_days: dict[str, int]
+    # dni bez żadnego suplementu z CORE_SET
+    days_without_core: int
+
+    @property
+    def is_valid(self) -> bool:
+        return self.off_week_event_conflicts == 0
+
+
+def mondays(year: int) -> list[date]:
+    d = date(year, 1, 1)
+    d += timedelta(days=(7 - _weekday_index(d)) % 7)
+    out: list[date] = []
+    while d.year == year:
+        out.append(d)
+        d += timedelta(days=7)
+    return out
+
+
+def _split_cycle_rules(
+    M: dict[str, Any],
+) -> tuple[dict[str, Any], list[tuple[str, dict[str, Any]]]]:
+    """
+    M bez reguł cycle_weeks(custom_date) + lista wyciętych (sid, rule).
+    """
+    units: list[tuple[str, dict[str, Any]]] = []
+    supps = dict(M["SUPPLEMENTS"])
+    for sid, spec in M["SUPPLEMENTS"].items():
+        keep = []
+        for r in spec.get("schedule_rules", []):
+            align = r.get("params", {}).get("alignment", "custom_date")
+            if r["type"] == "cycle_weeks" and align == "custom_date":
+                units.append((sid, r))
+            else:
+                keep.append(r)
+        if len(keep) != len(spec.get("schedule_rules", [])):
+            supps[sid] = {**spec, "schedule_rules": keep}
+    return {**M, "SUPPLEMENTS": supps}, units
+
+
+def sweep_params(
+    M_raw: ModelSource,
+    year: int,
+    *,
+    cycle_anchor_dates: list[date] | None = None,
+    off_week_start_dates: list[date] | None = None,
+    flags: dict[str, bool] | None = None,
+) -> list[SweepCandidate]:
+    """
+    Ocena wszystkich par (anchor, off_week_start). Domyślnie: każdy
+    poniedziałek roku jako kotwica i jako start OFF WEEK.
+    Wynik w kolejności: anchor, potem off_week_start.
+    """
+    flags = flags or {}
+    M = prepare_model(M_raw)
+    anchors = cycle_anchor_dates or mondays(year)
+    starts = off_week_start_dates or mondays(year)
+    for s_date in starts:
+        if _weekday_index(s_date) != 0:
+            raise ValueError(
+                "off_week_start_date must be a Monday (weekday=0)"
+            )
+
+    M_static, units = _split_cycle_rules(M)
+    var_sids = list(dict.fromkeys(sid for sid, _ in units))
+    bit = {sid: 1 << i for i, sid in enumerate(var_sids)}
+    core = set(M["CORE_SET"])
+
+    off_ex = [ex for ex in M["GLOBAL_EXCEPTIONS"] if ex["type"] == "off_week"]
+
+    first = date(year, 1, 1)
+    n_days = (date(year, 12, 31) - first).days + 1
+
+    # --- wspólne per dzień: wynik dla każdego podzbioru cycle-suplementów
+    # outcome[i][mask] = (bitmask obecnych var_sids, czy brak CORE)
+    outcome: list[dict[int, tuple[int, bool]]] = []
+    exclusions = _supplement_exclusion_pairs(M)
+    filters: dict[tuple[str, tuple[str, ...]], _DayFilter] = {}
+    events_by_day: list[set[str]] = []
+    active_units: list[list[int]] = []  # indeksy units aktywnych w bloku
+    for i in range(n_days):
+        d = first + timedelta(days=i)
+        block_id = M["BLOCK_CALENDAR"][d.month]
+        events = active_events_on_day(M, d)
+        events_by_day.append(set(events))
+        key = (block_id, tuple(events))
+        day_filter = filters.get(key)
+        if day_filter is None:
+            day_filter = filters[key] = _compile_day_filter(
+                M, block_id, events, exclusions
+            )
+
+        act = [
+            u
+            for u, (_, r) in enumerate(units)
+            if r.get("active_blocks") is None or block_id in r["active_blocks"]
+        ]
+        active_units.append(act)
+        act_mask = 0
+        for u in act:
+            act_mask |= bit[units[u][0]]
+
+        base = apply_schedule_rules(
+            M_static, d, block_id, base_by_block(M, d, block_id), flags, None
+        )
+        per_mask: dict[int, tuple[int, bool]] = {}
+        sub = act_mask
+        while True:  # wszystkie podzbiory act_mask
+            cur = set(base) | {x for x in var_sids if bit[x] & sub}
+            cur = day_filter.apply(apply_constraints(M, d, block_id, cur))
+            present = 0
+            for x in var_sids:
+                if x in cur:
+                    present |= bit[x]
+            per_mask[sub] = (present, not (core & cur))
+            if sub == 0:
+                break
+            sub = (sub - 1) & act_mask
+        outcome.append(per_mask)
+
+    # --- OFF WEEK per start: okno dni + konflikty (niezależne od kotwicy)
+    windows: list[tuple[range, int]] = []
+    for s_date in starts:
+        lo = (s_date - first).days
+        dur = max((int(ex["duration_days"]) for ex in off_ex), default=0)
+        window = range(max(lo, 0), min(lo + dur, n_days))
+        conflicts = 0
+        for ex in off_ex:
+            forbidden = set(ex.get("hard_exclusion_of_events", set()))
+            hi = min(lo + int(ex["duration_days"]), n_days)
+            for i in range(max(lo, 0), hi):
+                if forbidden & events_by_day[i]:
+                    conflicts += 1
+        windows.append((window, conflicts))
+
+    # --- per kotwica: lookup podzbioru per dzień
+    results: list[SweepCandidate] = []
+    for a in anchors:
+        day_present: list[int] = []
+        day_nocore: list[bool] = []
+        for i in range(n_days):
+            sub = 0
+            for u in active_units[i]:
+                sid, r = units[u]
+                p = r["params"]
+                on_w = int(p["on_weeks"])
+                period = on_w + int(p["off_weeks"])
+                weeks = ((first - a).days + i) // 7
+                if weeks % period < on_w:
+                    sub |= bit[sid]
+            present, no_core = outcome[i][sub]
+            day_present.append(present)
+            day_nocore.append(no_core)
+
+        totals = {x: 0 for x in var_sids}
+        for present in day_present:
+            for x in var_sids:
+                if present & bit[x]:
+                    totals[x] += 1
+        nocore_total = sum(day_nocore)
+
+        for s_date, (window, conflicts) in zip(starts, windows, strict=True):
+            on_days = dict(totals)
+            nocore = nocore_total
+            for i in window:
+                for x in var_sids:
+                    if day_present[i] & bit[x]:
+                        on_days[x] -= 1
+                if not day_nocore[i]:
+                    nocore += 1
+            results.append(
+                SweepCandidate(
+                    cycle_anchor_date=a,
+                    off_week_start_date=s_date,
+                    off_week_event_conflicts=conflicts,
+                    on_days=on_days,
+                    days_without_core=nocore,
+                )
+            )
+
+    return results
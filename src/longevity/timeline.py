@@ -0,0 +1,283 @@
+"""
+Kompaktowa oś czasu planu.
+
+Zamiast listy DayPlan z obiektami DayItem: jeden int (bitmaska
+suplementów) na dzień + indeksy bloków / kombinacji eventów. Bit i
+odpowiada supplement_ids[i].
+"""
+
+from __future__ import annotations
+
+from array import array
+from dataclasses import dataclass
+from datetime import date, timedelta
+from functools import cached_property
+from typing import TYPE_CHECKING, Any
+
+from .engine import (
+    DayPlan,
+    ModelSource,
+    _ensure,
+    _iter_day_ids,
+    prepare_model,
+)
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from .frames import TimelineArrays
+    from .views import TimelinePlans
+
+# flagi dnia (bajt na dzień)
+OFF_WEEK = 1
+PULSE_DAY = 2
+
+
+@dataclass(frozen=True)
+class Timeline:
+    start: date
+    supplement_ids: tuple[str, ...]  # bit i -> supplement_ids[i]
+    block_ids: tuple[str, ...]  # słownik bloków
+    block_names: tuple[str, ...]  # równoległe do block_ids
+    event_sets: tuple[tuple[str, ...], ...]  # słownik; [0] == ()
+    masks: list[int]  # dzień -> bitmaska suplementów
+    blocks: bytes  # dzień -> indeks w block_ids
+    events: array  # dzień -> indeks w event_sets ('H')
+    day_flags: bytes  # dzień -> OFF_WEEK | PULSE_DAY
+
+    def __len__(self) -> int:
+        return len(self.masks)
+
+    @property
+    def end(self) -> date:
+        return self.start + timedelta(days=len(self.masks) - 1)
+
+    def day(self, i: int) -> date:
+        return self.start + timedelta(days=i)
+
+    def index_of(self, d: date) -> int:
+        i = (d - self.start).days
+        if not 0 <= i < len(self.masks):
+            raise ValueError(f"Day not found: {d.isoformat()}")
+        return i
+
+    def ids_on(self, i: int) -> list[str]:
+        m = self.masks[i]
+        return [sid for b, sid in enumerate(self.supplement_ids) if m >> b & 1]
+
+    @cached_property
+    def columns(self) -> list[int]:
+        """
+        Transpozycja: suplement -> bitmapa dni (bit i = dzień start + i).
+        """
+        # dni grupowane po identycznej masce (masek unikalnych jest mało)
+        days_by_mask: dict[int, int] = {}
+        for i, m in enumerate(self.masks):
+            days_by_mask[m] = days_by_mask.get(m, 0) | (1 << i)
+
+        cols = [0] * len(self.supplement_ids)
+        for m, days in days_by_mask.items():
+            while m:
+                low = m & -m
+                cols[low.bit_length() - 1] |= days
+                m ^= low
+        return cols
+
+    def plans(self, M_raw: ModelSource) -> TimelinePlans:
+        """
+        Leniwe DayPlan (widoki) dla wszystkich dni (patrz views).
+        """
+        from .views import TimelinePlans
+
+        return TimelinePlans(self, M_raw)
+
+    def to_arrays(self, M_raw: ModelSource) -> TimelineArrays:
+        """
+        Tablice NumPy (patrz frames.to_arrays).
+        """
+        from .frames import to_arrays
+
+        return to_arrays(self, M_raw)
+
+    def to_dataframe(
+        self, M_raw: ModelSource, *, layout: str = "long"
+    ) -> pd.DataFrame:
+        """
+        DataFrame long / wide (patrz frames.to_dataframe).
+        """
+        from .frames import to_dataframe
+
+        return to_dataframe(self, M_raw, layout=layout)
+
+
+def timeline_from_plans(plans: list[DayPlan], M_raw: ModelSource) -> Timeline:
+    """
+    Pakuje listę DayPlan (kolejne dni) do Timeline.
+    """
+    _ensure(len(plans) > 0, "Cannot build a timeline from an empty plan")
+    M = prepare_model(M_raw)
+    supplement_ids = tuple(M["SUPPLEMENTS"])
+    bit = {sid: 1 << i for i, sid in enumerate(supplement_ids)}
+
+    block_index: dict[str, int] = {}
+    block_names: list[str] = []
+    event_index: dict[tuple[str, ...], int] = {(): 0}
+    masks: list[int] = []
+    blocks = bytearray()
+    events = array("H")
+    day_flags = bytearray()
+
+    start = plans[0].day
+    for i, p in enumerate(plans):
+        _ensure(
+            p.day == start + timedelta(days=i),
+            f"Plans must be consecutive days: {p.day.isoformat()}",
+        )
+        m = 0
+        for it in p.items:
+            m |= bit[it.supplement_id]
+        masks.append(m)
+
+        b = block_index.get(p.block_id)
+        if b is None:
+            b = block_index[p.block_id] = len(block_index)
+            block_names.append(p.block_name)
+        blocks.append(b)
+
+        evs = tuple(p.events)
+        e = event_index.get(evs)
+        if e is None:
+            e = event_index[evs] = len(event_index)
+        events.append(e)
+
+        day_flags.append(
+            (OFF_WEEK if p.is_off_week else 0)
+            | (PULSE_DAY if p.is_pulse_day else 0)
+        )
+
+    return Timeline(
+        start=start,
+        supplement_ids=supplement_ids,
+        block_ids=tuple(block_index),
+        block_names=tuple(block_names),
+        event_sets=tuple(event_index),
+        masks=masks,
+        blocks=bytes(blocks),
+        events=events,
+        day_flags=bytes(day_flags),
+    )
+
+
+def generate_timeline(
+    M_raw: ModelSource,
+    start: date,
+    end: date,
+    **params: Any,
+) -> Timeline:
+    """
+    Oś czasu wprost z pipeline'u silnika (params jak w
+    generate_plan_range); wynik jak timeline_from_plans(plany).
+    """
+    M = prepare_model(M_raw)
+    supplement_ids = tuple(M["SUPPLEMENTS"])
+    bit = {sid: 1 << i for i, sid in enumerate(supplement_ids)}
+
+    block_index: dict[str, int] = {}
+    event_index: dict[tuple[str, ...], int] = {(): 0}
+    masks: list[int] = []
+    blocks = bytearray()
+    events = array("H")
+    day_flags = bytearray()
+
+    # bez DayPlan / DayItem: maska wprost ze zbioru suplementów dnia
+    for _, block_id, evs, ids in _iter_day_ids(M, start, end, **params):
+        m = 0
+        for sid in ids:
+            m |= bit[sid]
+        masks.append(m)
+
+        b = block_index.get(block_id)
+        if b is None:
+            b = block_index[block_id] = len(block_index)
+        blocks.append(b)
+
+        key = tuple(evs)
+        e = event_index.get(key)
+        if e is None:
+            e = event_index[key] = len(event_index)
+        events.append(e)
+
+        day_flags.append(
+            (PULSE_DAY if evs else 0) | (0 if ids or evs else OFF_WEEK)
+        )
+
+    return Timeline(
+        start=start,
+        supplement_ids=supplement_ids,
+        block_ids=tuple(block_index),
+        block_names=tuple(M["BLOCKS"][b].get("name", b) for b in block_index),
+        event_sets=tuple(event_index),
+        masks=masks,
+        blocks=bytes(blocks),
+        events=events,
+        day_flags=bytes(day_flags),
+    )
+
+
+def concat_timelines(parts: list[Timeline]) -> Timeline:
+    """
+    Sklejenie kolejnych osi czasu (ten sam model) w jedną; słowniki
+    bloków i zestawów eventów są scalane, indeksy dni przemapowane.
+    """
+    _ensure(len(parts) > 0, "Cannot concatenate an empty list of timelines")
+    supplement_ids = parts[0].supplement_ids
+
+    block_index: dict[str, int] = {}
+    block_names: list[str] = []
+    event_index: dict[tuple[str, ...], int] = {(): 0}
+    masks: list[int] = []
+    blocks = bytearray()
+    events = array("H")
+    day_flags = bytearray()
+
+    expected = parts[0].start
+    for tl in parts:
+        _ensure(
+            tl.supplement_ids == supplement_ids,
+            "Timelines must share supplement_ids",
+        )
+        _ensure(
+            tl.start == expected,
+            f"Timelines must be consecutive: {tl.start.isoformat()}",
+        )
+        bmap = bytearray(256)
+        for b, (bid, name) in enumerate(
+            zip(tl.block_ids, tl.block_names, strict=True)
+        ):
+            nb = block_index.get(bid)
+            if nb is None:
+                nb = block_index[bid] = len(block_index)
+                block_names.append(name)
+            bmap[b] = nb
+        emap = [
+            event_index.setdefault(es, len(event_index))
+            for es in tl.event_sets
+        ]
+
+        masks.extend(tl.masks)
+        blocks.extend(tl.blocks.translate(bmap))
+        events.extend(emap[e] for e in tl.events)
+        day_flags.extend(tl.day_flags)
+        expected = tl.end + timedelta(days=1)
+
+    return Timeline(
+        start=parts[0].start,
+        supplement_ids=supplement_ids,
+        block_ids=tuple(block_index),
+        block_names=tuple(block_names),
+        event_sets=tuple(event_index),
+        masks=masks,
+        blocks=bytes(blocks),
+        events=events,
+        day_flags=bytes(day_flags),
+    )
@@ -0,0 +1,146 @@
+"""
+Leniwe widoki DayPlan nad osią czasu (Timeline).
+
+DayPlanView czyta blok, eventy i flagi dnia wprost z kompaktowych
+danych Timeline; lista DayItem powstaje dopiero przy pierwszym dostępie
+do `items` - przez przejście po bitach maski w globalnej kolejności
+suplementów (liczonej raz na model), bez sortowania per dzień. Skan
+bloków / OFF WEEK po wielu latach nie tworzy żadnego DayItem.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterator, Sequence
+from datetime import date
+from typing import Any, overload
+
+from .engine import (
+    DayItem,
+    DayPlan,
+    ModelSource,
+    _ordered_items,
+    prepare_model,
+)
+from .timeline import OFF_WEEK, PULSE_DAY, Timeline
+
+_FIELDS = (
+    "day",
+    "block_id",
+    "block_name",
+    "items",
+    "events",
+    "is_off_week",
+    "is_pulse_day",
+)
+
+
+class DayPlanView:
+    """
+    Widok dnia i osi czasu; pola jak w DayPlan (tylko do odczytu).
+    """
+
+    __slots__ = ("_plans", "_i", "_items")
+
+    def __init__(self, plans: TimelinePlans, i: int):
+        self._plans = plans
+        self._i = i
+        self._items: list[DayItem] | None = None
+
+    @property
+    def day(self) -> date:
+        return self._plans.timeline.day(self._i)
+
+    @property
+    def block_id(self) -> str:
+        tl = self._plans.timeline
+        return tl.block_ids[tl.blocks[self._i]]
+
+    @property
+    def block_name(self) -> str:
+        tl = self._plans.timeline
+        return tl.block_names[tl.blocks[self._i]]
+
+    @property
+    def events(self) -> list[str]:
+        tl = self._plans.timeline
+        return list(tl.event_sets[tl.events[self._i]])
+
+    @property
+    def is_off_week(self) -> bool:
+        return bool(self._plans.timeline.day_flags[self._i] & OFF_WEEK)
+
+    @property
+    def is_pulse_day(self) -> bool:
+        return bool(self._plans.timeline.day_flags[self._i] & PULSE_DAY)
+
+    @property
+    def items(self) -> list[DayItem]:
+        if self._items is None:
+            mask = self._plans.timeline.masks[self._i]
+            self._items = self._plans._items_for(mask)
+        return self._items
+
+    def to_plan(self) -> DayPlan:
+        return DayPlan(**{f: getattr(self, f) for f in _FIELDS})
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, (DayPlan, DayPlanView)):
+            return NotImplemented
+        return all(getattr(self, f) == getattr(other, f) for f in _FIELDS)
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return (
+            f"DayPlanView(day={self.day!r}, block_id={self.block_id!r}, "
+            f"is_off_week={self.is_off_week!r})"
+        )
+
+
+class TimelinePlans(Sequence[DayPlanView]):
+    """
+    Sekwencja DayPlanView dla wszystkich dni osi `timeline`.
+    """
+
+    def __init__(self, timeline: Timeline, M_raw: ModelSource):
+        M = prepare_model(M_raw)
+        self.timeline = timeline
+        ordered = _ordered_items(M, timeline.supplement_ids)
+        bit = {sid: b for b, sid in enumerate(timeline.supplement_ids)}
+        # (bit, DayItem) w globalnej kolejności sortowania
+        self._order = [(bit[it.supplement_id], it) for it in ordered]
+        self._by_mask: dict[int, list[DayItem]] = {}
+
+    def _items_for(self, mask: int) -> list[DayItem]:
+        items = self._by_mask.get(mask)
+        if items is None:
+            items = self._by_mask[mask] = [
+                it for b, it in self._order if mask >> b & 1
+            ]
+        return list(items)
+
+    def __len__(self) -> int:
+        return len(self.timeline)
+
+    @overload
+    def __getitem__(self, i: int) -> DayPlanView: ...
+
+    @overload
+    def __getitem__(self, i: slice) -> list[DayPlanView]: ...
+
+    def __getitem__(self, i: Any) -> Any:
+        if isinstance(i, slice):
+            return [DayPlanView(self, k) for k in range(len(self))[i]]
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("day index out of range")
+        return DayPlanView(self, i)
+
+    def __iter__(self) -> Iterator[DayPlanView]:
+        for i in range(len(self)):
+            yield DayPlanView(self, i)
+
+    def on(self, d: date) -> DayPlanView:
+        return DayPlanView(self, self.timeline.index_of(d))
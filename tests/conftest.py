@@ -0,0 +1,53 @@
+import copy
+from datetime import date
+from typing import Any
+
+import pytest
+
+from longevity import spec
+from longevity.engine import (
+    PlanParams,
+    assemble_model_from_globals,
+    normalize_model,
+)
+
+
+@pytest.fixture
+def raw_model() -> dict[str, Any]:
+    """
+    Surowy model speca (głęboka kopia - test może go modyfikować).
+    """
+    return copy.deepcopy(assemble_model_from_globals(spec))
+
+
+@pytest.fixture(scope="session")
+def model() -> dict[str, Any]:
+    """
+    Znormalizowany model speca, wspólny dla sesji (tylko do odczytu).
+    """
+    return normalize_model(assemble_model_from_globals(spec))
+
+
+@pytest.fixture
+def params() -> PlanParams:
+    """
+    Typowe parametry runtime: OFF WEEK od 2026-02-02, kotwica cykli,
+    melisa włączona.
+    """
+    return {
+        "off_week_start_date": date(2026, 2, 2),
+        "cycle_anchor_date": date(2026, 1, 6),
+        "flags": {"enable_melissa": True},
+    }
+
+
+@pytest.fixture
+def week_params() -> PlanParams:
+    """
+    OFF WEEK z numeru tygodnia ISO (6) zamiast daty; kotwica 2026-01-05.
+    """
+    return {
+        "off_week_week_of_year": 6,
+        "cycle_anchor_date": date(2026, 1, 5),
+        "flags": {"enable_melissa": True},
+    }
@@ -0,0 +1,54 @@
+from collections import Counter
+from datetime import date
+from typing import Any
+
+from longevity.aggregates import consumption_table
+from longevity.engine import (
+    PlanParams,
+    generate_year_plan,
+)
+from longevity.timeline import generate_timeline, timeline_from_plans
+
+
+def test_timeline_roundtrips_plan_ids(
+    model: dict[str, Any], params: PlanParams
+) -> None:
+    plans = generate_year_plan(model, 2026, **params)
+    tl = timeline_from_plans(plans, model)
+    assert len(tl) == 365
+    for i, p in enumerate(plans):
+        assert set(tl.ids_on(i)) == {it.supplement_id for it in p.items}
+        assert tl.block_ids[tl.blocks[i]] == p.block_id
+        assert tl.event_sets[tl.events[i]] == tuple(p.events)
+
+
+def test_consumption_matches_item_walk(
+    model: dict[str, Any], params: PlanParams
+) -> None:
+    plans = generate_year_plan(model, 2026, **params)
+    tl = timeline_from_plans(plans, model)
+
+    expected = Counter(
+        (f"{p.day.year}-{p.day.month:02d}", it.supplement_id)
+        for p in plans
+        for it in p.items
+    )
+    table = consumption_table(tl, model)
+    got = {(p, sid): n for sid, p, n, _, _ in table.rows()}
+    assert got == dict(expected)
+
+    # fisetyna: 2 dni pulsu x 4 miesiące x 12 kapsułek
+    yearly = consumption_table(tl, model, by="year")
+    assert yearly.total("fisetin_pulse") == 2 * 4 * 12
+    assert "caps" in yearly.unit
+
+
+def test_consumption_sums_profiles(
+    model: dict[str, Any], params: PlanParams
+) -> None:
+    tl = generate_timeline(
+        model, date(2026, 1, 1), date(2026, 12, 31), **params
+    )
+    one = consumption_table(tl, model, by="year")
+    many = consumption_table([tl] * 3, model, by="year")
+    assert many.days == [3 * n for n in one.days]
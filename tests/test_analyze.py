@@ -0,0 +1,100 @@
+from datetime import date
+from typing import Any
+
+import pytest
+
+from longevity.analyze import analyze_spec, main
+from longevity.engine import generate_plan_range
+
+
+def test_spec_is_clean_and_reachable_matches_simulation(
+    model: dict[str, Any],
+) -> None:
+    result = analyze_spec(model)
+    assert result.ok, [f.describe() for f in result.findings]
+
+    seen = {
+        it.supplement_id
+        for p in generate_plan_range(
+            model,
+            date(2026, 1, 1),
+            date(2029, 12, 31),
+            cycle_anchor_date=date(2026, 1, 5),
+            flags={"enable_melissa": True},
+        )
+        for it in p.items
+    }
+    assert result.reachable == seen
+
+
+def test_findings_for_broken_spec(raw_model: dict[str, Any]) -> None:
+    supps = raw_model["SUPPLEMENTS"]
+    supps["melissa"]["schedule_rules"][0]["active_blocks"] = {"NOPE"}
+    supps["collagen"]["constraints"].append(
+        {
+            "id": "collagen_never",
+            "type": "seasonal",
+            "params": {"months_included": set()},
+        }
+    )
+    excl = raw_model["CONFLICTS"]["block_exclusions"]
+    for block in raw_model["BLOCKS"]:
+        excl[block] = {*excl.get(block, ()), "lycopene"}
+    supps["nmn"]["constraints"].append(
+        {
+            "id": "nmn_needs_astaxanthin",
+            "type": "require_supplements",
+            "params": {"supplement_ids": {"astaxanthin"}},
+        }
+    )
+    fisetin = raw_model["CONFLICTS"]["event_overrides"]["pulse_fisetin"]
+    fisetin["allowed_set"] = set(fisetin["allowed_set"]) - {"d3k2"}
+
+    result = analyze_spec(raw_model)
+    found = {(f.kind, f.subject) for f in result.findings}
+    assert ("rule_never_fires", "mel_optional") in found
+    assert ("unreachable", "melissa") in found
+    assert ("unreachable", "collagen") in found
+    assert ("conflicted", "lycopene") in found
+    assert ("require_undone", "nmn") in found
+    assert ("allow_only_drops_core", "pulse_fisetin") in found
+    (undone,) = result.of_kind("require_undone")
+    assert "supplement_exclusions.nmn" in undone.detail
+    assert not result.ok
+
+
+def test_require_chain_on_weekly_schedule_is_clean(
+    raw_model: dict[str, Any],
+) -> None:
+    supps = raw_model["SUPPLEMENTS"]
+    # nmn (pn, wt, czw, pt) wymaga ptr - ten sam wzorzec tygodnia plus
+    # seria od początku roku, więc ptr jest w każdym dniu nmn
+    supps["nmn"]["constraints"].append(
+        {
+            "id": "nmn_needs_ptr",
+            "type": "require_supplements",
+            "params": {"supplement_ids": {"pterostilbene_resveratrol"}},
+        }
+    )
+    supps["pterostilbene_resveratrol"]["schedule_rules"].append(
+        {
+            "id": "ptr_year_cycle",
+            "type": "cycle_weeks",
+            "active_blocks": {"NAD"},
+            "params": {
+                "on_weeks": 2,
+                "off_weeks": 1,
+                "alignment": "year_start",
+            },
+        }
+    )
+
+    result = analyze_spec(raw_model)
+    assert result.of_kind("require_undone") == []
+    assert result.ok, [f.describe() for f in result.findings]
+
+
+def test_cli_exit_code() -> None:
+    with pytest.raises(SystemExit) as exc:
+        main([])
+    assert exc.value.code == 0
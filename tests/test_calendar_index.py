@@ -0,0 +1,53 @@
+from datetime import date, timedelta
+from typing import Any
+
+import pytest
+
+from longevity.calendar_index import CalendarIndex
+from longevity.engine import PlanParams, _iter_day_ids
+
+
+def test_tables_match_date_arithmetic() -> None:
+    start, end = date(2027, 12, 20), date(2029, 1, 10)
+    cal = CalendarIndex.build(start, end)
+    assert len(cal) == (end - start).days + 1
+    for i in range(len(cal)):
+        d = start + timedelta(days=i)
+        assert cal.day(i) == d
+        assert cal.index_of(d) == i
+        assert (cal.years[i], cal.months[i], cal.mdays[i]) == (
+            d.year,
+            d.month,
+            d.day,
+        )
+        assert cal.weekdays[i] == d.weekday()
+        assert cal.year_weeks[i] == (d - date(d.year, 1, 1)).days // 7
+
+    anchor = date(2028, 1, 3)
+    weeks = cal.weeks_from(anchor)
+    assert weeks[cal.index_of(anchor)] == 0
+    assert weeks[0] == (start - anchor).days // 7
+
+
+def test_month_runs_cover_range() -> None:
+    cal = CalendarIndex.build(date(2028, 1, 31), date(2028, 3, 1))
+    assert cal.month_runs == (
+        (2028, 1, 0, 1),
+        (2028, 2, 1, 30),
+        (2028, 3, 30, 31),
+    )
+    with pytest.raises(ValueError):
+        cal.index_of(date(2028, 3, 2))
+
+
+def test_day_pipeline_builds_no_dates(
+    monkeypatch, model: dict[str, Any], params: PlanParams
+) -> None:
+    def no_day(self: CalendarIndex, i: int) -> date:
+        raise AssertionError("date built inside the day loop")
+
+    monkeypatch.setattr(CalendarIndex, "day", no_day)
+    rows = list(
+        _iter_day_ids(model, date(2026, 1, 1), date(2026, 12, 31), **params)
+    )
+    assert len(rows) == 365
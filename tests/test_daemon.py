@@ -0,0 +1,125 @@
+import json
+import os
+import socketserver
+import threading
+from datetime import UTC, date, datetime, time
+from email import message_from_bytes
+from email.policy import default
+from zoneinfo import ZoneInfo
+
+from longevity.daemon import (
+    MailScheduler,
+    Recipient,
+    SmtpTransport,
+    next_send,
+)
+
+
+class _SmtpServer(socketserver.ThreadingTCPServer):
+    messages: list[bytes]
+
+
+class _SmtpHandler(socketserver.StreamRequestHandler):
+    # minimalny serwer SMTP (bez auth/TLS) zbierający treść DATA
+    server: _SmtpServer
+
+    def handle(self) -> None:
+        self.wfile.write(b"220 localhost\r\n")
+        data: list[bytes] | None = None
+        for line in self.rfile:
+            if data is not None:
+                if line == b".\r\n":
+                    self.server.messages.append(b"".join(data))
+                    data = None
+                    self.wfile.write(b"250 OK\r\n")
+                else:
+                    data.append(line[1:] if line.startswith(b"..") else line)
+                continue
+            cmd = line[:4].upper()
+            if cmd == b"DATA":
+                data = []
+                self.wfile.write(b"354 End data with .\r\n")
+            elif cmd == b"QUIT":
+                self.wfile.write(b"221 Bye\r\n")
+                return
+            else:
+                self.wfile.write(b"250 OK\r\n")
+
+
+def _smtp_server():
+    server = _SmtpServer(("127.0.0.1", 0), _SmtpHandler)
+    server.messages = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _recipient(name, tz, send_at, profile):
+    return {
+        "email": f"{name}@example.com",
+        "tz": tz,
+        "send_at": send_at,
+        "profile": profile,
+    }
+
+
+def test_next_send_follows_dst() -> None:
+    r = Recipient(
+        "anna", "a@example.com", ZoneInfo("Europe/Warsaw"), time(6), "{}", {}
+    )
+    # CET (UTC+1) -> CEST (UTC+2) w nocy 28/29 marca 2026
+    after = datetime(2026, 3, 27, 12, tzinfo=UTC)
+    assert next_send(r, after) == datetime(2026, 3, 28, 5, tzinfo=UTC)
+    after = datetime(2026, 3, 28, 5, tzinfo=UTC)
+    assert next_send(r, after) == datetime(2026, 3, 29, 4, tzinfo=UTC)
+
+
+def test_scheduler_sends_through_local_smtp(tmp_path) -> None:
+    profile = {"cycle_anchor_date": "2026-01-05", "off_week_week_of_year": 6}
+    other = {"cycle_anchor_date": "2026-01-06"}
+    recipients = {
+        "anna": _recipient("anna", "Europe/Warsaw", "06:00", profile),
+        "bob": _recipient("bob", "America/New_York", "07:30", profile),
+        "cyd": _recipient("cyd", "UTC", "05:00", other),
+    }
+    path = tmp_path / "recipients.json"
+    path.write_text(json.dumps(recipients), encoding="utf-8")
+
+    server = _smtp_server()
+    try:
+        transport = SmtpTransport(
+            "127.0.0.1", server.server_address[1], security="plain"
+        )
+        sched = MailScheduler(path, transport)
+        start = datetime(2026, 3, 10, 0, tzinfo=UTC)
+        sched.reload(start)
+        assert len(sched) == 3
+
+        assert sched.run_due(datetime(2026, 3, 10, 5, 30, tzinfo=UTC)) == 2
+        assert sched.run_due(datetime(2026, 3, 10, 12, tzinfo=UTC)) == 1
+        assert sched.run_due(datetime(2026, 3, 10, 12, tzinfo=UTC)) == 0
+        # dwa zestawy parametrów -> dwa plany w pamięci
+        assert len(sched._plans) == 2
+
+        # zmiana godziny tego samego dnia nie wysyła ponownie
+        recipients["anna"]["send_at"] = "09:00"
+        path.write_text(json.dumps(recipients), encoding="utf-8")
+        os.utime(path, ns=(1, 2))
+        sched.reload(datetime(2026, 3, 10, 7, tzinfo=UTC))
+        assert sched.run_due(datetime(2026, 3, 10, 9, tzinfo=UTC)) == 0
+        assert sched.run_due(datetime(2026, 3, 11, 12, tzinfo=UTC)) == 3
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    msgs = [message_from_bytes(m, policy=default) for m in server.messages]
+    assert len(msgs) == 6
+    first = {m["To"]: m for m in msgs[:3]}
+    assert set(first) == {f"{n}@example.com" for n in recipients}
+    assert first["anna@example.com"]["Subject"].startswith(
+        "Longevity 4.8 — 2026-03-10"
+    )
+    part = first["bob@example.com"].get_body()
+    assert part is not None
+    body = part.get_content()
+    assert body.startswith("DATA: 2026-03-10")
+    assert date(2026, 3, 11).isoformat() in msgs[3]["Subject"]
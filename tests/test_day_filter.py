@@ -0,0 +1,31 @@
+import random
+from datetime import date
+from itertools import combinations
+from typing import Any
+
+from longevity.engine import (
+    _compile_day_filter,
+    apply_block_exclusions,
+    apply_events,
+    apply_supplement_exclusions,
+)
+
+
+def test_fused_filter_matches_stage_order(model: dict[str, Any]) -> None:
+    sids = sorted(model["SUPPLEMENTS"])
+    event_sets = [
+        list(c)
+        for n in range(len(model["EVENTS"]) + 1)
+        for c in combinations(model["EVENTS"], n)
+    ]
+    rng = random.Random(7)
+    d = date(2026, 3, 9)  # apply_events nie patrzy na datę
+    for block_id in model["BLOCKS"]:
+        for events in event_sets:
+            f = _compile_day_filter(model, block_id, events)
+            for _ in range(50):
+                cur = set(rng.sample(sids, rng.randint(0, len(sids))))
+                staged = apply_supplement_exclusions(model, set(cur))
+                staged = apply_block_exclusions(model, block_id, staged)
+                staged = apply_events(model, d, staged, events)
+                assert f.apply(set(cur)) == staged
@@ -0,0 +1,68 @@
+from datetime import date
+from typing import Any
+
+from longevity.diff import diff_timelines
+from longevity.engine import (
+    PlanParams,
+    generate_plan_range,
+)
+from longevity.overlay import overlay_model
+from longevity.timeline import generate_timeline, timeline_from_plans
+
+START, END = date(2026, 1, 1), date(2026, 12, 31)
+
+
+def test_identical_timelines_have_no_diff(
+    model: dict[str, Any], params: PlanParams
+) -> None:
+    a = generate_timeline(model, START, END, **params)
+    b = generate_timeline(model, START, END, **params)
+    d = diff_timelines(a, b)
+    assert not d
+    assert d.summary.changed_days == 0
+
+
+def test_diff_matches_plan_comparison(
+    model: dict[str, Any], params: PlanParams
+) -> None:
+    old_plans = generate_plan_range(model, START, END, **params)
+    new_params: PlanParams = {
+        **params,
+        "off_week_start_date": date(2026, 8, 3),
+    }
+    new_plans = generate_plan_range(model, START, END, **new_params)
+    d = diff_timelines(
+        timeline_from_plans(old_plans, model),
+        timeline_from_plans(new_plans, model),
+    )
+
+    expected = {}
+    for p, q in zip(old_plans, new_plans, strict=True):
+        a = {it.supplement_id for it in p.items}
+        b = {it.supplement_id for it in q.items}
+        if a != b:
+            expected[p.day] = (b - a, a - b)
+    assert d.changed_days() == sorted(expected)
+    for dd in d.days:
+        assert (set(dd.added), set(dd.removed)) == expected[dd.day]
+    assert d.summary.first_changed == date(2026, 2, 2)
+    assert d.summary.last_changed == date(2026, 8, 9)
+
+
+def test_diff_across_spec_change_and_ranges(
+    model: dict[str, Any], params: PlanParams
+) -> None:
+    old = generate_timeline(model, START, date(2026, 1, 31), **params)
+    M2 = overlay_model(model, {"disable": ["nmn"]})
+    new = generate_timeline(M2, date(2026, 1, 15), date(2026, 2, 5), **params)
+    d = diff_timelines(old, new)
+
+    # dni tylko w starej osi: wszystko usunięte, blok -> None
+    first = d.days[0]
+    assert first.day == START
+    assert first.new_block_id is None
+    assert first.removed
+    # dni wspólne: tylko nmn znika
+    mid = [dd for dd in d.days if date(2026, 1, 15) <= dd.day <= END]
+    assert mid
+    assert all(dd.removed in ((), ("nmn",)) for dd in mid if dd.old_block_id)
@@ -0,0 +1,105 @@
+from datetime import date, timedelta
+from typing import Any
+
+import pytest
+
+from longevity.engine import (
+    apply_global_exceptions,
+    generate_plan_range,
+    generate_year_plan,
+    resolve_exception_intervals,
+)
+
+START, END = date(2026, 1, 1), date(2026, 12, 31)
+ANCHOR = date(2026, 1, 5)
+
+
+def _empty_days(plans: list) -> set[date]:
+    return {p.day for p in plans if not p.items}
+
+
+def test_single_off_week_matches_per_day_evaluation(
+    model: dict[str, Any],
+) -> None:
+    s = date(2026, 2, 2)
+    plans = generate_plan_range(
+        model, START, END, off_week_start_date=s, cycle_anchor_date=ANCHOR
+    )
+    off = {s + timedelta(days=i) for i in range(7)}
+    assert _empty_days(plans) == off
+    for p in plans:
+        got = apply_global_exceptions(model, p.day, {"x"}, [], s, None)
+        assert (got == set()) == (p.day in off)
+
+
+def test_multiple_off_weeks_and_week_of_year(model: dict[str, Any]) -> None:
+    starts = [date(2026, 2, 2), date(2026, 8, 3)]
+    plans = generate_plan_range(
+        model, START, END, off_week_start_date=starts, cycle_anchor_date=ANCHOR
+    )
+    assert len(_empty_days(plans)) == 14
+
+    # tydzień ISO 32 w 2026 zaczyna się 2026-08-03
+    by_week = generate_plan_range(
+        model,
+        START,
+        END,
+        off_week_week_of_year=[6, 32],
+        cycle_anchor_date=ANCHOR,
+    )
+    assert _empty_days(by_week) == _empty_days(plans)
+
+    # ten sam tydzień w każdym roku zakresu
+    iv = resolve_exception_intervals(
+        model, date(2026, 1, 1), date(2027, 12, 31), off_week_week_of_year=32
+    )
+    assert [x.start for x in iv] == [date(2026, 8, 3), date(2027, 8, 9)]
+
+
+def test_iso_week_one_starting_in_december(model: dict[str, Any]) -> None:
+    # 1. tydzień ISO 2030 zaczyna się 2029-12-31
+    year = generate_year_plan(
+        model, 2029, off_week_week_of_year=1, cycle_anchor_date=ANCHOR
+    )
+    both = generate_plan_range(
+        model,
+        date(2029, 1, 1),
+        date(2030, 12, 31),
+        off_week_week_of_year=1,
+        cycle_anchor_date=ANCHOR,
+    )
+    assert year[-1].day == date(2029, 12, 31)
+    assert year[-1].is_off_week
+    assert year == both[: len(year)]
+
+
+def test_skip_windows_clear_days(model: dict[str, Any]) -> None:
+    window = (date(2026, 7, 10), date(2026, 7, 20))
+    plans = generate_plan_range(
+        model,
+        START,
+        END,
+        off_week_start_date=date(2026, 7, 6),
+        skip_windows=[window],
+        cycle_anchor_date=ANCHOR,
+    )
+    # OFF WEEK 6-12.07 + urlop 10-20.07 (nakładające się przedziały)
+    empty = _empty_days(plans)
+    assert min(empty) == date(2026, 7, 6)
+    assert max(empty) == date(2026, 7, 20)
+    assert len(empty) == 15
+
+
+def test_off_week_over_forbidden_event_raises(model: dict[str, Any]) -> None:
+    with pytest.raises(ValueError, match="forbidden events"):
+        generate_plan_range(
+            model,
+            START,
+            END,
+            off_week_week_of_year=11,
+            cycle_anchor_date=ANCHOR,
+        )
+    with pytest.raises(ValueError, match="Monday"):
+        generate_plan_range(
+            model, START, END, off_week_start_date=[date(2026, 2, 3)]
+        )
@@ -0,0 +1,55 @@
+from datetime import date
+from typing import Any
+
+from longevity.engine import (
+    PlanParams,
+    generate_plan_range,
+)
+from longevity.explain import explain_range
+
+START, END = date(2026, 1, 1), date(2026, 4, 30)
+
+
+def test_trace_replays_to_generated_plan(
+    model: dict[str, Any], params: PlanParams
+) -> None:
+    ex = explain_range(model, START, END, **params)
+    for p in generate_plan_range(model, START, END, **params):
+        ids: set[str] = set()
+        for r in ex.query(p.day, p.day):
+            if r.action == "add":
+                ids.add(r.supplement_id)
+            else:
+                ids.discard(r.supplement_id)
+        assert ids == {it.supplement_id for it in p.items}
+
+
+def test_trace_names_stage_and_rule(
+    model: dict[str, Any], params: PlanParams
+) -> None:
+    ex = explain_range(model, START, END, **params)
+
+    # OFF WEEK kasuje także CORE
+    (off,) = ex.why_missing(date(2026, 2, 3), "omega3_nko")
+    assert off.stage == "apply_global_exceptions"
+    assert off.rule_id == "off_week"
+
+    # puls fisetyny: allow_only
+    (pulse,) = ex.why_missing(date(2026, 3, 9), "r_ala")
+    assert pulse.stage == "apply_events"
+    assert pulse.rule_id == "event_overrides.pulse_fisetin"
+
+    # sezonowość D3K2 (kwiecień)
+    (season,) = ex.why_missing(date(2026, 4, 1), "d3k2")
+    assert (season.stage, season.rule_id) == (
+        "apply_constraints",
+        "d3k2_seasonal",
+    )
+
+    added = ex.query(date(2026, 1, 1), date(2026, 1, 1), supplement_id="nmn")
+    assert [(r.stage, r.rule_id) for r in added] == [
+        ("apply_schedule_rules", "nmn_4x_week")
+    ]
+    assert ex.why_missing(date(2026, 1, 2), "ginkgo")[0].rule_id == (
+        "ginkgo_exclude_blocks_nad"
+    )
@@ -0,0 +1,97 @@
+import json
+from datetime import UTC, date, datetime
+from typing import Any
+
+import pytest
+
+from longevity.engine import (
+    PlanParams,
+    export_csv,
+    export_ics,
+    generate_plan_range,
+)
+from longevity.export import (
+    CsvSink,
+    IcsSink,
+    JsonlSink,
+    Sink,
+    TextSink,
+    export_all,
+    export_jsonl,
+)
+from longevity.mailer import build_30day_text
+
+
+def _read(path) -> str:
+    with open(path, encoding="utf-8", newline="") as f:
+        return f.read()
+
+
+def test_single_pass_matches_per_format_exports(
+    tmp_path, model: dict[str, Any], params: PlanParams
+) -> None:
+    plans = generate_plan_range(
+        model, date(2026, 1, 1), date(2026, 3, 31), **params
+    )
+    export_csv(plans, str(tmp_path / "ref.csv"))
+    now = datetime(2026, 1, 1, 8, tzinfo=UTC)
+    export_ics(plans, str(tmp_path / "ref.ics"), now=now)
+    text_start = date(2026, 3, 15)  # część dni poza planem
+
+    export_all(
+        iter(plans),
+        [
+            CsvSink(tmp_path / "out.csv"),
+            IcsSink(tmp_path / "out.ics", now=now),
+            JsonlSink(tmp_path / "out.jsonl"),
+            TextSink(tmp_path / "out.txt", text_start, days=30),
+        ],
+    )
+
+    assert _read(tmp_path / "out.csv") == _read(tmp_path / "ref.csv")
+    assert _read(tmp_path / "out.ics") == _read(tmp_path / "ref.ics")
+    assert _read(tmp_path / "out.txt") == build_30day_text(
+        plans, text_start, days=30
+    )
+
+    rows = [json.loads(x) for x in _read(tmp_path / "out.jsonl").splitlines()]
+    assert len(rows) == len(plans)
+    assert rows[0]["date"] == "2026-01-01"
+    assert [it["id"] for it in rows[0]["items"]] == [
+        it.supplement_id for it in plans[0].items
+    ]
+
+
+def test_jsonl_fragments_match_json_dumps(
+    tmp_path, model: dict[str, Any], params: PlanParams
+) -> None:
+    plans = generate_plan_range(
+        model, date(2026, 1, 1), date(2026, 12, 31), **params
+    )
+    path = str(tmp_path / "plan.jsonl")
+    export_jsonl((p for p in plans), path)
+
+    lines = _read(path).splitlines()
+    assert len(lines) == len(plans)
+    for line, p in zip(lines, plans, strict=True):
+        expected = {
+            "date": p.day.isoformat(),
+            "block": p.block_id,
+            "events": p.events,
+            "is_off_week": p.is_off_week,
+            "items": [
+                {
+                    "id": it.supplement_id,
+                    "timing": it.timing_hint,
+                    "priority": it.priority,
+                    "dose": it.dose,
+                }
+                for it in p.items
+            ],
+        }
+        assert line == json.dumps(expected, ensure_ascii=False)
+
+
+def test_sink_is_abstract(tmp_path) -> None:
+    with pytest.raises(TypeError):
+        Sink(tmp_path / "x")  # type: ignore[abstract]
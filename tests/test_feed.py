@@ -0,0 +1,81 @@
+import gzip
+import threading
+from datetime import date
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pytest
+
+from longevity.feed import FeedService, feed_range, make_server
+
+PROFILES = {
+    "alice": {
+        "cycle_anchor_date": "2026-01-05",
+        "off_week_start_date": ["2026-02-02"],
+        "calendar_name": "Alice",
+    }
+}
+
+
+def test_service_caches_rendered_feed() -> None:
+    service = FeedService(PROFILES, cache_size=2)
+    a = service.feed("alice", date(2026, 1, 1), date(2026, 3, 31))
+    assert service.feed("alice", date(2026, 1, 1), date(2026, 3, 31)) is a
+    assert a.body.count(b"BEGIN:VEVENT") == 90
+    assert gzip.decompress(a.gzipped) == a.body
+
+    service.feed("alice", date(2026, 4, 1), date(2026, 4, 30))
+    service.feed("alice", date(2026, 5, 1), date(2026, 5, 31))
+    assert len(service.cache) == 2  # LRU
+    with pytest.raises(KeyError):
+        service.feed("bob", date(2026, 1, 1), date(2026, 1, 2))
+
+
+def test_feed_range_defaults_and_limits() -> None:
+    today = date(2026, 10, 19)
+    assert feed_range({}, today) == (date(2026, 1, 1), date(2026, 12, 31))
+    assert feed_range({"from": ["2028-02-29"]}, today) == (
+        date(2028, 2, 29),
+        date(2029, 2, 28),
+    )
+    with pytest.raises(ValueError):
+        feed_range({"from": ["2026-02-01"], "to": ["2026-01-01"]}, today)
+
+
+def test_http_etag_and_gzip() -> None:
+    server = make_server(FeedService(PROFILES), port=0)
+    t = threading.Thread(target=server.serve_forever, daemon=True)
+    t.start()
+    base = f"http://127.0.0.1:{server.server_port}"
+    url = f"{base}/calendar/alice.ics?from=2026-01-01&to=2026-01-31"
+    try:
+        with urlopen(Request(url, headers={"Accept-Encoding": "gzip"})) as r:
+            assert r.headers["Content-Encoding"] == "gzip"
+            body = gzip.decompress(r.read())
+            etag = r.headers["ETag"]
+            assert r.headers["Vary"] == "Accept-Encoding"
+        assert body.startswith(b"BEGIN:VCALENDAR")
+        assert etag.endswith('-gzip"')
+
+        gz_match = {"If-None-Match": etag, "Accept-Encoding": "gzip"}
+        with pytest.raises(HTTPError) as e:
+            urlopen(Request(url, headers=gz_match))
+        assert e.value.code == 304
+
+        # ETag wariantu gzip nie pasuje do wersji identity
+        with urlopen(Request(url, headers={"If-None-Match": etag})) as r:
+            assert "Content-Encoding" not in r.headers
+            plain = r.headers["ETag"]
+            assert r.read() == body
+        assert plain != etag
+
+        with pytest.raises(HTTPError) as e:
+            urlopen(Request(url, headers={"If-None-Match": plain}))
+        assert e.value.code == 304
+
+        with pytest.raises(HTTPError) as e:
+            urlopen(f"{base}/calendar/bob.ics")
+        assert e.value.code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,80 @@
+import sys
+from datetime import date
+from typing import Any
+
+import pytest
+
+from longevity.engine import DayPlan, PlanParams, generate_plan_range
+from longevity.timeline import Timeline, timeline_from_plans
+
+pd = pytest.importorskip("pandas")
+
+
+def _setup(
+    M: dict[str, Any], params: PlanParams
+) -> tuple[list[DayPlan], Timeline]:
+    plans = generate_plan_range(
+        M, date(2026, 1, 1), date(2026, 12, 31), **params
+    )
+    return plans, timeline_from_plans(plans, M)
+
+
+def test_long_frame_matches_plans(
+    model: dict[str, Any], week_params: PlanParams
+) -> None:
+    plans, tl = _setup(model, week_params)
+    df = tl.to_dataframe(model)
+
+    assert len(df) == sum(len(p.items) for p in plans)
+    expected = {
+        (p.day, it.supplement_id, it.timing_hint, it.priority, p.block_id)
+        for p in plans
+        for it in p.items
+    }
+    got = {
+        (d.date(), sid, t if isinstance(t, str) else None, int(pr), b)
+        for d, sid, t, pr, b in zip(
+            df["day"],
+            df["supplement_id"],
+            df["timing"],
+            df["priority"],
+            df["block"],
+            strict=True,
+        )
+    }
+    assert got == expected
+
+    by_day = {p.day: p for p in plans}
+    for row in df.drop_duplicates("day").itertuples():
+        p = by_day[row.day.date()]
+        assert row.is_off_week == p.is_off_week
+        assert row.is_pulse_day == p.is_pulse_day
+        assert row.pulse_fisetin == ("pulse_fisetin" in p.events)
+
+
+def test_wide_frame_and_arrays(
+    model: dict[str, Any], week_params: PlanParams
+) -> None:
+    plans, tl = _setup(model, week_params)
+    wide = tl.to_dataframe(model, layout="wide")
+    assert wide.shape == (len(plans), len(tl.supplement_ids))
+    for i in (0, 40, 200, 364):
+        ids = {it.supplement_id for it in plans[i].items}
+        row = wide.iloc[i]
+        assert set(row.index[row.to_numpy()]) == ids
+
+    a = tl.to_arrays(model)
+    assert len(a) == len(plans)
+    assert a.taken.sum() == sum(len(p.items) for p in plans)
+
+    with pytest.raises(ValueError):
+        tl.to_dataframe(model, layout="tall")
+
+
+def test_missing_pandas_names_the_extra(
+    monkeypatch, model: dict[str, Any], week_params: PlanParams
+) -> None:
+    _, tl = _setup(model, week_params)
+    monkeypatch.setitem(sys.modules, "pandas", None)
+    with pytest.raises(ImportError, match=r"longevity\[frames\]"):
+        tl.to_dataframe(model)
@@ -0,0 +1,92 @@
+import re
+from datetime import UTC, date, datetime
+from typing import Any
+
+from longevity.engine import (
+    IcsState,
+    export_ics,
+    generate_plan_range,
+    render_ics,
+)
+
+ANCHOR = date(2026, 1, 5)
+START, END = date(2026, 1, 1), date(2026, 3, 31)
+
+
+def _events(text: str) -> dict[str, str]:
+    blocks = re.findall(r"BEGIN:VEVENT\n.*?END:VEVENT", text, re.S)
+    out: dict[str, str] = {}
+    for b in blocks:
+        uid = re.search(r"UID:(\S+)", b)
+        assert uid is not None
+        out[uid.group(1)] = b
+    return out
+
+
+def test_stateless_render_is_byte_identical(model: dict[str, Any]) -> None:
+    plans = generate_plan_range(model, START, END, cycle_anchor_date=ANCHOR)
+    now = datetime(2025, 12, 1, 9, 30, tzinfo=UTC)
+    text = render_ics(plans, now=now)
+    assert text == render_ics(plans, now=now)
+    # eksport przed początkiem planu - DTSTAMP to chwila eksportu
+    assert set(re.findall(r"DTSTAMP:(\S+)", text)) == {"20251201T093000Z"}
+    assert set(re.findall(r"SEQUENCE:(\d+)", text)) == {"0"}
+
+
+def test_stamp_never_later_than_export(model: dict[str, Any]) -> None:
+    plans = generate_plan_range(model, START, END, cycle_anchor_date=ANCHOR)
+    state = IcsState(entries={})
+    render_ics(plans, state=state, now=datetime(2026, 6, 1, tzinfo=UTC))
+    earlier = datetime(2026, 5, 1, tzinfo=UTC)
+    text = render_ics(plans, state=state, now=earlier)
+    assert set(re.findall(r"DTSTAMP:(\S+)", text)) == {"20260501T000000Z"}
+    assert set(re.findall(r"SEQUENCE:(\d+)", text)) == {"0"}
+
+
+def test_state_bumps_sequence_only_for_changed_days(
+    tmp_path, model: dict[str, Any]
+) -> None:
+    state_path = str(tmp_path / "state.json")
+    out = str(tmp_path / "plan.ics")
+
+    export_ics(
+        generate_plan_range(model, START, END, cycle_anchor_date=ANCHOR),
+        out,
+        state_path=state_path,
+        now=datetime(2026, 1, 1, tzinfo=UTC),
+    )
+    with open(out, encoding="utf-8") as f:
+        before = _events(f.read())
+
+    changed = generate_plan_range(
+        model,
+        START,
+        END,
+        off_week_start_date=date(2026, 2, 2),
+        cycle_anchor_date=ANCHOR,
+    )
+    state = IcsState.load(state_path)
+    after = _events(
+        render_ics(changed, state=state, now=datetime(2026, 1, 2, tzinfo=UTC))
+    )
+
+    bumped = {uid for uid, ev in after.items() if "SEQUENCE:1" in ev}
+    assert len(bumped) == 7
+    for uid, ev in after.items():
+        if uid not in bumped:
+            assert ev == before[uid]
+        else:
+            assert "DTSTAMP:20260102T000000Z" in ev
+    # ponowny render z tym samym stanem nic nie zmienia
+    assert _events(render_ics(changed, state=state)) == after
+
+
+def test_export_without_state_path_writes_only_output(
+    tmp_path, model: dict[str, Any]
+) -> None:
+    plans = generate_plan_range(model, START, END, cycle_anchor_date=ANCHOR)
+    out = tmp_path / "plan.ics"
+    now = datetime(2026, 1, 1, tzinfo=UTC)
+    export_ics(plans, str(out), now=now)
+    assert [p.name for p in tmp_path.iterdir()] == ["plan.ics"]
+    assert out.read_text(encoding="utf-8") == render_ics(plans, now=now)
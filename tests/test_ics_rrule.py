@@ -0,0 +1,71 @@
+import re
+from datetime import UTC, date, datetime, timedelta
+from typing import Any
+
+from longevity.engine import (
+    PlanParams,
+    generate_plan_range,
+    render_ics,
+)
+from longevity.ics_rrule import expand_rrule_days, render_ics_rrule
+from longevity.timeline import timeline_from_plans
+
+START, END = date(2026, 1, 1), date(2027, 12, 31)
+
+
+def _ymd(s: str) -> date:
+    return date(int(s[:4]), int(s[4:6]), int(s[6:8]))
+
+
+def _expand(text: str, kind: str = "s") -> dict[str, set[date]]:
+    """
+    UID-kind ("s" suplementy, "e" eventy) -> rozwinięte dni.
+    """
+    text = text.replace("\n ", "")  # unfold
+    out: dict[str, set[date]] = {}
+    for ev in re.findall(r"BEGIN:VEVENT\n(.*?)END:VEVENT", text, re.S):
+        f = dict(line.split(":", 1) for line in ev.strip().split("\n"))
+        m = re.match(rf"longevity48-{kind}-(.+)-\d{{8}}@longevity", f["UID"])
+        if m is None:
+            continue
+        d0 = _ymd(f["DTSTART;VALUE=DATE"])
+        d1 = _ymd(f["DTEND;VALUE=DATE"])
+        starts = [d0]
+        if "RRULE" in f:
+            ex = {
+                _ymd(x) for x in f.get("EXDATE;VALUE=DATE", "").split(",") if x
+            }
+            starts = expand_rrule_days(d0, f["RRULE"], ex)
+        days = [
+            x + timedelta(days=i)
+            for x in starts
+            for i in range((d1 - d0).days)
+        ]
+        out.setdefault(m.group(1), set()).update(days)
+    return out
+
+
+def test_rrule_calendar_expands_to_plan(
+    model: dict[str, Any], params: PlanParams
+) -> None:
+    plans = generate_plan_range(model, START, END, **params)
+    tl = timeline_from_plans(plans, model)
+    now = datetime(2025, 12, 1, tzinfo=UTC)
+    text = render_ics_rrule(tl, model, now=now)
+    assert set(re.findall(r"DTSTAMP:(\S+)", text)) == {"20251201T000000Z"}
+
+    expected: dict[str, set[date]] = {}
+    for p in plans:
+        for it in p.items:
+            expected.setdefault(it.supplement_id, set()).add(p.day)
+    assert _expand(text) == expected
+
+    # pulsy: jedna seria roczna zamiast osobnego wydarzenia na rok
+    events: dict[str, set[date]] = {}
+    for p in plans:
+        for ev in p.events:
+            events.setdefault(ev, set()).add(p.day)
+    assert _expand(text, "e") == events
+    assert "RRULE:FREQ=YEARLY" in text
+
+    assert len(text) < len(render_ics(plans)) / 2
@@ -0,0 +1,53 @@
+from datetime import date
+from typing import Any
+
+import pytest
+
+from longevity.incremental import affected_ranges, update_timeline
+from longevity.timeline import generate_timeline
+
+START, END = date(2026, 1, 1), date(2027, 12, 31)
+BASE = {
+    "off_week_start_date": date(2026, 2, 2),
+    "cycle_anchor_date": date(2026, 1, 5),
+    "flags": {"enable_melissa": False},
+}
+
+
+@pytest.mark.parametrize(
+    "delta",
+    [
+        {"off_week_start_date": date(2026, 2, 9)},
+        {"off_week_start_date": None, "off_week_week_of_year": 30},
+        {"flags": {"enable_melissa": True}},
+        {"cycle_anchor_date": date(2026, 1, 19)},
+        {"skip_windows": [(date(2026, 7, 1), date(2026, 7, 14))]},
+    ],
+)
+def test_update_matches_full_generation(delta, model: dict[str, Any]) -> None:
+    new = {**BASE, **delta}
+    tl = generate_timeline(model, START, END, **BASE)
+    assert update_timeline(model, tl, BASE, new) == generate_timeline(
+        model, START, END, **new
+    )
+
+
+def test_affected_ranges_are_narrow(model: dict[str, Any]) -> None:
+    tl = generate_timeline(model, START, END, **BASE)
+
+    moved = {**BASE, "off_week_start_date": date(2026, 2, 9)}
+    assert affected_ranges(model, tl, BASE, moved) == [
+        (date(2026, 2, 2), date(2026, 2, 15))
+    ]
+
+    # enable_melissa działa tylko w bloku DETOX
+    melissa = {**BASE, "flags": {"enable_melissa": True}}
+    for a, b in affected_ranges(model, tl, BASE, melissa):
+        days = range(tl.index_of(a), tl.index_of(b) + 1)
+        assert {tl.block_ids[tl.blocks[i]] for i in days} == {"DETOX"}
+
+    assert affected_ranges(model, tl, BASE, dict(BASE)) == []
+    assert update_timeline(model, tl, BASE, dict(BASE)) is tl
+
+    with pytest.raises(ValueError):
+        affected_ranges(model, tl, BASE, {**BASE, "anchor": date(2026, 1, 1)})
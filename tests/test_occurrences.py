@@ -0,0 +1,57 @@
+from datetime import date
+from typing import Any
+
+from longevity.engine import DayPlan, PlanParams, generate_plan_range
+from longevity.occurrences import OccurrenceIndex
+
+
+def _setup(
+    M: dict[str, Any], params: PlanParams
+) -> tuple[list[DayPlan], OccurrenceIndex]:
+    plans = generate_plan_range(
+        M, date(2026, 1, 1), date(2027, 12, 31), **params
+    )
+    return plans, OccurrenceIndex.from_plans(plans, M)
+
+
+def _scan(plans, sid, start=date.min, end=date.max):
+    return [
+        p.day
+        for p in plans
+        if start <= p.day <= end
+        and any(it.supplement_id == sid for it in p.items)
+    ]
+
+
+def test_range_and_count_queries_match_scan(
+    model: dict[str, Any], params: PlanParams
+) -> None:
+    plans, idx = _setup(model, params)
+    q2 = (date(2026, 4, 1), date(2026, 6, 30))
+    assert idx.days("nmn", *q2) == _scan(plans, "nmn", *q2)
+    assert idx.count("d3k2", date(2026, 1, 1), date(2026, 12, 31)) == len(
+        _scan(plans, "d3k2", date(2026, 1, 1), date(2026, 12, 31))
+    )
+
+
+def test_next_day(model: dict[str, Any], params: PlanParams) -> None:
+    plans, idx = _setup(model, params)
+    assert idx.next_day("fisetin_pulse", date(2026, 3, 9)) == date(2026, 6, 8)
+    assert idx.next_day(
+        "fisetin_pulse", date(2026, 3, 9), inclusive=True
+    ) == date(2026, 3, 9)
+    assert idx.next_day("fisetin_pulse", date(2027, 12, 20)) is None
+
+
+def test_set_algebra(model: dict[str, Any], params: PlanParams) -> None:
+    plans, idx = _setup(model, params)
+    both = idx.all_of("nmn", "lions_mane")
+    either = idx.any_of("nmn", "cordyceps")
+    assert list(both) == [
+        d for d in _scan(plans, "nmn") if d in set(_scan(plans, "lions_mane"))
+    ]
+    assert len(either) == len(
+        set(_scan(plans, "nmn")) | set(_scan(plans, "cordyceps"))
+    )
+    assert not (idx["nmn"] & idx["cordyceps"])  # różne bloki
+    assert date(2026, 2, 3) in ~idx.any_of(*idx.supplement_ids())
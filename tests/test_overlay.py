@@ -0,0 +1,104 @@
+import copy
+from typing import Any
+
+import pytest
+
+from longevity.engine import (
+    PlanParams,
+    generate_year_plan,
+    normalize_model,
+)
+from longevity.overlay import overlay_model
+
+
+def _ids(plans):
+    return [[it.supplement_id for it in p.items] for p in plans]
+
+
+def test_overlay_matches_deep_copied_spec(
+    raw_model: dict[str, Any], params: PlanParams
+) -> None:
+    base = normalize_model(raw_model)
+    ov = overlay_model(
+        base,
+        {
+            "rule_params": {"nmn": {"nmn_4x_week": {"fixed_days": [0, 2, 4]}}},
+            "block_calendar": {10: "MITO"},
+        },
+    )
+
+    edited = copy.deepcopy(raw_model)
+    rule = edited["SUPPLEMENTS"]["nmn"]["schedule_rules"][0]
+    rule["params"]["fixed_days"] = [0, 2, 4]
+    edited["BLOCK_CALENDAR"][10] = "MITO"
+
+    assert generate_year_plan(ov, 2026, **params) == generate_year_plan(
+        edited, 2026, **params
+    )
+
+
+def test_disabled_supplement_never_appears(
+    params: PlanParams, model: dict[str, Any]
+) -> None:
+    ov = overlay_model(model, {"disable": ["melissa", "d3k2"]})
+    ids = {
+        sid
+        for day in _ids(generate_year_plan(ov, 2026, **params))
+        for sid in day
+    }
+    assert "melissa" not in ids
+    assert "d3k2" not in ids
+    assert "omega3_nko" in ids
+
+
+def test_overlay_shares_untouched_base_subtrees(model: dict[str, Any]) -> None:
+    ov = overlay_model(model, {"supplements": {"nmn": {"priority": 1}}})
+    N = ov.materialize()
+
+    assert N["SUPPLEMENTS"]["omega3_nko"] is model["SUPPLEMENTS"]["omega3_nko"]
+    assert N["BLOCK_CALENDAR"] is model["BLOCK_CALENDAR"]
+    assert N["SUPPLEMENTS"]["nmn"]["priority"] == 1
+    assert model["SUPPLEMENTS"]["nmn"]["priority"] == 80
+    assert list(ov.supplements) == ["nmn"]
+
+
+def test_overlay_rejects_unknown_ids(model: dict[str, Any]) -> None:
+    with pytest.raises(ValueError):
+        overlay_model(model, {"disable": ["nope"]})
+    with pytest.raises(ValueError):
+        overlay_model(model, {"block_calendar": {3: "NOPE"}})
+
+
+def test_overlay_priority_change_reorders_items(
+    params: PlanParams, model: dict[str, Any]
+) -> None:
+    plans = generate_year_plan(model, 2026, **params)
+    day = next(p for p in plans if len(p.items) > 2)
+    first, second = day.items[0], day.items[1]
+    # ta sama pora dnia -> o kolejności decyduje priorytet
+    if first.timing_hint != second.timing_hint:
+        pytest.skip("first two items differ in timing")
+
+    ov = overlay_model(
+        model,
+        {"supplements": {second.supplement_id: {"priority": 1000}}},
+    )
+    day2 = generate_year_plan(ov, 2026, **params)[plans.index(day)]
+    assert day2.items[0].supplement_id == second.supplement_id
+    assert day2.items[1].supplement_id == first.supplement_id
+
+
+def test_disabling_required_supplement_drops_require_chain(
+    raw_model: dict[str, Any], params: PlanParams
+) -> None:
+    raw_model["SUPPLEMENTS"]["collagen"]["constraints"].append(
+        {
+            "id": "collagen_needs_d3k2",
+            "type": "require_supplements",
+            "params": {"supplement_ids": {"d3k2"}},
+        }
+    )
+    ov = overlay_model(normalize_model(raw_model), {"disable": ["d3k2"]})
+    days = _ids(generate_year_plan(ov, 2026, **params))
+    assert any("collagen" in day for day in days)
+    assert not any("d3k2" in day for day in days)
@@ -0,0 +1,43 @@
+from datetime import date
+from typing import Any
+
+from longevity.engine import PlanParams
+from longevity.parallel import generate_timeline_parallel, shard_ranges
+from longevity.timeline import generate_timeline
+
+PARAMS: PlanParams = {
+    "off_week_week_of_year": 6,
+    "cycle_anchor_date": date(2026, 1, 6),
+    "flags": {"enable_melissa": True},
+    "skip_windows": [(date(2026, 12, 28), date(2027, 1, 3))],
+}
+START, END = date(2025, 11, 15), date(2028, 2, 10)
+
+
+def test_shard_ranges_cover_horizon() -> None:
+    shards = shard_ranges(START, END, "year")
+    assert shards[0] == (START, date(2025, 12, 31))
+    assert shards[-1] == (date(2028, 1, 1), END)
+    months = shard_ranges(START, END, "month")
+    assert len(months) == 28
+    assert months[3] == (date(2026, 2, 1), date(2026, 2, 28))
+
+
+def test_sharded_timeline_matches_serial(model: dict[str, Any]) -> None:
+    serial = generate_timeline(model, START, END, **PARAMS)
+    for shard, workers in (("month", 1), ("year", 2)):
+        got = generate_timeline_parallel(
+            model, START, END, shard=shard, workers=workers, **PARAMS
+        )
+        assert got.start == serial.start
+        assert got.masks == serial.masks
+        assert got.day_flags == serial.day_flags
+        for i in range(len(serial)):
+            assert (
+                got.block_ids[got.blocks[i]]
+                == serial.block_ids[serial.blocks[i]]
+            )
+            assert (
+                got.event_sets[got.events[i]]
+                == serial.event_sets[serial.events[i]]
+            )
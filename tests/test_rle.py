@@ -0,0 +1,55 @@
+import pickle
+from datetime import date
+from typing import Any
+
+from longevity.engine import (
+    PlanParams,
+    generate_plan_range,
+)
+from longevity.overlay import overlay_model
+from longevity.rle import EncodedTimeline, _encode_runs
+from longevity.timeline import timeline_from_plans
+
+
+def test_encode_runs_round_trip() -> None:
+    symbols = [0] * 9 + [1, 2, 3, 4, 5, 6, 7] * 3 + [8, 9] + [0, 0]
+    starts, patterns = _encode_runs(symbols)
+    assert [len(p) for p in patterns] == [1, 7, 2, 1]
+    decoded: list[int] = []
+    bounds = starts[1:] + [len(symbols)]
+    for lo, hi, pat in zip(starts, bounds, patterns, strict=True):
+        decoded.extend(pat[i % len(pat)] for i in range(hi - lo))
+    assert decoded == symbols
+
+
+def test_encoded_timeline_decodes_to_plans(
+    model: dict[str, Any], week_params: PlanParams
+) -> None:
+    plans = generate_plan_range(
+        model, date(2026, 1, 1), date(2028, 12, 31), **week_params
+    )
+    tl = timeline_from_plans(plans, model)
+    enc = EncodedTimeline.from_timeline(tl)
+
+    assert enc.to_timeline() == tl
+    assert list(enc.iter_plans(model)) == plans
+    assert enc.day_plan(model, date(2027, 7, 14)) == plans[559]
+
+    data = enc.to_bytes()
+    assert EncodedTimeline.from_bytes(data) == enc
+    assert len(data) * 10 < len(pickle.dumps(plans))
+
+
+def test_decode_with_another_model_is_not_stale(
+    model: dict[str, Any], week_params: PlanParams
+) -> None:
+    start, end = date(2026, 1, 1), date(2026, 3, 31)
+    plans = generate_plan_range(model, start, end, **week_params)
+    enc = EncodedTimeline.from_timeline(timeline_from_plans(plans, model))
+    assert list(enc.iter_plans(model)) == plans
+
+    sid = plans[0].items[0].supplement_id
+    ov = overlay_model(model, {"supplements": {sid: {"name": "renamed"}}})
+    expected = generate_plan_range(ov, start, end, **week_params)
+    assert list(enc.iter_plans(ov)) == expected
+    assert enc.day_plan(model, start) == plans[0]
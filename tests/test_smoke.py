@@ -13,3 +13,20 @@ def test_generate_plan_smoke() -> None:
         cycle_anchor_date=date(2026, 1, 1),
     )
     assert len(plans) == 365
+
+
+def test_item_order_follows_timing_then_priority() -> None:
+    M = assemble_model_from_globals(spec)
+    order = M["NORMALIZATION_RULES"]["ordering"]["timing_hint_order"]
+    plans = generate_year_plan(
+        M,
+        2026,
+        off_week_start_date=date(2026, 2, 2),
+        cycle_anchor_date=date(2026, 1, 1),
+    )
+    for p in plans:
+        keys = [
+            (order.index(it.timing_hint), -it.priority, it.supplement_id)
+            for it in p.items
+        ]
+        assert keys == sorted(keys)
@@ -0,0 +1,49 @@
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+from longevity import snapshot, spec
+from longevity.engine import (
+    PlanParams,
+    generate_year_plan,
+)
+
+
+def _spec_copy(tmp_path: Path) -> Path:
+    src = tmp_path / "spec.py"
+    src.write_text(Path(spec.__file__).read_text("utf-8"), "utf-8")
+    return src
+
+
+def test_snapshot_roundtrip(tmp_path: Path, model: dict[str, Any]) -> None:
+    out = snapshot.compile_snapshot(_spec_copy(tmp_path))
+    assert out.suffix == ".snap"
+
+    loaded = snapshot.load_snapshot(out)
+    assert loaded == model
+
+
+def test_generate_accepts_snapshot_path(
+    tmp_path: Path, model: dict[str, Any], params: PlanParams
+) -> None:
+    out = snapshot.compile_snapshot(_spec_copy(tmp_path))
+    from_snap = generate_year_plan(str(out), 2026, **params)
+    from_dict = generate_year_plan(model, 2026, **params)
+    assert from_snap == from_dict
+
+
+def test_stale_snapshot_is_recompiled(
+    tmp_path: Path, params: PlanParams
+) -> None:
+    src = _spec_copy(tmp_path)
+    out = snapshot.compile_snapshot(src)
+    with src.open("a", encoding="utf-8") as f:
+        f.write('\nBLOCK_CALENDAR[1] = "MITO"\n')
+
+    with pytest.raises(snapshot.StaleSnapshotError):
+        snapshot.load_snapshot(out)
+
+    plans = generate_year_plan(out, 2026, **params)
+    assert plans[0].block_id == "MITO"
+    assert snapshot.load_snapshot(out)["BLOCK_CALENDAR"][1] == "MITO"
@@ -0,0 +1,54 @@
+import json
+import subprocess
+import sys
+from datetime import date
+from pathlib import Path
+from typing import Any
+
+from longevity.engine import (
+    PlanParams,
+    generate_plan_range,
+    generate_year_plan,
+)
+
+SRC = str(Path(__file__).resolve().parents[1] / "src")
+
+
+def test_mailer_import_is_lazy() -> None:
+    code = (
+        "import json, sys\n"
+        "import longevity.mailer\n"
+        "mods = ['smtplib', 'longevity.spec', 'pydantic_settings', 'csv']\n"
+        "print(json.dumps([m for m in mods if m in sys.modules]))\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        env={"PYTHONPATH": SRC},
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    assert json.loads(out.stdout) == []
+
+
+def test_plan_range_matches_year_plan(
+    model: dict[str, Any], params: PlanParams
+) -> None:
+    year = generate_year_plan(model, 2026, **params)
+    part = generate_plan_range(
+        model, date(2026, 1, 25), date(2026, 2, 23), **params
+    )
+    assert len(part) == 30
+    assert part == year[24:54]
+
+
+def test_plan_range_crosses_year_boundary(model: dict[str, Any]) -> None:
+    plans = generate_plan_range(
+        model,
+        date(2026, 12, 20),
+        date(2027, 1, 18),
+        cycle_anchor_date=date(2026, 1, 6),
+    )
+    assert plans[0].day == date(2026, 12, 20)
+    assert plans[-1].day == date(2027, 1, 18)
+    assert len(plans) == 30
@@ -0,0 +1,109 @@
+from datetime import date
+from typing import Any
+
+import pytest
+
+from longevity.engine import (
+    PlanParams,
+    generate_plan_range,
+)
+from longevity.overlay import overlay_model
+from longevity.store import PlanStore, sqlite_path
+from longevity.timeline import timeline_from_plans
+
+
+def test_sqlite_path() -> None:
+    assert sqlite_path("sqlite:///./local.db") == "./local.db"
+    assert sqlite_path("sqlite:////tmp/x.db") == "/tmp/x.db"
+    assert sqlite_path("sqlite:///:memory:") == ":memory:"
+    with pytest.raises(ValueError):
+        sqlite_path("postgresql://localhost/db")
+
+
+def test_store_round_trip(
+    tmp_path, model: dict[str, Any], week_params: PlanParams
+) -> None:
+    plans = generate_plan_range(
+        model, date(2026, 1, 1), date(2027, 12, 31), **week_params
+    )
+    tl = timeline_from_plans(plans, model)
+    url = f"sqlite:///{tmp_path / 'plans.db'}"
+
+    with PlanStore(url) as store:
+        store.write_timeline(
+            "anna", tl, model, params=week_params, batch_days=100
+        )
+        # ponowny zapis nadpisuje zakres (bez duplikatów)
+        store.write_timeline("anna", tl, model, params=week_params)
+        store.write_timeline(
+            "bob", timeline_from_plans(plans[:31], model), model
+        )
+
+    with PlanStore(url) as store:
+        assert store.profile_ids() == ["anna", "bob"]
+        assert store.stored_range("anna") == (plans[0].day, plans[-1].day)
+        assert store.stored_range("nobody") is None
+
+        got = store.plan_range("anna", date(2026, 3, 1), date(2026, 9, 30))
+        assert got == plans[59:273]
+        assert (
+            store.plan_range("anna", date(2030, 1, 1), date(2030, 2, 1)) == []
+        )
+
+        sid = plans[0].items[0].supplement_id
+        occ = store.occurrences(sid, date(2026, 1, 1), date(2026, 1, 31))
+        expected = [
+            (pid, p.day)
+            for p in plans[:31]
+            if any(it.supplement_id == sid for it in p.items)
+            for pid in ("anna", "bob")
+        ]
+        assert occ == expected
+        assert store.occurrences(
+            sid, date(2026, 1, 1), date(2026, 1, 31), profile_id="bob"
+        ) == [x for x in expected if x[0] == "bob"]
+
+        with pytest.raises(ValueError):
+            store.plan_range("nobody", date(2026, 1, 1), date(2026, 1, 2))
+
+
+def test_profiles_with_different_overlays_keep_own_attributes(
+    model: dict[str, Any], week_params: PlanParams
+) -> None:
+    start, end = date(2026, 1, 1), date(2026, 3, 31)
+    overlays = {
+        "anna": overlay_model(
+            model, {"supplements": {"nmn": {"name": "NMN anna"}}}
+        ),
+        "bob": overlay_model(
+            model,
+            {
+                "supplements": {
+                    "nmn": {
+                        "priority": 1000,
+                        "default_dose": {
+                            "amount": 250,
+                            "unit": "mg",
+                            "timing_hint": "evening",
+                        },
+                    }
+                },
+                "disable": ["d3k2"],
+            },
+        ),
+    }
+    with PlanStore("sqlite:///:memory:") as store:
+        expected = {}
+        for pid, ov in overlays.items():
+            M = ov.materialize()
+            plans = generate_plan_range(M, start, end, **week_params)
+            store.write_timeline(pid, timeline_from_plans(plans, M), ov)
+            expected[pid] = plans
+        for pid, plans in expected.items():
+            assert store.plan_range(pid, start, end) == plans
+        anna = {
+            it.name
+            for p in store.plan_range("anna", start, end)
+            for it in p.items
+        }
+        assert "NMN anna" in anna
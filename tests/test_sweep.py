@@ -0,0 +1,68 @@
+from datetime import date
+from typing import Any
+
+import pytest
+
+from longevity.engine import (
+    generate_year_plan,
+)
+from longevity.sweep import mondays, sweep_params
+
+FLAGS = {"enable_melissa": True}
+
+
+def test_sweep_matches_generate_year_plan(model: dict[str, Any]) -> None:
+    anchors = [date(2026, 1, 6), date(2026, 4, 13)]
+    starts = [date(2026, 2, 2), date(2026, 3, 2), date(2026, 7, 27)]
+    results = sweep_params(
+        model,
+        2026,
+        cycle_anchor_dates=anchors,
+        off_week_start_dates=starts,
+        flags=FLAGS,
+    )
+    assert len(results) == 6
+
+    core = set(model["CORE_SET"])
+    for c in results:
+        if not c.is_valid:
+            with pytest.raises(ValueError, match="OFF WEEK overlaps"):
+                generate_year_plan(
+                    model,
+                    2026,
+                    off_week_start_date=c.off_week_start_date,
+                    cycle_anchor_date=c.cycle_anchor_date,
+                    flags=FLAGS,
+                )
+            continue
+
+        plans = generate_year_plan(
+            model,
+            2026,
+            off_week_start_date=c.off_week_start_date,
+            cycle_anchor_date=c.cycle_anchor_date,
+            flags=FLAGS,
+        )
+        ids = [{it.supplement_id for it in p.items} for p in plans]
+        assert c.days_without_core == sum(1 for x in ids if not core & x)
+        for sid, n in c.on_days.items():
+            assert n == sum(1 for x in ids if sid in x)
+
+
+def test_sweep_flags_off_week_over_pulse(model: dict[str, Any]) -> None:
+    results = sweep_params(
+        model,
+        2026,
+        cycle_anchor_dates=[date(2026, 1, 6)],
+        off_week_start_dates=[date(2026, 3, 2), date(2026, 3, 9)],
+    )
+    # fisetyna: 8-9 marca -> tydzień od 2.03 nachodzi na puls (8.03)
+    assert [c.off_week_event_conflicts for c in results] == [1, 1]
+    assert not results[0].is_valid
+
+
+def test_default_sweep_covers_all_mondays(model: dict[str, Any]) -> None:
+    results = sweep_params(model, 2026, flags=FLAGS)
+    assert len(mondays(2026)) == 52
+    assert len(results) == 52 * 52
+    assert "astragalus" in results[0].on_days
@@ -0,0 +1,50 @@
+from datetime import date
+from typing import Any
+
+from longevity.engine import (
+    PlanParams,
+    generate_plan_range,
+)
+from longevity.timeline import generate_timeline, timeline_from_plans
+
+
+def test_views_match_plans(
+    model: dict[str, Any], week_params: PlanParams
+) -> None:
+    plans = generate_plan_range(
+        model, date(2026, 1, 1), date(2027, 12, 31), **week_params
+    )
+    views = timeline_from_plans(plans, model).plans(model)
+
+    assert len(views) == len(plans)
+    assert list(views) == plans
+    assert views[-1] == plans[-1]
+    assert views[10:20] == plans[10:20]
+    assert views.on(date(2027, 3, 9)).to_plan() == plans[432]
+
+
+def test_scan_does_not_build_items(
+    model: dict[str, Any], week_params: PlanParams
+) -> None:
+    plans = generate_plan_range(
+        model, date(2026, 1, 1), date(2026, 12, 31), **week_params
+    )
+    views = timeline_from_plans(plans, model).plans(model)
+
+    off = [v.day for v in views if v.is_off_week]
+    assert off == [p.day for p in plans if p.is_off_week]
+    assert [v.block_id for v in views] == [p.block_id for p in plans]
+    assert views._by_mask == {}
+
+    assert views[0].items == plans[0].items
+    assert len(views._by_mask) == 1
+
+
+def test_generate_timeline_skips_day_plans(
+    model: dict[str, Any], week_params: PlanParams
+) -> None:
+    start, end = date(2025, 12, 1), date(2027, 2, 28)
+    plans = generate_plan_range(model, start, end, **week_params)
+    assert generate_timeline(
+        model, start, end, **week_params
+    ) == timeline_from_plans(plans, model)